@@ -0,0 +1,159 @@
+"""Initial schema, as Base.metadata.create_all built it before migrations
+
+Databases created by create_all already have some or all of these tables, so
+only missing tables are created; such databases are adopted as they stand.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+TABLES = ["users", "rides", "payment_methods", "notifications", "payments", "ratings", "driver_locations"]
+
+USER_ROLE = sa.Enum("PASSENGER", "DRIVER", "ADMIN", name="userrole")
+RIDE_STATUS = sa.Enum("REQUESTED", "ACCEPTED", "ARRIVED", "STARTED", "COMPLETED", "CANCELLED", name="ridestatus")
+RIDE_TYPE = sa.Enum("STANDARD", "COMFORT", "PREMIUM", name="ridetype")
+PAYMENT_METHOD_TYPE = sa.Enum("MPESA", "CASH", "CARD", "WALLET", name="paymentmethodtype")
+PAYMENT_STATUS = sa.Enum("PENDING", "COMPLETED", "FAILED", "CANCELLED", "REFUNDED", name="paymentstatus")
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("first_name", sa.String(), nullable=False),
+            sa.Column("last_name", sa.String(), nullable=False),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("phone", sa.String(), nullable=False),
+            sa.Column("hashed_password", sa.String(), nullable=False),
+            sa.Column("role", USER_ROLE, nullable=False),
+            sa.Column("is_verified", sa.Boolean(), nullable=True),
+            sa.Column("profile_picture", sa.String(), nullable=True),
+            sa.Column("rating", sa.Float(), nullable=True),
+            sa.Column("total_rides", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("last_active_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+        op.create_index("ix_users_phone", "users", ["phone"], unique=True)
+
+    if "rides" not in existing:
+        op.create_table(
+            "rides",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("status", RIDE_STATUS, nullable=True),
+            sa.Column("pickup_address", sa.String(), nullable=False),
+            sa.Column("destination_address", sa.String(), nullable=False),
+            sa.Column("pickup_latitude", sa.Float(), nullable=False),
+            sa.Column("pickup_longitude", sa.Float(), nullable=False),
+            sa.Column("destination_latitude", sa.Float(), nullable=False),
+            sa.Column("destination_longitude", sa.Float(), nullable=False),
+            sa.Column("ride_type", RIDE_TYPE, nullable=True),
+            sa.Column("fare", sa.Float(), nullable=False),
+            sa.Column("distance", sa.Float(), nullable=False),
+            sa.Column("duration", sa.Integer(), nullable=False),
+            sa.Column("notes", sa.Text(), nullable=True),
+            sa.Column("passenger_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("driver_id", sa.String(), sa.ForeignKey("users.id"), nullable=True),
+            sa.Column("requested_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("accepted_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("arrived_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("cancelled_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("cancellation_reason", sa.String(), nullable=True),
+        )
+        op.create_index("ix_rides_id", "rides", ["id"])
+
+    if "payment_methods" not in existing:
+        op.create_table(
+            "payment_methods",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("type", PAYMENT_METHOD_TYPE, nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("is_default", sa.Boolean(), nullable=True),
+            sa.Column("phone_number", sa.String(), nullable=True),
+            sa.Column("last_four", sa.String(), nullable=True),
+            sa.Column("brand", sa.String(), nullable=True),
+            sa.Column("expiry_month", sa.Integer(), nullable=True),
+            sa.Column("expiry_year", sa.Integer(), nullable=True),
+            sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_payment_methods_id", "payment_methods", ["id"])
+
+    if "notifications" not in existing:
+        op.create_table(
+            "notifications",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("message", sa.Text(), nullable=False),
+            sa.Column("type", sa.String(), nullable=False),
+            sa.Column("is_read", sa.Boolean(), nullable=True),
+            sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_notifications_id", "notifications", ["id"])
+
+    if "payments" not in existing:
+        op.create_table(
+            "payments",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("amount", sa.Float(), nullable=False),
+            sa.Column("method", PAYMENT_METHOD_TYPE, nullable=False),
+            sa.Column("status", PAYMENT_STATUS, nullable=True),
+            sa.Column("transaction_id", sa.String(), nullable=True),
+            sa.Column("description", sa.String(), nullable=True),
+            sa.Column("failure_reason", sa.String(), nullable=True),
+            sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("ride_id", sa.String(), sa.ForeignKey("rides.id"), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index("ix_payments_id", "payments", ["id"])
+
+    if "ratings" not in existing:
+        op.create_table(
+            "ratings",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("passenger_rating", sa.Integer(), nullable=True),
+            sa.Column("driver_rating", sa.Integer(), nullable=True),
+            sa.Column("passenger_comment", sa.Text(), nullable=True),
+            sa.Column("driver_comment", sa.Text(), nullable=True),
+            sa.Column("ride_id", sa.String(), sa.ForeignKey("rides.id"), nullable=False),
+            sa.Column("passenger_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("driver_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_ratings_id", "ratings", ["id"])
+
+    if "driver_locations" not in existing:
+        op.create_table(
+            "driver_locations",
+            sa.Column("driver_id", sa.String(), sa.ForeignKey("users.id"), primary_key=True),
+            sa.Column("latitude", sa.Float(), nullable=False),
+            sa.Column("longitude", sa.Float(), nullable=False),
+            sa.Column("heading", sa.Float(), nullable=True),
+            sa.Column("speed", sa.Float(), nullable=True),
+            sa.Column("accuracy", sa.Float(), nullable=True),
+            sa.Column("recorded_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_table(table)
+    bind = op.get_bind()
+    for enum in (PAYMENT_STATUS, PAYMENT_METHOD_TYPE, RIDE_TYPE, RIDE_STATUS, USER_ROLE):
+        enum.drop(bind, checkfirst=True)
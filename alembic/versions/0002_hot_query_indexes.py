@@ -0,0 +1,39 @@
+"""Indexes for the hot ride, notification, payment and rating filters
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns)
+INDEXES = [
+    # Passenger history and active ride
+    ("ix_rides_passenger_id_status", "rides", ["passenger_id", "status"]),
+    # Driver active rides, history, stats and earnings by completion date
+    ("ix_rides_driver_id_status_completed_at", "rides", ["driver_id", "status", "completed_at"]),
+    # Unassigned requested rides loaded into the pending pickup index at startup
+    ("ix_rides_status_driver_id", "rides", ["status", "driver_id"]),
+    # Notification list, unread counts and mark-all-read
+    ("ix_notifications_user_id_is_read_created_at", "notifications", ["user_id", "is_read", "created_at"]),
+    ("ix_payments_user_id_created_at", "payments", ["user_id", "created_at"]),
+    ("ix_payment_methods_user_id", "payment_methods", ["user_id"]),
+    ("ix_ratings_driver_id", "ratings", ["driver_id"]),
+]
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        # create_all from the current models already builds these
+        if name not in {index["name"] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,26 @@
+"""Add users.token_version, which stateless access tokens carry as a claim
+
+Databases created by create_all since the column joined the model already
+have it, and 0001 adopts their users table as it stands.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("users")}
+    if "token_version" not in columns:
+        with op.batch_alter_table("users") as batch:
+            batch.add_column(sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"))
+
+def downgrade() -> None:
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("token_version")
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Header
 from sqlalchemy.orm import Session
+from typing import Optional
 from app.core.database import get_db
-from app.core.security import verify_token
+from app.core.security import verify_token, revoke_token
+from app.core.refresh_tokens import refresh_families
 from app.services.auth_service import AuthService
 from app.schemas.user import UserLogin, UserRegister, UserResponse
-from app.schemas.auth import AuthResponse
+from app.schemas.auth import AuthResponse, TokenResponse, RefreshTokenRequest, LogoutRequest
 from app.schemas.common import SuccessResponse
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -13,18 +15,35 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 async def register(user_data: UserRegister, db: Session = Depends(get_db)):
     """Register a new user."""
     auth_service = AuthService(db)
-    return auth_service.register_user(user_data)
+    return await auth_service.register_user(user_data)
 
 @router.post("/login", response_model=AuthResponse)
 async def login(login_data: UserLogin, db: Session = Depends(get_db)):
     """Login user."""
     auth_service = AuthService(db)
-    return auth_service.login_user(login_data)
+    return await auth_service.login_user(login_data)
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(refresh_data: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Exchange a refresh token for new tokens without re-entering the password."""
+    auth_service = AuthService(db)
+    return auth_service.refresh_tokens(refresh_data.refresh_token)
 
 @router.post("/logout", response_model=SuccessResponse)
-async def logout():
-    """Logout user."""
-    # In a real implementation, you might want to blacklist the token
+async def logout(logout_data: Optional[LogoutRequest] = None, authorization: str = Header(None)):
+    """Logout user, revoking the access token and any refresh token sent with it."""
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing or invalid authorization header"
+        )
+    
+    revoke_token(verify_token(authorization.split(" ")[1]))
+    if logout_data and logout_data.refresh_token:
+        payload = verify_token(logout_data.refresh_token, token_type="refresh")
+        revoke_token(payload)
+        if payload.get("fid"):
+            refresh_families.end(payload["fid"])
     return SuccessResponse(message="Successfully logged out")
 
 @router.get("/me", response_model=UserResponse)
@@ -40,7 +59,7 @@ async def get_current_user_info(authorization: str = Header(None), db: Session =
     payload = verify_token(token)
     
     auth_service = AuthService(db)
-    user = auth_service.get_user_by_email(payload["sub"])
+    user = auth_service.get_token_user(payload, profile=True)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
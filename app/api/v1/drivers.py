@@ -1,12 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime, timedelta
-from app.core.database import get_db
+import asyncio
+from app.core.database import get_db, get_async_db
 from app.core.security import verify_token
+from app.core.realtime import Subscriber, SubscriberOverflow
 from app.services.driver_service import DriverService
+from app.services.offer_service import offer_feed
 from app.services.auth_service import AuthService
-from app.schemas.driver import DriverStatus, DriverEarnings, RideRequestResponse, DriverStats
+from app.services.location_service import location_buffer
+from app.schemas.driver import (
+    DriverStatus, DriverEarnings, RideRequestResponse, DriverStats,
+    DriverLocationUpdate, LocationUpdateResult
+)
 from app.schemas.common import SuccessResponse
 
 router = APIRouter(prefix="/drivers", tags=["Drivers"])
@@ -23,7 +31,7 @@ def get_current_user(authorization: str = Header(None), db: Session = Depends(ge
     payload = verify_token(token)
     
     auth_service = AuthService(db)
-    user = auth_service.get_user_by_email(payload["sub"])
+    user = auth_service.get_token_user(payload)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -48,7 +56,12 @@ async def toggle_driver_status(
 ):
     """Toggle driver online/offline status."""
     driver_service = DriverService(db)
-    return driver_service.toggle_driver_status(current_user.id, status_data.get("status"))
+    return driver_service.toggle_driver_status(
+        current_user.id,
+        status_data.get("status"),
+        status_data.get("latitude"),
+        status_data.get("longitude")
+    )
 
 @router.get("/status", response_model=DriverStatus)
 async def get_driver_status(
@@ -59,14 +72,77 @@ async def get_driver_status(
     driver_service = DriverService(db)
     return driver_service.get_driver_status(current_user.id)
 
+@router.post("/location", response_model=LocationUpdateResult)
+async def update_driver_location(
+    location_data: DriverLocationUpdate,
+    current_user = Depends(get_driver_user)
+):
+    """Record one or more GPS pings for the current driver."""
+    return location_buffer.ingest(current_user.id, location_data.points)
+
 @router.get("/requests", response_model=List[RideRequestResponse])
 async def get_ride_requests(
+    radius: Optional[float] = None,
     current_user = Depends(get_driver_user),
     db: Session = Depends(get_db)
 ):
-    """Get available ride requests for driver."""
+    """Get available ride requests near the driver."""
     driver_service = DriverService(db)
-    return driver_service.get_ride_requests(current_user.id)
+    return driver_service.get_ride_requests(current_user.id, radius)
+
+@router.websocket("/offers")
+async def stream_ride_offers(websocket: WebSocket, token: Optional[str] = None):
+    """Push ride offers and retractions to the driver, instead of polling /requests."""
+    authorization = websocket.headers.get("authorization", "")
+    if token is None and authorization.startswith("Bearer "):
+        token = authorization.split(" ")[1]
+    
+    # Authorise with a short-lived session, released before the first await
+    provider = websocket.app.dependency_overrides.get(get_db, get_db)
+    sessions = provider()
+    db = next(sessions)
+    try:
+        payload = verify_token(token or "")
+        user = AuthService(db).get_token_user(payload)
+        driver_id = user.id if user and user.role == "driver" else None
+    except HTTPException:
+        driver_id = None
+    finally:
+        sessions.close()
+    
+    if driver_id is None:
+        await websocket.close(code=4403)
+        return
+    
+    subscriber, offers = offer_feed.connect(driver_id)
+    await websocket.accept()
+    sender = asyncio.create_task(_forward_offers(websocket, subscriber, offers))
+    receiver = asyncio.create_task(_drain_client(websocket))
+    try:
+        done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        if sender in done and isinstance(sender.exception(), SubscriberOverflow):
+            # 1013 asks the client to reconnect for a fresh snapshot
+            await websocket.close(code=1013)
+    except RuntimeError:
+        pass  # the client went away while we were closing
+    finally:
+        # No awaiting here, so cleanup runs even if the handler is being cancelled
+        for task in (sender, receiver):
+            task.cancel()
+        offer_feed.disconnect(driver_id, subscriber)
+
+async def _forward_offers(websocket: WebSocket, subscriber: Subscriber, offers: List[dict]) -> None:
+    await websocket.send_json({"type": "snapshot", "offers": offers})
+    while True:
+        await websocket.send_json(await subscriber.get())
+
+async def _drain_client(websocket: WebSocket) -> None:
+    # Nothing is expected from the client; reading just notices the disconnect
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
 
 @router.post("/requests/{ride_id}/accept", response_model=SuccessResponse)
 async def accept_ride_request(
@@ -113,9 +189,12 @@ async def get_driver_stats(
 @router.get("/active-rides", response_model=List[dict])
 async def get_active_rides(
     current_user = Depends(get_driver_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db: Optional[AsyncSession] = Depends(get_async_db)
 ):
     """Get driver's active rides."""
+    if async_db is not None:
+        return await DriverService(async_db).get_active_rides_async(current_user.id)
     driver_service = DriverService(db)
     return driver_service.get_active_rides(current_user.id)
 
@@ -124,8 +203,11 @@ async def get_driver_ride_history(
     page: int = 1,
     limit: int = 20,
     current_user = Depends(get_driver_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db: Optional[AsyncSession] = Depends(get_async_db)
 ):
     """Get driver's ride history."""
+    if async_db is not None:
+        return await DriverService(async_db).get_driver_ride_history_async(current_user.id, page, limit)
     driver_service = DriverService(db)
     return driver_service.get_driver_ride_history(current_user.id, page, limit)
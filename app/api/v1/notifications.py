@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, Optional
+import json
+from app.core.database import get_db, get_async_db
 from app.core.security import verify_token
-from app.services.notification_service import NotificationService
+from app.core.realtime import Subscriber, SubscriberOverflow
+from app.services.notification_service import NotificationService, notification_stream
 from app.services.auth_service import AuthService
 from app.schemas.notification import NotificationResponse, NotificationHistory
 from app.schemas.common import SuccessResponse
@@ -21,7 +27,7 @@ def get_current_user(authorization: str = Header(None), db: Session = Depends(ge
     payload = verify_token(token)
     
     auth_service = AuthService(db)
-    user = auth_service.get_user_by_email(payload["sub"])
+    user = auth_service.get_token_user(payload)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -34,11 +40,16 @@ async def get_notifications(
     page: int = 1,
     limit: int = 20,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db: Optional[AsyncSession] = Depends(get_async_db)
 ):
     """Get user's notifications."""
-    notification_service = NotificationService(db)
-    notifications, total = notification_service.get_user_notifications(current_user.id, page, limit)
+    if async_db is not None:
+        notifications, total = await NotificationService(async_db).get_user_notifications_async(
+            current_user.id, page, limit
+        )
+    else:
+        notifications, total = NotificationService(db).get_user_notifications(current_user.id, page, limit)
     
     return NotificationHistory(
         notifications=notifications,
@@ -77,3 +88,58 @@ async def get_unread_count(
     count = notification_service.get_unread_count(current_user.id)
     return {"unread_count": count}
 
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    token: Optional[str] = None,
+    authorization: str = Header(None)
+):
+    """Server-Sent Events stream of new notifications and unread counts."""
+    if token is None and authorization and authorization.startswith("Bearer "):
+        token = authorization.split(" ")[1]
+    
+    # Use a short-lived session; the stream itself never touches the database
+    provider = request.app.dependency_overrides.get(get_db, get_db)
+    sessions = provider()
+    db = next(sessions)
+    try:
+        payload = verify_token(token or "")
+        user = AuthService(db).get_token_user(payload)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        # Subscribe before counting so no change is missed in between
+        subscriber = notification_stream.connect(user.id)
+        try:
+            unread_count = NotificationService(db).get_unread_count(user.id)
+        except Exception:
+            notification_stream.disconnect(subscriber)
+            raise
+    finally:
+        sessions.close()
+    
+    return StreamingResponse(
+        _event_stream(subscriber, unread_count),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(notification_stream.disconnect, subscriber)
+    )
+
+async def _event_stream(subscriber: Subscriber, unread_count: int) -> AsyncIterator[str]:
+    yield "retry: 5000\n\n"
+    yield _format_event({"type": "unread_count", "unread_count": unread_count})
+    while True:
+        try:
+            message = await subscriber.get()
+        except SubscriberOverflow:
+            return  # the client reconnects and starts from a fresh count
+        if message["type"] == "heartbeat":
+            yield ": heartbeat\n\n"
+        else:
+            yield _format_event(message)
+
+def _format_event(message: dict) -> str:
+    return f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
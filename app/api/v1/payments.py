@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Header
 from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.core.database import get_db, get_async_db
 from app.core.security import verify_token
 from app.services.payment_service import PaymentService
 from app.services.auth_service import AuthService
@@ -25,7 +26,7 @@ def get_current_user(authorization: str = Header(None), db: Session = Depends(ge
     payload = verify_token(token)
     
     auth_service = AuthService(db)
-    user = auth_service.get_user_by_email(payload["sub"])
+    user = auth_service.get_token_user(payload)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -46,9 +47,12 @@ async def process_payment(
 @router.get("/methods", response_model=List[PaymentMethodResponse])
 async def get_payment_methods(
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db: Optional[AsyncSession] = Depends(get_async_db)
 ):
     """Get user's payment methods."""
+    if async_db is not None:
+        return await PaymentService(async_db).get_payment_methods_async(current_user.id)
     payment_service = PaymentService(db)
     return payment_service.get_payment_methods(current_user.id)
 
@@ -67,11 +71,14 @@ async def get_payment_history(
     page: int = 1,
     limit: int = 20,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db: Optional[AsyncSession] = Depends(get_async_db)
 ):
     """Get user's payment history."""
-    payment_service = PaymentService(db)
-    payments, total = payment_service.get_payment_history(current_user.id, page, limit)
+    if async_db is not None:
+        payments, total = await PaymentService(async_db).get_payment_history_async(current_user.id, page, limit)
+    else:
+        payments, total = PaymentService(db).get_payment_history(current_user.id, page, limit)
     
     return PaymentHistory(
         payments=payments,
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
-from typing import Optional
-from app.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import asyncio
+from app.core.database import get_db, get_async_db
 from app.core.security import verify_token
+from app.core.realtime import realtime_hub, Subscriber, SubscriberOverflow
+from app.core.spatial import driver_index
+from app.models.ride import RideStatus
+from app.services.tracking_service import ride_tracker
 from app.services.ride_service import RideService
 from app.services.auth_service import AuthService
-from app.schemas.ride import RideRequest, RideResponse, RideHistory, RideEstimate
+from app.schemas.ride import RideRequest, RideEstimateRequest, RideResponse, RideHistory, RideEstimate
+from app.schemas.driver import AvailableDriver
 from app.schemas.common import SuccessResponse
 
 router = APIRouter(prefix="/rides", tags=["Rides"])
@@ -22,7 +29,7 @@ def get_current_user(authorization: str = Header(None), db: Session = Depends(ge
     payload = verify_token(token)
     
     auth_service = AuthService(db)
-    user = auth_service.get_user_by_email(payload["sub"])
+    user = auth_service.get_token_user(payload)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -54,11 +61,14 @@ async def get_ride_history(
     page: int = 1,
     limit: int = 20,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db: Optional[AsyncSession] = Depends(get_async_db)
 ):
     """Get ride history for current user."""
-    ride_service = RideService(db)
-    rides, total = ride_service.get_ride_history(current_user.id, page, limit)
+    if async_db is not None:
+        rides, total = await RideService(async_db).get_ride_history_async(current_user.id, page, limit)
+    else:
+        rides, total = RideService(db).get_ride_history(current_user.id, page, limit)
     
     return RideHistory(
         rides=rides,
@@ -68,21 +78,94 @@ async def get_ride_history(
     )
 
 @router.post("/estimate", response_model=RideEstimate)
-async def get_ride_estimate(ride_data: dict, db: Session = Depends(get_db)):
+async def get_ride_estimate(ride_data: RideEstimateRequest, db: Session = Depends(get_db)):
     """Get ride fare estimate."""
     ride_service = RideService(db)
     return ride_service.get_ride_estimate(ride_data)
 
-@router.get("/drivers/available")
+@router.get("/drivers/available", response_model=List[AvailableDriver])
 async def get_available_drivers(
     latitude: float,
     longitude: float,
     radius: float = 5.0,
+    limit: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
     """Get available drivers near a location."""
     ride_service = RideService(db)
-    return ride_service.get_available_drivers(latitude, longitude, radius)
+    return ride_service.get_available_drivers(latitude, longitude, radius, limit)
+
+@router.websocket("/{ride_id}/track")
+async def track_ride(websocket: WebSocket, ride_id: str, token: Optional[str] = None):
+    """Stream status changes and driver positions for a ride."""
+    authorization = websocket.headers.get("authorization", "")
+    if token is None and authorization.startswith("Bearer "):
+        token = authorization.split(" ")[1]
+    
+    # Authorise and snapshot with a short-lived session, released before the
+    # first await so idle sockets never pin pooled connections
+    provider = websocket.app.dependency_overrides.get(get_db, get_db)
+    sessions = provider()
+    db = next(sessions)
+    try:
+        payload = verify_token(token or "")
+        user = AuthService(db).get_token_user(payload)
+        ride = RideService(db).get_ride_by_id(ride_id)
+        allowed = bool(user and ride and user.id in (ride.passenger_id, ride.driver_id))
+        if allowed:
+            ride_data = RideResponse.model_validate(ride).model_dump(mode="json")
+    except HTTPException:
+        allowed = False
+    finally:
+        sessions.close()
+    
+    if not allowed:
+        await websocket.close(code=4403)
+        return
+    
+    # Subscribe before sending the snapshot so no transition falls in between
+    topic = ride_tracker.topic(ride_id)
+    subscriber = realtime_hub.subscribe(topic)
+    ride_tracker.follow(ride_id, RideStatus(ride_data["status"]), ride_data["driver_id"])
+    snapshot = {"type": "snapshot", "ride": ride_data, "driver_location": None}
+    position = driver_index.get(ride_data["driver_id"]) if ride_data["driver_id"] else None
+    if position:
+        snapshot["driver_location"] = {"latitude": position[0], "longitude": position[1]}
+    await websocket.accept()
+    
+    sender = asyncio.create_task(_forward_updates(websocket, subscriber, snapshot))
+    receiver = asyncio.create_task(_drain_client(websocket))
+    try:
+        done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        if sender in done:
+            # 1013 asks the client to come back for a fresh snapshot
+            overflowed = isinstance(sender.exception(), SubscriberOverflow)
+            await websocket.close(code=1013 if overflowed else 1000)
+    except RuntimeError:
+        pass  # the client went away while we were closing
+    finally:
+        # No awaiting here, so cleanup runs even if the handler is being cancelled
+        for task in (sender, receiver):
+            task.cancel()
+        realtime_hub.unsubscribe(topic, subscriber)
+
+async def _forward_updates(websocket: WebSocket, subscriber: Subscriber, snapshot: dict) -> None:
+    await websocket.send_json(snapshot)
+    if snapshot["ride"]["status"] in (RideStatus.COMPLETED.value, RideStatus.CANCELLED.value):
+        return
+    while True:
+        message = await subscriber.get()
+        await websocket.send_json(message)
+        if message["type"] == "status" and message["status"] in (RideStatus.COMPLETED.value, RideStatus.CANCELLED.value):
+            return
+
+async def _drain_client(websocket: WebSocket) -> None:
+    # Nothing is expected from the client; reading just notices the disconnect
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
 
 @router.get("/{ride_id}", response_model=RideResponse)
 async def get_ride_details(
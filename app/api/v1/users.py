@@ -12,6 +12,13 @@ router = APIRouter(prefix="/users", tags=["Users"])
 
 def get_current_user(authorization: str = Header(None), db: Session = Depends(get_db)):
     """Get current authenticated user."""
+    return _resolve_user(authorization, db)
+
+def get_current_user_with_profile(authorization: str = Header(None), db: Session = Depends(get_db)):
+    """Get current authenticated user with every profile field, even for stateless tokens."""
+    return _resolve_user(authorization, db, profile=True)
+
+def _resolve_user(authorization: str, db: Session, profile: bool = False):
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -22,7 +29,7 @@ def get_current_user(authorization: str = Header(None), db: Session = Depends(ge
     payload = verify_token(token)
     
     auth_service = AuthService(db)
-    user = auth_service.get_user_by_email(payload["sub"])
+    user = auth_service.get_token_user(payload, profile=profile)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -31,7 +38,7 @@ def get_current_user(authorization: str = Header(None), db: Session = Depends(ge
     return user
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_profile(current_user = Depends(get_current_user)):
+async def get_current_user_profile(current_user = Depends(get_current_user_with_profile)):
     """Get current user profile."""
     return current_user
 
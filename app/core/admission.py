@@ -0,0 +1,139 @@
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional
+import asyncio
+import logging
+import re
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CRITICAL = "critical"
+NORMAL = "normal"
+LOW = "low"
+
+class AdmissionController:
+    """Decides, per request, whether the worker can take it on right now.
+
+    Overload shows up first as event-loop lag: callbacks that should run now
+    start late. A background task samples that lag into a moving average. While
+    the average is above ``target_latency``, low-priority requests (history,
+    stats, estimates) are shed straight away; otherwise at most
+    ``low_priority_concurrency`` of them run at once and the rest queue for up
+    to ``queue_timeout`` seconds before being shed. Normal requests are shed
+    only beyond ``max_in_flight``. Critical requests (ride acceptance and
+    status updates) are always admitted. Exempt paths, such as health checks
+    and long-lived event streams, bypass admission entirely.
+    """
+
+    def __init__(
+        self,
+        target_latency: float = settings.ADMISSION_TARGET_LATENCY_MS / 1000,
+        max_in_flight: int = settings.ADMISSION_MAX_IN_FLIGHT,
+        low_priority_concurrency: int = settings.ADMISSION_LOW_PRIORITY_CONCURRENCY,
+        queue_timeout: float = settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        low_priority_paths: Iterable[str] = settings.ADMISSION_LOW_PRIORITY_PATHS,
+        critical_paths: Iterable[str] = settings.ADMISSION_CRITICAL_PATHS,
+        exempt_paths: Iterable[str] = settings.ADMISSION_EXEMPT_PATHS,
+        smoothing: float = 0.3
+    ):
+        self.target_latency = target_latency
+        self.max_in_flight = max_in_flight
+        self.low_priority_concurrency = low_priority_concurrency
+        self.queue_timeout = queue_timeout
+        self.smoothing = smoothing
+        self._low = re.compile("|".join(f"(?:{path})" for path in low_priority_paths) or "(?!)")
+        self._critical = re.compile("|".join(f"(?:{path})" for path in critical_paths) or "(?!)")
+        self.exempt_paths = frozenset(exempt_paths)
+        self.clear()
+
+    def clear(self) -> None:
+        self.in_flight = 0
+        self.low_in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.loop_lag = 0.0
+        self.admitted = 0
+        self.queued = 0
+        self.shed = {LOW: 0, NORMAL: 0}
+
+    def classify(self, path: str) -> Optional[str]:
+        """Priority of a request path; None for paths admission control ignores."""
+        if path in self.exempt_paths:
+            return None
+        if self._critical.fullmatch(path):
+            return CRITICAL
+        if self._low.fullmatch(path):
+            return LOW
+        return NORMAL
+
+    def overloaded(self) -> bool:
+        return self.loop_lag > self.target_latency or self.in_flight >= self.max_in_flight
+
+    async def acquire(self, priority: str) -> bool:
+        """Admit a request of ``priority``; False if it should be shed."""
+        if priority == LOW:
+            if self.overloaded():
+                self.shed[LOW] += 1
+                return False
+            if self.low_in_flight < self.low_priority_concurrency:
+                self.low_in_flight += 1
+            else:
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+                self.queued += 1
+                try:
+                    # A released slot is handed over with low_in_flight unchanged
+                    await asyncio.wait_for(waiter, self.queue_timeout)
+                except asyncio.TimeoutError:
+                    self.shed[LOW] += 1
+                    return False
+                except asyncio.CancelledError:
+                    # The caller went away; pass on a slot it was handed meanwhile
+                    if waiter.done() and not waiter.cancelled():
+                        self._release_low_slot()
+                    raise
+        elif priority == NORMAL and self.in_flight >= self.max_in_flight:
+            self.shed[NORMAL] += 1
+            return False
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def release(self, priority: str) -> None:
+        self.in_flight -= 1
+        if priority == LOW:
+            self._release_low_slot()
+
+    def _release_low_slot(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.low_in_flight -= 1
+
+    def record_lag(self, lag: float) -> None:
+        self.loop_lag += self.smoothing * (lag - self.loop_lag)
+
+    async def run(self, interval: float) -> None:
+        """Sample event-loop lag every ``interval`` seconds until cancelled."""
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(interval)
+            self.record_lag(max(0.0, time.monotonic() - started - interval))
+            if self.loop_lag > self.target_latency:
+                logger.debug("Event loop lag %.0f ms, shedding low-priority requests", self.loop_lag * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint."""
+        return {
+            "in_flight": self.in_flight,
+            "loop_lag_ms": round(self.loop_lag * 1000, 1),
+            "overloaded": self.overloaded(),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": dict(self.shed),
+        }
+
+admission_controller = AdmissionController()
@@ -1,5 +1,5 @@
 import os
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import  validator
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
@@ -16,12 +16,26 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./tearide.db"
     DATABASE_ECHO: bool = False
+    DATABASE_ASYNC: bool = False  # serve read endpoints through the asyncio engine
     
     # Security
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    AUTH_USER_CACHE_SIZE: int = 10000
+    AUTH_USER_CACHE_TTL_SECONDS: float = 30.0
+    AUTH_STATELESS_TOKENS: bool = False  # put user id, role and version claims in access tokens
+    TOKEN_VERSION_BACKEND: str = "memory"  # memory or redis
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    TOKEN_VERIFY_CACHE_SIZE: int = 10000
+    TOKEN_REVOCATION_BACKEND: str = "memory"  # memory or redis
+    TOKEN_REVOCATION_CAPACITY: int = 100000
+    TOKEN_REVOCATION_ERROR_RATE: float = 0.001
+    TOKEN_REVOCATION_SYNC_SECONDS: float = 5.0
+    REFRESH_TOKEN_BACKEND: str = "memory"  # memory or redis
+    REFRESH_FAMILY_CACHE_SIZE: int = 100000
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
@@ -37,6 +51,66 @@ class Settings(BaseSettings):
     MPESA_SHORTCODE: Optional[str] = None
     MPESA_PASSKEY: Optional[str] = None
     
+    # Geospatial
+    DRIVER_INDEX_CELL_KM: float = 1.0
+    AVAILABLE_DRIVERS_LIMIT: int = 10
+    LOCATION_FLUSH_INTERVAL_SECONDS: float = 5.0
+    LOCATION_LATEST_MAX_DRIVERS: int = 100000
+    PICKUP_INDEX_CELL_KM: float = 1.0
+    RIDE_REQUEST_RADIUS_KM: float = 5.0
+    AVERAGE_SPEED_KMH: float = 25.0
+    ROAD_DETOUR_FACTOR: float = 1.3
+    
+    # Routing
+    ROAD_GRAPH_PATH: Optional[str] = None  # .csv edge list or .npz saved graph
+    ROUTING_MAX_SNAP_KM: float = 1.0
+    
+    # Pricing
+    BASE_FARE: float = 50.0
+    FARE_PER_KM: float = 12.0
+    FARE_PER_MINUTE: float = 1.0
+    MINIMUM_FARE: float = 100.0
+    QUOTE_CELL_KM: float = 0.15
+    QUOTE_TIME_BUCKET_SECONDS: int = 300
+    QUOTE_CACHE_SIZE: int = 50000
+    QUOTE_CACHE_TTL_SECONDS: float = 120.0
+    
+    # Surge pricing
+    SURGE_CELL_KM: float = 1.0
+    SURGE_WINDOW_SECONDS: float = 300.0
+    SURGE_BUCKET_SECONDS: float = 30.0
+    SURGE_RECOMPUTE_SECONDS: float = 5.0
+    SURGE_DEMAND_THRESHOLD: float = 1.0  # requests per window per available driver
+    SURGE_SENSITIVITY: float = 0.5
+    SURGE_MIN_REQUESTS: int = 3
+    SURGE_MAX_MULTIPLIER: float = 3.0
+    SURGE_STEP: float = 0.1
+    
+    # Driver presence
+    PRESENCE_BACKEND: str = "memory"  # memory or redis
+    PRESENCE_TTL_SECONDS: float = 60.0
+    PRESENCE_SWEEP_INTERVAL_SECONDS: float = 10.0
+    
+    # Dispatch
+    DISPATCH_ENABLED: bool = False
+    DISPATCH_INTERVAL_SECONDS: float = 2.0
+    DISPATCH_TIME_BUDGET_MS: float = 500.0
+    DISPATCH_MAX_PICKUP_KM: float = 5.0
+    DISPATCH_CANDIDATES_PER_RIDE: int = 16
+    DISPATCH_OFFER_TTL_SECONDS: float = 15.0
+    OFFER_FANOUT_DRIVERS: int = 5  # nearest drivers pushed each new ride at once
+    
+    # Realtime
+    REALTIME_QUEUE_SIZE: int = 64
+    NOTIFICATION_HEARTBEAT_SECONDS: float = 15.0
+    
+    # Events
+    EVENT_BUS_BACKEND: str = "memory"  # memory or redis, to relay events across workers
+    EVENT_BUS_INBOX_SIZE: int = 10000
+    EVENT_SUBSCRIBER_QUEUE_SIZE: int = 1000
+    EVENT_BLOCK_TIMEOUT_SECONDS: float = 1.0
+    EVENT_REDIS_CHANNEL: str = "tearide:events"
+    
     # File Upload
     MAX_FILE_SIZE: int = 5 * 1024 * 1024  # 5MB
     UPLOAD_DIR: str = "uploads"
@@ -47,6 +121,40 @@ class Settings(BaseSettings):
     
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_PER_IP_PER_MINUTE: int = 300
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # memory or redis, to share buckets across workers
+    RATE_LIMIT_SHARDS: int = 64
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    # Full-match regular expressions over the request path
+    RATE_LIMIT_ROUTES: Dict[str, int] = {
+        "/api/v1/auth/login": 10,
+        "/api/v1/auth/register": 10,
+        "/api/v1/drivers/requests": 30,
+    }
+    RATE_LIMIT_EXEMPT_PATHS: List[str] = ["/health", "/metrics"]
+    
+    # Admission Control
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_TARGET_LATENCY_MS: float = 100.0  # event-loop lag above which low-priority requests are shed
+    ADMISSION_SAMPLE_INTERVAL_SECONDS: float = 0.1
+    ADMISSION_MAX_IN_FLIGHT: int = 200
+    ADMISSION_LOW_PRIORITY_CONCURRENCY: int = 16
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 0.5
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    # Full-match regular expressions over the request path
+    ADMISSION_LOW_PRIORITY_PATHS: List[str] = [
+        "/api/v1/rides/history",
+        "/api/v1/rides/estimate",
+        "/api/v1/payments/history",
+        "/api/v1/drivers/(stats|earnings|ride-history)",
+    ]
+    ADMISSION_CRITICAL_PATHS: List[str] = [
+        "/api/v1/drivers/requests/[^/]+/accept",
+        "/api/v1/drivers/status",
+        "/api/v1/rides/[^/]+/(status|complete|cancel)",
+    ]
+    ADMISSION_EXEMPT_PATHS: List[str] = ["/health", "/metrics", "/api/v1/notifications/stream"]
     
     @validator("ALLOWED_ORIGINS", pre=True)
     def assemble_cors_origins(cls, v):
@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -13,6 +14,25 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def async_database_url(url: str) -> str:
+    """Swap a sync driver URL for its asyncio driver."""
+    for prefix, native in (
+        ("sqlite://", "sqlite+aiosqlite://"),
+        ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+    ):
+        if url.startswith(prefix):
+            return native + url[len(prefix):]
+    return url
+
+# Only built when enabled, so the asyncio driver stays an optional dependency
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    echo=settings.DATABASE_ECHO,
+    pool_pre_ping=True
+) if settings.DATABASE_ASYNC else None
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False) if async_engine else None
+
 # Create base class for models
 Base = declarative_base()
 
@@ -24,3 +44,10 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Dependency to get an asyncio session, or None when DATABASE_ASYNC is off."""
+    if AsyncSessionLocal is None:
+        yield None
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
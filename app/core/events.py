@@ -0,0 +1,255 @@
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Deque, Dict, Iterable, List, Optional
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class EventTopic(str, Enum):
+    RIDE_REQUESTED = "ride.requested"
+    RIDE_STATUS_CHANGED = "ride.status_changed"
+    PAYMENT_COMPLETED = "payment.completed"
+    PAYMENT_REFUNDED = "payment.refunded"
+    NOTIFICATION_CREATED = "notification.created"
+
+class OverflowPolicy(str, Enum):
+    DROP = "drop"  # discard the subscriber's oldest queued event
+    BLOCK = "block"  # hold up delivery until the subscriber makes room
+
+@dataclass(frozen=True)
+class Event:
+    topic: EventTopic
+    payload: Dict[str, Any]
+    origin: str
+    published_at: float = field(default_factory=time.time)
+
+class EventSubscription:
+    """A consumer's bounded queue of events on the topics it asked for."""
+
+    def __init__(self, name: str, topics: Iterable[EventTopic], maxsize: int, policy: OverflowPolicy):
+        self.name = name
+        self.topics = frozenset(EventTopic(topic) for topic in topics)
+        self.policy = OverflowPolicy(policy)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.received = 0
+        self.dropped = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def matches(self, topic: EventTopic) -> bool:
+        return not self.topics or topic in self.topics
+
+    def offer(self, event: Event) -> None:
+        """Queue without waiting, evicting the oldest event if full."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> Event:
+        """Wait for the next event, recording how long it took to arrive."""
+        event = await self.queue.get()
+        self.received += 1
+        self.last_lag = time.time() - event.published_at
+        self.max_lag = max(self.max_lag, self.last_lag)
+        return event
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "policy": self.policy.value,
+            "depth": self.queue.qsize(),
+            "received": self.received,
+            "dropped": self.dropped,
+            "last_lag_ms": round(self.last_lag * 1000, 3),
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+        }
+
+class EventBus:
+    """In-process pub/sub for domain events.
+
+    ``publish`` never blocks: it is safe from sync service code and worker
+    threads, and appends to a bounded inbox (rejecting when full). ``run``
+    fans the inbox out to subscribers. A ``DROP`` subscriber that falls behind
+    loses its oldest events; a full ``BLOCK`` subscriber holds up fan-out for
+    up to ``block_timeout`` seconds, pushing back into the inbox, before the
+    event is dropped for it.
+    """
+
+    def __init__(
+        self,
+        inbox_size: int = settings.EVENT_BUS_INBOX_SIZE,
+        subscriber_queue_size: int = settings.EVENT_SUBSCRIBER_QUEUE_SIZE,
+        block_timeout: float = settings.EVENT_BLOCK_TIMEOUT_SECONDS
+    ):
+        self.inbox_size = inbox_size
+        self.subscriber_queue_size = subscriber_queue_size
+        self.block_timeout = block_timeout
+        self.worker_id = uuid.uuid4().hex
+        self._inbox: Deque[Event] = deque()
+        self._subscriptions: List[EventSubscription] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.published = 0
+        self.delivered = 0
+        self.rejected = 0
+
+    def subscribe(
+        self,
+        name: str,
+        topics: Iterable[EventTopic] = (),
+        maxsize: Optional[int] = None,
+        policy: OverflowPolicy = OverflowPolicy.DROP
+    ) -> EventSubscription:
+        """Register a consumer for some topics, or every topic if none are given."""
+        subscription = EventSubscription(name, topics, maxsize or self.subscriber_queue_size, policy)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: EventSubscription) -> None:
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+
+    def clear(self) -> None:
+        self._subscriptions.clear()
+        self._inbox.clear()
+        self.published = self.delivered = self.rejected = 0
+
+    def publish(
+        self,
+        topic: EventTopic,
+        payload: Dict[str, Any],
+        origin: Optional[str] = None,
+        published_at: Optional[float] = None
+    ) -> bool:
+        """Queue an event for fan-out; returns False if nobody listens or the inbox is full."""
+        topic = EventTopic(topic)
+        if not any(subscription.matches(topic) for subscription in self._subscriptions):
+            return False
+        if len(self._inbox) >= self.inbox_size:
+            self.rejected += 1
+            return False
+        event = Event(topic, payload, origin or self.worker_id, published_at or time.time())
+        self.published += 1
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop or self._loop is None:
+            self._enqueue(event)
+        else:
+            self._loop.call_soon_threadsafe(self._enqueue, event)
+        return True
+
+    def _enqueue(self, event: Event) -> None:
+        self._inbox.append(event)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run(self) -> None:
+        """Fan events out to subscribers until cancelled."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                while not self._inbox:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                await self._dispatch(self._inbox.popleft())
+        finally:
+            self._loop = self._wakeup = None
+
+    async def _dispatch(self, event: Event) -> None:
+        for subscription in list(self._subscriptions):
+            if not subscription.matches(event.topic):
+                continue
+            if subscription.policy is OverflowPolicy.BLOCK and subscription.queue.full():
+                try:
+                    await asyncio.wait_for(subscription.queue.put(event), self.block_timeout)
+                except asyncio.TimeoutError:
+                    subscription.dropped += 1
+                    continue
+            else:
+                subscription.offer(event)
+            self.delivered += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint."""
+        oldest = self._inbox[0].published_at if self._inbox else None
+        return {
+            "published": self.published,
+            "delivered": self.delivered,
+            "rejected": self.rejected,
+            "inbox_depth": len(self._inbox),
+            "inbox_lag_ms": round((time.time() - oldest) * 1000, 3) if oldest else 0.0,
+            "subscribers": [subscription.stats() for subscription in self._subscriptions],
+        }
+
+class RedisEventBridge:
+    """Relays events between worker processes over a Redis pub/sub channel.
+
+    Local events are forwarded to the channel; events from other workers are
+    republished on the local bus with their original origin, so they are
+    never sent back out.
+    """
+
+    def __init__(self, bus: EventBus, redis_client, channel: str = settings.EVENT_REDIS_CHANNEL):
+        self.bus = bus
+        self.redis = redis_client
+        self.channel = channel
+        self.sent = 0
+        self.received = 0
+
+    @staticmethod
+    def encode(event: Event) -> str:
+        return json.dumps({
+            "topic": event.topic.value,
+            "payload": event.payload,
+            "origin": event.origin,
+            "published_at": event.published_at,
+        })
+
+    async def run(self) -> None:
+        """Relay in both directions until cancelled."""
+        subscription = self.bus.subscribe("redis-bridge")
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        try:
+            await asyncio.gather(self._send(subscription), self._receive(pubsub))
+        finally:
+            self.bus.unsubscribe(subscription)
+            pubsub.close()
+
+    async def _send(self, subscription: EventSubscription) -> None:
+        while True:
+            event = await subscription.get()
+            if event.origin != self.bus.worker_id:
+                continue
+            try:
+                await asyncio.to_thread(self.redis.publish, self.channel, self.encode(event))
+                self.sent += 1
+            except Exception:
+                logger.exception("Failed to relay %s event to Redis", event.topic.value)
+
+    async def _receive(self, pubsub) -> None:
+        while True:
+            message = await asyncio.to_thread(pubsub.get_message, timeout=1.0)
+            if not message or message.get("type") != "message":
+                continue
+            try:
+                data = json.loads(message["data"])
+                if data["origin"] == self.bus.worker_id:
+                    continue
+                self.bus.publish(data["topic"], data["payload"], data["origin"], data["published_at"])
+                self.received += 1
+            except (ValueError, KeyError):
+                logger.warning("Ignoring malformed event on %s", self.channel)
+
+event_bus = EventBus()
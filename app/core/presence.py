@@ -0,0 +1,169 @@
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass
+import asyncio
+import enum
+import logging
+import time
+
+from app.core.config import settings
+from app.core.spatial import GridIndex
+
+logger = logging.getLogger(__name__)
+
+class PresenceStatus(str, enum.Enum):
+    ONLINE = "online"
+    OFFLINE = "offline"
+    BUSY = "busy"
+
+@dataclass
+class Presence:
+    status: PresenceStatus
+    last_seen: Optional[datetime] = None
+
+    @property
+    def is_online(self) -> bool:
+        return self.status != PresenceStatus.OFFLINE
+
+# Backends store (status, last_seen epoch seconds) per driver with a TTL
+Entry = Tuple[str, float]
+
+class InMemoryPresenceBackend:
+    """Per-process presence store; expired entries are dropped lazily on read."""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[str, float, float]] = {}
+
+    def get_many(self, driver_ids: List[str]) -> List[Optional[Entry]]:
+        now = time.time()
+        entries = []
+        for driver_id in driver_ids:
+            entry = self._entries.get(driver_id)
+            if entry is not None and entry[2] <= now:
+                del self._entries[driver_id]
+                entry = None
+            entries.append(entry[:2] if entry else None)
+        return entries
+
+    def set(self, driver_id: str, status: str, last_seen: float, ttl: float) -> None:
+        self._entries[driver_id] = (status, last_seen, time.time() + ttl)
+
+    def delete(self, driver_id: str) -> None:
+        self._entries.pop(driver_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+class RedisPresenceBackend:
+    """Presence shared across workers; Redis key expiry implements the TTL."""
+
+    def __init__(self, client, prefix: str = "presence:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get_many(self, driver_ids: List[str]) -> List[Optional[Entry]]:
+        if not driver_ids:
+            return []
+        values = self.client.mget([self.prefix + driver_id for driver_id in driver_ids])
+        entries = []
+        for value in values:
+            if value is None:
+                entries.append(None)
+                continue
+            if isinstance(value, bytes):
+                value = value.decode()
+            status, last_seen = value.split("|", 1)
+            entries.append((status, float(last_seen)))
+        return entries
+
+    def set(self, driver_id: str, status: str, last_seen: float, ttl: float) -> None:
+        self.client.set(self.prefix + driver_id, f"{status}|{last_seen}", px=max(1, int(ttl * 1000)))
+
+    def delete(self, driver_id: str) -> None:
+        self.client.delete(self.prefix + driver_id)
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+class PresenceRegistry:
+    """Driver online/offline/busy state kept alive by heartbeats.
+
+    A driver with no entry, or whose last heartbeat is older than ``ttl``
+    seconds, is offline. Going offline deletes the entry outright.
+    """
+
+    def __init__(self, backend, ttl: float = settings.PRESENCE_TTL_SECONDS):
+        self.backend = backend
+        self.ttl = ttl
+
+    def get(self, driver_id: str) -> Presence:
+        """Get a driver's current presence."""
+        return self.get_many([driver_id])[driver_id]
+
+    def get_many(self, driver_ids: Iterable[str]) -> Dict[str, Presence]:
+        """Get presence for several drivers in one backend call."""
+        driver_ids = list(driver_ids)
+        presences = {}
+        for driver_id, entry in zip(driver_ids, self.backend.get_many(driver_ids)):
+            if entry is None:
+                presences[driver_id] = Presence(PresenceStatus.OFFLINE)
+            else:
+                presences[driver_id] = Presence(
+                    PresenceStatus(entry[0]),
+                    datetime.fromtimestamp(entry[1], tz=timezone.utc)
+                )
+        return presences
+
+    def available(self, driver_ids: Iterable[str]) -> List[str]:
+        """Filter to drivers that are online and not on a trip, keeping order."""
+        presences = self.get_many(driver_ids)
+        return [driver_id for driver_id, presence in presences.items() if presence.status == PresenceStatus.ONLINE]
+
+    def set_status(self, driver_id: str, status: PresenceStatus) -> Presence:
+        """Set a driver's status explicitly, refreshing the heartbeat."""
+        status = PresenceStatus(status)
+        if status == PresenceStatus.OFFLINE:
+            self.backend.delete(driver_id)
+            return Presence(PresenceStatus.OFFLINE)
+        now = time.time()
+        self.backend.set(driver_id, status.value, now, self.ttl)
+        return Presence(status, datetime.fromtimestamp(now, tz=timezone.utc))
+
+    def heartbeat(self, driver_id: str) -> Presence:
+        """Extend a live driver's TTL; offline drivers stay offline."""
+        presence = self.get(driver_id)
+        if presence.status == PresenceStatus.OFFLINE:
+            return presence
+        return self.set_status(driver_id, presence.status)
+
+    def prune_index(self, index: GridIndex) -> int:
+        """Remove drivers whose presence has lapsed from a spatial index."""
+        driver_ids = [driver_id for driver_id, _, _ in index.items()]
+        removed = 0
+        for driver_id, presence in self.get_many(driver_ids).items():
+            if presence.status == PresenceStatus.OFFLINE:
+                index.remove(driver_id)
+                removed += 1
+        return removed
+
+    async def run(self, index: GridIndex, interval: float) -> None:
+        """Prune expired drivers from the index until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = self.prune_index(index)
+                if removed:
+                    logger.info("Presence expired for %d drivers", removed)
+            except Exception:
+                logger.exception("Failed to prune driver presence")
+
+def create_presence_registry() -> PresenceRegistry:
+    """Build the registry for the configured backend."""
+    if settings.PRESENCE_BACKEND == "redis":
+        from app.core.redis import get_redis
+        return PresenceRegistry(RedisPresenceBackend(get_redis()))
+    return PresenceRegistry(InMemoryPresenceBackend())
+
+presence = create_presence_registry()
@@ -0,0 +1,191 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import re
+import threading
+import time
+
+from app.core.config import settings
+
+class InMemoryBucketStore:
+    """Per-process token buckets, refilled lazily when they are next hit.
+
+    A bucket is just its token count and the time it was last touched; no
+    timer runs per key. Keys are spread over lock-striped shards, and a shard
+    that outgrows its share of ``max_keys`` drops buckets that have refilled
+    to capacity, since a fresh bucket would behave the same.
+    """
+
+    def __init__(
+        self,
+        shards: int = settings.RATE_LIMIT_SHARDS,
+        max_keys: int = settings.RATE_LIMIT_MAX_KEYS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        # Each shard maps key -> (tokens, updated_at, full_at)
+        self._shards: List[Tuple[Dict[str, Tuple[float, float, float]], threading.Lock]] = [
+            ({}, threading.Lock()) for _ in range(shards)
+        ]
+        self.max_keys_per_shard = max(1, max_keys // shards)
+        self.clock = clock
+
+    # Cheap enough to call on the event loop
+    blocking = False
+
+    def take(self, key: str, capacity: int, refill_per_second: float) -> float:
+        """Spend one token; returns 0 if allowed, else seconds until a token is available."""
+        buckets, lock = self._shards[hash(key) % len(self._shards)]
+        now = self.clock()
+        with lock:
+            bucket = buckets.get(key)
+            if bucket is None:
+                if len(buckets) >= self.max_keys_per_shard:
+                    self._prune(buckets, now)
+                tokens = float(capacity)
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_per_second)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / refill_per_second
+            buckets[key] = (tokens, now, now + (capacity - tokens) / refill_per_second)
+            return wait
+
+    def _prune(self, buckets: Dict[str, Tuple[float, float, float]], now: float) -> None:
+        for key in [key for key, bucket in buckets.items() if bucket[2] <= now]:
+            del buckets[key]
+
+    def __len__(self) -> int:
+        return sum(len(buckets) for buckets, _ in self._shards)
+
+    def clear(self) -> None:
+        for buckets, lock in self._shards:
+            with lock:
+                buckets.clear()
+
+# Refill and spend in one round trip so concurrent workers never double-spend.
+# Time comes from the Redis server so worker clocks need not agree.
+TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+class RedisBucketStore:
+    """Token buckets shared across workers; each bucket is a hash that expires once full."""
+
+    def __init__(self, client, prefix: str = "rate_limit:"):
+        self.client = client
+        self.prefix = prefix
+        self._take = client.register_script(TAKE_SCRIPT)
+
+    # Each take is a network round trip, so callers on the loop use a thread
+    blocking = True
+
+    def take(self, key: str, capacity: int, refill_per_second: float) -> float:
+        wait = self._take(keys=[self.prefix + key], args=[capacity, refill_per_second])
+        return float(wait.decode() if isinstance(wait, bytes) else wait)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+class RateLimiter:
+    """Token-bucket limits per caller, with tighter or looser limits for some routes.
+
+    Callers are identified by the middleware (a user id, or an IP address for
+    anonymous requests). Every caller gets ``per_minute`` requests a minute,
+    bursting up to the same number; a path fully matching one of the
+    ``routes`` patterns instead draws from a separate bucket sized by that
+    route's limit, so polling a list never uses up the actions under it.
+    Every request given an ``address`` also draws from that address's
+    bucket of ``per_ip_minute``, so many accounts behind one IP share a
+    ceiling. A request is refused if either bucket is empty.
+    """
+
+    def __init__(
+        self,
+        store,
+        per_minute: int = settings.RATE_LIMIT_PER_MINUTE,
+        per_ip_minute: int = settings.RATE_LIMIT_PER_IP_PER_MINUTE,
+        routes: Optional[Dict[str, int]] = None,
+        exempt_paths: Iterable[str] = settings.RATE_LIMIT_EXEMPT_PATHS
+    ):
+        self.store = store
+        self.per_minute = per_minute
+        self.per_ip_minute = per_ip_minute
+        self.routes = dict(settings.RATE_LIMIT_ROUTES if routes is None else routes)
+        self._patterns = [(re.compile(route), route) for route in self.routes]
+        self.exempt_paths = frozenset(exempt_paths)
+        self.allowed = 0
+        self.limited = 0
+
+    def check(self, identity: str, path: str, address: Optional[str] = None) -> float:
+        """Count a request; returns 0 if allowed, else seconds to wait before retrying."""
+        if path in self.exempt_paths:
+            return 0.0
+        return self._count(self._take(identity, path, address))
+
+    async def check_async(self, identity: str, path: str, address: Optional[str] = None) -> float:
+        """``check`` for the event loop; a networked store is called from a worker thread."""
+        if path in self.exempt_paths:
+            return 0.0
+        if self.store.blocking:
+            return self._count(await asyncio.to_thread(self._take, identity, path, address))
+        return self._count(self._take(identity, path, address))
+
+    def _take(self, identity: str, path: str, address: Optional[str]) -> float:
+        key, limit = identity, self.per_minute
+        route = self._route(path)
+        if route is not None:
+            key, limit = f"{identity}|{route}", self.routes[route]
+        wait = self.store.take(key, limit, limit / 60)
+        if address is not None:
+            # Charged even when the caller's bucket refused the request
+            wait = max(wait, self.store.take("addr:" + address, self.per_ip_minute, self.per_ip_minute / 60))
+        return wait
+
+    def _count(self, wait: float) -> float:
+        if wait:
+            self.limited += 1
+        else:
+            self.allowed += 1
+        return wait
+
+    def _route(self, path: str) -> Optional[str]:
+        """First configured route pattern fully matching ``path``."""
+        for pattern, route in self._patterns:
+            if pattern.fullmatch(path):
+                return route
+        return None
+
+    def reset_stats(self) -> None:
+        self.allowed = 0
+        self.limited = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for the metrics endpoint."""
+        return {"allowed": self.allowed, "limited": self.limited}
+
+def create_rate_limiter() -> RateLimiter:
+    """Build the limiter for the configured backend."""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        from app.core.redis import get_redis
+        return RateLimiter(RedisBucketStore(get_redis()))
+    return RateLimiter(InMemoryBucketStore())
+
+rate_limiter = create_rate_limiter()
@@ -0,0 +1,135 @@
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, List, Optional, Set
+import asyncio
+
+from app.core.config import settings
+
+class SubscriberOverflow(Exception):
+    """A subscriber fell too far behind and must reconnect."""
+
+class Subscriber:
+    """One connection's bounded outbox.
+
+    Messages published with a ``coalesce_key`` replace any queued message with
+    the same key, so a slow reader only ever sees the latest driver position.
+    If the queue still fills up, the subscriber is marked overflowed instead of
+    growing; its reader gets ``SubscriberOverflow`` and should disconnect.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._queue: Deque[List[Any]] = deque()
+        self._keyed: Dict[Hashable, List[Any]] = {}
+        self._ready = asyncio.Event()
+        self.overflowed = False
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def put(self, message: dict, coalesce_key: Optional[Hashable] = None) -> bool:
+        """Queue a message without blocking; returns False if the subscriber overflowed."""
+        if self.overflowed:
+            return False
+        if coalesce_key is not None:
+            queued = self._keyed.get(coalesce_key)
+            if queued is not None:
+                queued[0] = message
+                self.coalesced += 1
+                return True
+        if len(self._queue) >= self.maxsize:
+            self.overflowed = True
+            self._queue.clear()
+            self._keyed.clear()
+            self._ready.set()
+            return False
+
+        item = [message, coalesce_key]
+        self._queue.append(item)
+        if coalesce_key is not None:
+            self._keyed[coalesce_key] = item
+        self._ready.set()
+        return True
+
+    async def get(self) -> dict:
+        """Wait for the next message."""
+        while not self._queue:
+            if self.overflowed:
+                raise SubscriberOverflow()
+            self._ready.clear()
+            await self._ready.wait()
+        message, coalesce_key = self._queue.popleft()
+        if coalesce_key is not None:
+            self._keyed.pop(coalesce_key, None)
+        return message
+
+class RealtimeHub:
+    """In-process topic fan-out to connected clients.
+
+    Subscribers live on the event loop; ``publish`` may be called from the loop
+    or from worker threads and never blocks on a slow client.
+    """
+
+    def __init__(self, queue_size: int = settings.REALTIME_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._topics: Dict[str, Set[Subscriber]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+
+    def subscribe(self, topic: str) -> Subscriber:
+        """Register a subscriber; must be called on the event loop."""
+        self._loop = asyncio.get_running_loop()
+        subscriber = Subscriber(self.queue_size)
+        self._topics.setdefault(topic, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, topic: str, subscriber: Subscriber) -> None:
+        subscribers = self._topics.get(topic)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._topics[topic]
+
+    def subscriber_count(self, topic: Optional[str] = None) -> int:
+        if topic is not None:
+            return len(self._topics.get(topic, ()))
+        return sum(len(subscribers) for subscribers in self._topics.values())
+
+    def publish(self, topic: str, message: dict, coalesce_key: Optional[Hashable] = None) -> int:
+        """Queue a message for every subscriber of a topic; returns how many there are."""
+        subscribers = self._topics.get(topic)
+        if not subscribers:
+            return 0
+        self.published += 1
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._deliver(topic, message, coalesce_key)
+        else:
+            self._loop.call_soon_threadsafe(self._deliver, topic, message, coalesce_key)
+        return len(subscribers)
+
+    def _deliver(self, topic: str, message: dict, coalesce_key: Optional[Hashable]) -> None:
+        for subscriber in list(self._topics.get(topic, ())):
+            if subscriber.put(message, coalesce_key):
+                self.delivered += 1
+            elif subscriber.overflowed:
+                self.overflows += 1
+                self.unsubscribe(topic, subscriber)
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for the metrics endpoint."""
+        return {
+            "topics": len(self._topics),
+            "subscribers": self.subscriber_count(),
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+        }
+
+realtime_hub = RealtimeHub()
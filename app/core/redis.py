@@ -0,0 +1,12 @@
+from functools import lru_cache
+import redis
+from app.core.config import settings
+
+@lru_cache
+def get_redis() -> redis.Redis:
+    """Shared Redis client; connects lazily on first command."""
+    return redis.Redis.from_url(
+        settings.REDIS_URL,
+        password=settings.REDIS_PASSWORD,
+        decode_responses=True
+    )
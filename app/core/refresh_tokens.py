@@ -0,0 +1,112 @@
+from typing import Dict, Optional
+import threading
+import uuid
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+class InMemoryRefreshFamilyBackend:
+    """Per-process refresh families in a bounded LRU cache.
+
+    Entries carry the family's TTL, so sessions that are never refreshed
+    lapse, and the least recently used are evicted once ``maxsize`` is hit.
+    """
+
+    def __init__(self, maxsize: int = settings.REFRESH_FAMILY_CACHE_SIZE):
+        self._entries = LRUCache(maxsize)
+        # Makes the read and write in swap one step
+        self._lock = threading.Lock()
+
+    def start(self, family_id: str, jti: str, ttl: float) -> None:
+        self._entries.set(family_id, jti, ttl)
+
+    def swap(self, family_id: str, jti: str, ttl: float) -> Optional[str]:
+        """Replace a live family's token id, returning the previous one (None if gone)."""
+        with self._lock:
+            previous = self._entries.get(family_id)
+            if previous is not None:
+                self._entries.set(family_id, jti, ttl)
+            return previous
+
+    def delete(self, family_id: str) -> None:
+        self._entries.invalidate(family_id)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+class RedisRefreshFamilyBackend:
+    """Refresh families shared across workers; SET XX GET makes each rotation one atomic swap."""
+
+    def __init__(self, client, prefix: str = "refresh_family:"):
+        self.client = client
+        self.prefix = prefix
+
+    def start(self, family_id: str, jti: str, ttl: float) -> None:
+        self.client.set(self.prefix + family_id, jti, px=max(1, int(ttl * 1000)))
+
+    def swap(self, family_id: str, jti: str, ttl: float) -> Optional[str]:
+        previous = self.client.set(self.prefix + family_id, jti, px=max(1, int(ttl * 1000)), xx=True, get=True)
+        return previous.decode() if isinstance(previous, bytes) else previous
+
+    def delete(self, family_id: str) -> None:
+        self.client.delete(self.prefix + family_id)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+class RefreshTokenFamilies:
+    """Tracks the one live refresh token of each login session.
+
+    A login starts a family; every refresh swaps in the new token's id. If a
+    refresh presents any other id, an older token of the family is being
+    replayed, so the whole family is ended and its holder must log in again.
+    """
+
+    def __init__(self, backend, ttl: float = settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400):
+        self.backend = backend
+        self.ttl = ttl
+        self.started = 0
+        self.rotated = 0
+        self.reuse_detected = 0
+
+    def start(self, jti: str) -> str:
+        """Open a family for a freshly issued refresh token; returns its id."""
+        family_id = uuid.uuid4().hex
+        self.backend.start(family_id, jti, self.ttl)
+        self.started += 1
+        return family_id
+
+    def rotate(self, family_id: str, jti: str, new_jti: str) -> bool:
+        """Move a family from ``jti`` to ``new_jti``; False if ``jti`` was not its live token."""
+        previous = self.backend.swap(family_id, new_jti, self.ttl)
+        if previous == jti:
+            self.rotated += 1
+            return True
+        if previous is not None:
+            self.backend.delete(family_id)
+            self.reuse_detected += 1
+        return False
+
+    def end(self, family_id: str) -> None:
+        self.backend.delete(family_id)
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for the metrics endpoint."""
+        return {
+            "started": self.started,
+            "rotated": self.rotated,
+            "reuse_detected": self.reuse_detected,
+        }
+
+def create_refresh_families() -> RefreshTokenFamilies:
+    """Build the family store for the configured backend."""
+    if settings.REFRESH_TOKEN_BACKEND == "redis":
+        from app.core.redis import get_redis
+        return RefreshTokenFamilies(RedisRefreshFamilyBackend(get_redis()))
+    return RefreshTokenFamilies(InMemoryRefreshFamilyBackend())
+
+refresh_families = create_refresh_families()
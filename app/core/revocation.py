@@ -0,0 +1,174 @@
+from typing import Any, Dict, Optional
+import asyncio
+import logging
+import math
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings.
+
+    Bit positions come from Python's string hash, which the string caches, so
+    a lookup builds no digests or buffers. Hashes are salted per process, so a
+    filter must never be shared between workers.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def add(self, key: str) -> None:
+        digest = hash(key)
+        first, step = digest & 0xFFFFFFFF, (digest >> 32) & 0xFFFFFFFF | 1
+        for index in range(self.hashes):
+            position = (first + index * step) % self.size
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        digest = hash(key)
+        first, step = digest & 0xFFFFFFFF, (digest >> 32) & 0xFFFFFFFF | 1
+        for index in range(self.hashes):
+            position = (first + index * step) % self.size
+            if not self._bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+class InMemoryRevocationBackend:
+    """Per-process revocations; nothing is shared between workers."""
+
+    def __init__(self):
+        self._entries: Dict[str, float] = {}
+        # load runs in a worker thread while add runs on the event loop
+        self._lock = threading.Lock()
+
+    def add(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._entries[jti] = expires_at
+
+    def load(self, now: float) -> Dict[str, float]:
+        """Drop expired revocations and return the rest."""
+        with self._lock:
+            for jti in [jti for jti, expires_at in self._entries.items() if expires_at <= now]:
+                del self._entries[jti]
+            return dict(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+class RedisRevocationBackend:
+    """Revocations shared across workers in a sorted set scored by token expiry."""
+
+    def __init__(self, client, key: str = "revoked_tokens"):
+        self.client = client
+        self.key = key
+
+    def add(self, jti: str, expires_at: float) -> None:
+        self.client.zadd(self.key, {jti: expires_at})
+
+    def load(self, now: float) -> Dict[str, float]:
+        """Drop expired revocations and return the rest."""
+        self.client.zremrangebyscore(self.key, "-inf", now)
+        return {
+            jti.decode() if isinstance(jti, bytes) else jti: float(expires_at)
+            for jti, expires_at in self.client.zrange(self.key, 0, -1, withscores=True)
+        }
+
+    def clear(self) -> None:
+        self.client.delete(self.key)
+
+class RevocationList:
+    """Denylist of revoked token ids, checked on every authenticated request.
+
+    A Bloom filter answers the common case, a token that was never revoked,
+    without touching the exact map of jti -> expiry; filter hits are confirmed
+    against the map. Revocations lapse once their token would have expired.
+    ``sync`` reloads from the backend, picking up other workers' revocations
+    and rebuilding the filter without the expired ones. ``refresh`` does the
+    same from the event loop, reading the backend in a worker thread but
+    merging and swapping on the loop, where ``revoke`` also runs.
+    """
+
+    def __init__(
+        self,
+        backend,
+        capacity: int = settings.TOKEN_REVOCATION_CAPACITY,
+        error_rate: float = settings.TOKEN_REVOCATION_ERROR_RATE
+    ):
+        self.backend = backend
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.clear()
+
+    def clear(self) -> None:
+        self._revoked: Dict[str, float] = {}
+        self._filter = BloomFilter(self.capacity, self.error_rate)
+        self.false_positives = 0
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        """Reject a token id until ``expires_at`` (epoch seconds)."""
+        if expires_at <= time.time():
+            return
+        self.backend.add(jti, expires_at)
+        self._revoked[jti] = expires_at
+        self._filter.add(jti)
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        if jti is None or jti not in self._filter:
+            return False
+        expires_at = self._revoked.get(jti)
+        if expires_at is None:
+            self.false_positives += 1
+            return False
+        return expires_at > time.time()
+
+    def sync(self) -> int:
+        """Reload revocations from the backend; returns how many are live."""
+        now = time.time()
+        return self._apply(self.backend.load(now), now)
+
+    async def refresh(self) -> int:
+        """``sync`` with only the backend read off the event loop."""
+        now = time.time()
+        return self._apply(await asyncio.to_thread(self.backend.load, now), now)
+
+    def _apply(self, revoked: Dict[str, float], now: float) -> int:
+        # Keep local revocations made since the backend was read
+        revoked.update((jti, expires_at) for jti, expires_at in self._revoked.items() if expires_at > now)
+        bloom = BloomFilter(max(self.capacity, 2 * len(revoked)), self.error_rate)
+        for jti in revoked:
+            bloom.add(jti)
+        self._revoked, self._filter = revoked, bloom
+        return len(revoked)
+
+    async def run(self, interval: float) -> None:
+        """Sync from the backend every ``interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Failed to sync revoked tokens")
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint."""
+        return {
+            "revoked": len(self._revoked),
+            "filter_bits": self._filter.size,
+            "filter_hashes": self._filter.hashes,
+            "false_positives": self.false_positives,
+        }
+
+def create_revocation_list() -> RevocationList:
+    """Build the denylist for the configured backend."""
+    if settings.TOKEN_REVOCATION_BACKEND == "redis":
+        from app.core.redis import get_redis
+        return RevocationList(RedisRevocationBackend(get_redis()))
+    return RevocationList(InMemoryRevocationBackend())
+
+revoked_tokens = create_revocation_list()
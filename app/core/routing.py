@@ -0,0 +1,347 @@
+import csv
+import heapq
+import math
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.spatial import EARTH_RADIUS_KM, GridIndex, haversine_km
+
+EDGE_COLUMNS = (
+    "source", "target", "source_lat", "source_lon", "target_lat", "target_lon",
+    "length_m", "speed_kmh", "oneway",
+)
+
+# Stand-in for "no path" in landmark tables; keeps the bounds finite and valid
+UNREACHABLE_SECONDS = 1e9
+
+@dataclass
+class Route:
+    distance_km: float
+    duration_seconds: float
+    routed: bool  # False when the straight-line fallback was used
+
+def _csr(num_nodes: int, tails: np.ndarray, heads: np.ndarray, *weights: np.ndarray) -> tuple:
+    order = np.argsort(tails, kind="stable")
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(tails, minlength=num_nodes), out=indptr[1:])
+    return (array("q", indptr.tobytes()), array("q", heads[order].astype(np.int64).tobytes())) + tuple(
+        array("d", weight[order].astype(np.float64).tobytes()) for weight in weights
+    )
+
+class RoadGraph:
+    """Directed road network in compressed sparse row form.
+
+    Nodes are numbered 0..n-1. Forward and reverse adjacency are each stored as
+    flat ``indptr``/``heads``/``seconds``/``metres`` arrays, which keeps a
+    city-sized graph to a few tens of megabytes and makes edge scans cheap.
+    Optional landmark tables (``add_landmarks``) tighten the A* bounds; they
+    are slow to build, so build them offline and ``save`` them with the graph.
+    """
+
+    def __init__(
+        self,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        tails: np.ndarray,
+        heads: np.ndarray,
+        metres: np.ndarray,
+        seconds: np.ndarray,
+        landmarks: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+        snap_cell_km: float = 0.25
+    ):
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        tails = np.asarray(tails, dtype=np.int64)
+        heads = np.asarray(heads, dtype=np.int64)
+        metres = np.asarray(metres, dtype=np.float64)
+        seconds = np.asarray(seconds, dtype=np.float64)
+        num_nodes = len(self.latitudes)
+
+        self.forward = _csr(num_nodes, tails, heads, seconds, metres)
+        self.backward = _csr(num_nodes, heads, tails, seconds, metres)
+        self._tails, self._heads, self._metres, self._seconds = tails, heads, metres, seconds
+
+        # Fastest speed anywhere keeps the A* heuristic admissible
+        self.max_speed_mps = float((metres / np.maximum(seconds, 1e-9)).max()) if len(metres) else 1.0
+        self._lat_rad = array("d", np.radians(self.latitudes).tobytes())
+        self._lon_rad = array("d", np.radians(self.longitudes).tobytes())
+        self._cos_lat = array("d", np.cos(np.radians(self.latitudes)).tobytes())
+
+        self.num_landmarks = 0
+        if landmarks is not None:
+            self._set_landmarks(*landmarks)
+
+        self._snap = GridIndex(snap_cell_km)
+        for node, (latitude, longitude) in enumerate(zip(self.latitudes.tolist(), self.longitudes.tolist())):
+            self._snap.upsert(node, latitude, longitude)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.latitudes)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self._tails)
+
+    @property
+    def landmarks(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """(from_landmark, to_landmark) travel times, each shaped (landmarks, nodes)."""
+        if not self.num_landmarks:
+            return None
+        shape = (self.num_nodes, self.num_landmarks)
+        return (
+            np.frombuffer(self._from_landmark, dtype=np.float64).reshape(shape).T,
+            np.frombuffer(self._to_landmark, dtype=np.float64).reshape(shape).T,
+        )
+
+    def add_landmarks(self, count: int = 8) -> None:
+        """Precompute ALT tables for ``count`` landmarks around the edge of the map.
+
+        Runs two full Dijkstra searches per landmark.
+        """
+        # One landmark per bearing sector, as far from the centre as possible
+        d_lat = self.latitudes - self.latitudes.mean()
+        d_lon = (self.longitudes - self.longitudes.mean()) * np.cos(np.radians(self.latitudes.mean()))
+        sector = ((np.arctan2(d_lat, d_lon) + np.pi) / (2 * np.pi) * count).astype(np.int64) % count
+        radius = d_lat ** 2 + d_lon ** 2
+        chosen = [
+            int(np.flatnonzero(sector == index)[radius[sector == index].argmax()])
+            for index in range(count) if (sector == index).any()
+        ]
+        self._set_landmarks(
+            np.array([_dijkstra_all(self.forward, node) for node in chosen]),
+            np.array([_dijkstra_all(self.backward, node) for node in chosen]),
+        )
+
+    def _set_landmarks(self, from_landmark: np.ndarray, to_landmark: np.ndarray) -> None:
+        # Node-major layout so one node's bounds are a contiguous slice
+        self.num_landmarks = len(from_landmark)
+        self._from_landmark = array("d", np.ascontiguousarray(np.asarray(from_landmark, dtype=np.float64).T).tobytes())
+        self._to_landmark = array("d", np.ascontiguousarray(np.asarray(to_landmark, dtype=np.float64).T).tobytes())
+
+    @classmethod
+    def from_csv(cls, path: str, default_speed_kmh: float = settings.AVERAGE_SPEED_KMH) -> "RoadGraph":
+        """Load an OSM-style edge list with the columns in ``EDGE_COLUMNS``.
+
+        ``source``/``target`` are arbitrary node ids; ``length_m`` and
+        ``speed_kmh`` may be blank, falling back to the straight-line length
+        and ``default_speed_kmh``. Edges are two-way unless ``oneway`` is 1.
+        """
+        node_ids: Dict[str, int] = {}
+        latitudes, longitudes = [], []
+        tails, heads, metres, speeds = [], [], [], []
+
+        def node(node_id: str, latitude: str, longitude: str) -> int:
+            index = node_ids.get(node_id)
+            if index is None:
+                index = node_ids[node_id] = len(latitudes)
+                latitudes.append(float(latitude))
+                longitudes.append(float(longitude))
+            return index
+
+        with open(path, newline="") as handle:
+            for row in csv.DictReader(handle):
+                tail = node(row["source"], row["source_lat"], row["source_lon"])
+                head = node(row["target"], row["target_lat"], row["target_lon"])
+                length = row.get("length_m")
+                length = float(length) if length else 1000 * haversine_km(
+                    latitudes[tail], longitudes[tail], latitudes[head], longitudes[head]
+                )
+                speed = row.get("speed_kmh")
+                speed = float(speed) if speed else default_speed_kmh
+                directions = [(tail, head)]
+                if row.get("oneway", "0").strip().lower() not in ("1", "true", "yes"):
+                    directions.append((head, tail))
+                for a, b in directions:
+                    tails.append(a)
+                    heads.append(b)
+                    metres.append(length)
+                    speeds.append(speed)
+
+        metres = np.array(metres, dtype=np.float64)
+        seconds = metres / (np.array(speeds, dtype=np.float64) / 3.6)
+        return cls(np.array(latitudes), np.array(longitudes), np.array(tails), np.array(heads), metres, seconds)
+
+    @classmethod
+    def from_npz(cls, path: str) -> "RoadGraph":
+        """Load a graph previously written with ``save``."""
+        with np.load(path) as data:
+            landmarks = None
+            if "from_landmark" in data:
+                landmarks = (data["from_landmark"], data["to_landmark"])
+            return cls(
+                data["latitudes"], data["longitudes"], data["tails"], data["heads"],
+                data["metres"], data["seconds"], landmarks=landmarks
+            )
+
+    def save(self, path: str) -> None:
+        """Write the graph, and any landmarks, as an ``.npz`` that loads much faster than CSV."""
+        arrays = dict(
+            latitudes=self.latitudes, longitudes=self.longitudes,
+            tails=self._tails, heads=self._heads, metres=self._metres, seconds=self._seconds
+        )
+        if self.num_landmarks:
+            arrays["from_landmark"], arrays["to_landmark"] = self.landmarks
+        np.savez_compressed(path, **arrays)
+
+    def snap(self, latitude: float, longitude: float, max_km: float) -> Optional[Tuple[int, float]]:
+        """Get the closest node within ``max_km`` as (node, distance_km)."""
+        nearest = self._snap.nearest(latitude, longitude, k=1, radius_km=max_km)
+        return nearest[0] if nearest else None
+
+    def shortest_path(self, source: int, target: int) -> Optional[Tuple[float, float]]:
+        """Get the fastest route between two nodes as (seconds, metres).
+
+        Bidirectional A* with the average of the forward and reverse
+        potentials, which stays consistent for both searches so the usual
+        "top keys exceed the best meeting" stopping rule holds. Each potential
+        is the larger of the straight-line bound and, when present, the
+        landmark (ALT) bound. Returns None when the target is unreachable.
+        """
+        if source == target:
+            return 0.0, 0.0
+
+        lat, lon, cos_lat = self._lat_rad, self._lon_rad, self._cos_lat
+        # Straight-line metres, converted to a lower bound on seconds
+        scale = 2 * EARTH_RADIUS_KM * 1000 / self.max_speed_mps
+        s_lat, s_lon, s_cos = lat[source], lon[source], cos_lat[source]
+        t_lat, t_lon, t_cos = lat[target], lon[target], cos_lat[target]
+        potentials: Dict[int, float] = {}
+        count = self.num_landmarks
+        if count:
+            from_lm, to_lm = self._from_landmark, self._to_landmark
+            s_from, s_to = from_lm[source * count:(source + 1) * count], to_lm[source * count:(source + 1) * count]
+            t_from, t_to = from_lm[target * count:(target + 1) * count], to_lm[target * count:(target + 1) * count]
+
+        def potential(v: int) -> float:
+            value = potentials.get(v)
+            if value is None:
+                v_lat, v_lon, v_cos = lat[v], lon[v], cos_lat[v]
+                a = (math.sin((t_lat - v_lat) / 2) ** 2
+                     + v_cos * t_cos * math.sin((t_lon - v_lon) / 2) ** 2)
+                b = (math.sin((v_lat - s_lat) / 2) ** 2
+                     + s_cos * v_cos * math.sin((v_lon - s_lon) / 2) ** 2)
+                to_target = scale * math.asin(min(1.0, math.sqrt(a)))
+                from_source = scale * math.asin(min(1.0, math.sqrt(b)))
+                if count:
+                    # Triangle inequality through each landmark
+                    v_from, v_to = from_lm[v * count:(v + 1) * count], to_lm[v * count:(v + 1) * count]
+                    to_target = max(
+                        to_target,
+                        max(map(float.__sub__, t_from, v_from)),
+                        max(map(float.__sub__, v_to, t_to))
+                    )
+                    from_source = max(
+                        from_source,
+                        max(map(float.__sub__, v_from, s_from)),
+                        max(map(float.__sub__, s_to, v_to))
+                    )
+                value = potentials[v] = 0.5 * (to_target - from_source)
+            return value
+
+        inf = math.inf
+        dist = ({source: 0.0}, {target: 0.0})
+        length = ({source: 0.0}, {target: 0.0})
+        settled = (set(), set())
+        # Forward keys are d + p(v), reverse keys d - p(v)
+        heaps = ([(potential(source), source)], [(-potential(target), target)])
+        graphs = (self.forward, self.backward)
+        best, best_length = inf, 0.0
+
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+            side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+            heap = heaps[side]
+            _, u = heapq.heappop(heap)
+            if u in settled[side]:
+                continue
+            settled[side].add(u)
+
+            sign = 1.0 if side == 0 else -1.0
+            indptr, heads, seconds, metres = graphs[side]
+            dist_here, length_here = dist[side], length[side]
+            dist_other, length_other = dist[1 - side], length[1 - side]
+            d_u, l_u = dist_here[u], length_here[u]
+            for edge in range(indptr[u], indptr[u + 1]):
+                v = heads[edge]
+                d_v = d_u + seconds[edge]
+                if d_v < dist_here.get(v, inf):
+                    dist_here[v] = d_v
+                    length_here[v] = l_u + metres[edge]
+                    heapq.heappush(heap, (d_v + sign * potential(v), v))
+                    total = d_v + dist_other.get(v, inf)
+                    if total < best:
+                        best = total
+                        best_length = length_here[v] + length_other[v]
+
+        if best == inf:
+            return None
+        return best, best_length
+
+def _dijkstra_all(graph: tuple, source: int) -> List[float]:
+    """Travel time from ``source`` to every node over one CSR direction."""
+    indptr, heads, seconds = graph[0], graph[1], graph[2]
+    dist = [UNREACHABLE_SECONDS] * (len(indptr) - 1)
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        d_u, u = heapq.heappop(heap)
+        if d_u > dist[u]:
+            continue
+        for edge in range(indptr[u], indptr[u + 1]):
+            v = heads[edge]
+            d_v = d_u + seconds[edge]
+            if d_v < dist[v]:
+                dist[v] = d_v
+                heapq.heappush(heap, (d_v, v))
+    return dist
+
+class Router:
+    """Point-to-point travel estimates over an optional road graph.
+
+    Endpoints snap to the nearest graph node; the walk to and from the network
+    is costed with the straight-line model. Without a graph, or when a point
+    is off the network, the whole trip uses that model: haversine distance
+    times ``ROAD_DETOUR_FACTOR`` at ``AVERAGE_SPEED_KMH``.
+    """
+
+    def __init__(self, graph: Optional[RoadGraph] = None, max_snap_km: float = settings.ROUTING_MAX_SNAP_KM):
+        self.graph = graph
+        self.max_snap_km = max_snap_km
+
+    def load(self, path: str) -> RoadGraph:
+        """Load a ``.csv`` edge list or a saved ``.npz`` graph."""
+        self.graph = RoadGraph.from_npz(path) if path.endswith(".npz") else RoadGraph.from_csv(path)
+        return self.graph
+
+    def route(self, from_lat: float, from_lon: float, to_lat: float, to_lon: float) -> Route:
+        """Estimate driving distance and time between two points."""
+        if self.graph is not None:
+            source = self.graph.snap(from_lat, from_lon, self.max_snap_km)
+            target = self.graph.snap(to_lat, to_lon, self.max_snap_km)
+            if source is not None and target is not None:
+                path = self.graph.shortest_path(source[0], target[0])
+                if path is not None:
+                    access = _straight_line(source[1] + target[1])
+                    return Route(
+                        distance_km=path[1] / 1000 + access.distance_km,
+                        duration_seconds=path[0] + access.duration_seconds,
+                        routed=True
+                    )
+        return _straight_line(haversine_km(from_lat, from_lon, to_lat, to_lon))
+
+def _straight_line(distance_km: float) -> Route:
+    distance_km *= settings.ROAD_DETOUR_FACTOR
+    return Route(
+        distance_km=distance_km,
+        duration_seconds=distance_km / settings.AVERAGE_SPEED_KMH * 3600,
+        routed=False
+    )
+
+# Loaded from ROAD_GRAPH_PATH at startup, if configured
+road_router = Router()
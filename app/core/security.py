@@ -1,9 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Any, Callable, Dict, Optional, Union
+import asyncio
+import hashlib
+import threading
+import time
+import uuid
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from app.core.config import settings
+from app.core.cache import LRUCache
+from app.core.revocation import revoked_tokens
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -16,6 +24,75 @@ def get_password_hash(password: str) -> str:
     """Hash a password."""
     return pwd_context.hash(password)
 
+class PasswordHashTimeout(Exception):
+    """A hash waited longer than the queue timeout for a free worker."""
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool so it never blocks the event loop.
+
+    At most ``workers`` hashes run at once (bcrypt releases the GIL while it
+    works). A call that waits longer than ``queue_timeout`` seconds for a free
+    worker is rejected with 503 rather than adding to the backlog.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.PASSWORD_HASH_WORKERS,
+        queue_timeout: float = settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS
+    ):
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_wait = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def _run(self, func: Callable[..., Any], *args) -> Any:
+        with self._lock:
+            self.queued += 1
+        future = self._executor.submit(self._call, time.monotonic(), func, *args)
+        try:
+            return await asyncio.wrap_future(future)
+        except PasswordHashTimeout:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-ins in progress, try again shortly",
+                headers={"Retry-After": "1"}
+            )
+
+    def _call(self, submitted: float, func: Callable[..., Any], *args) -> Any:
+        waited = time.monotonic() - submitted
+        with self._lock:
+            self.queued -= 1
+            self.max_wait = max(self.max_wait, waited)
+            if waited > self.queue_timeout:
+                self.rejected += 1
+                raise PasswordHashTimeout()
+        result = func(*args)
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint."""
+        return {
+            "workers": self.workers,
+            "queued": self.queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+password_hasher = PasswordHasher()
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create an access token."""
     to_encode = data.copy()
@@ -25,6 +102,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire, "type": "access"})
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -33,22 +111,45 @@ def create_refresh_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+# Token digest -> verified claims, so a client's repeated bearer token skips
+# the signature check and decode; each entry expires with its token
+token_cache = LRUCache(settings.TOKEN_VERIFY_CACHE_SIZE)
+
 def verify_token(token: str, token_type: str = "access") -> dict:
     """Verify and decode a JWT token."""
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        if payload.get("type") != token_type:
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token type"
+                detail="Could not validate credentials"
             )
-        return payload
-    except JWTError:
+        remaining = payload.get("exp", 0) - time.time()
+        if remaining > 0:
+            token_cache.set(key, payload, ttl=remaining)
+    
+    if payload.get("type") != token_type:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
+            detail="Invalid token type"
         )
+    if revoked_tokens.is_revoked(payload.get("jti")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked"
+        )
+    # Callers get their own copy of the cached claims
+    return dict(payload)
+
+def revoke_token(payload: dict) -> None:
+    """Reject a verified token from now until it expires."""
+    if payload.get("jti"):
+        revoked_tokens.revoke(payload["jti"], payload["exp"])
 
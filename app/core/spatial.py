@@ -0,0 +1,163 @@
+import math
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+Cell = Tuple[int, int]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def snap_to_cell(latitude: float, longitude: float, cell_km: float) -> Tuple[float, float]:
+    """Centre of the ``cell_km`` grid cell containing a point."""
+    cell_deg = cell_km / KM_PER_DEGREE
+    return (
+        (math.floor(latitude / cell_deg) + 0.5) * cell_deg,
+        (math.floor(longitude / cell_deg) + 0.5) * cell_deg,
+    )
+
+
+class GridIndex:
+    """In-memory point index bucketed on a uniform lat/lon grid.
+
+    Queries walk rings of cells outwards from the query point and stop as soon
+    as no unvisited cell can hold a closer point, so the cost depends on local
+    density rather than on the total number of indexed points.
+    """
+
+    def __init__(self, cell_km: float = 1.0):
+        self.cell_km = cell_km
+        self.cell_deg = cell_km / KM_PER_DEGREE
+        self._cells: Dict[Cell, Dict[str, Tuple[float, float]]] = {}
+        self._points: Dict[str, Tuple[float, float, Cell]] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._points
+
+    def _cell(self, latitude: float, longitude: float) -> Cell:
+        return (math.floor(latitude / self.cell_deg), math.floor(longitude / self.cell_deg))
+
+    def upsert(self, key: str, latitude: float, longitude: float) -> None:
+        """Insert a point or move it to a new position."""
+        cell = self._cell(latitude, longitude)
+        previous = self._points.get(key)
+        if previous is not None and previous[2] != cell:
+            self._discard_from_cell(key, previous[2])
+        self._cells.setdefault(cell, {})[key] = (latitude, longitude)
+        self._points[key] = (latitude, longitude, cell)
+
+    def remove(self, key: str) -> bool:
+        """Remove a point; returns False if it was not indexed."""
+        previous = self._points.pop(key, None)
+        if previous is None:
+            return False
+        self._discard_from_cell(key, previous[2])
+        return True
+
+    def get(self, key: str) -> Optional[Tuple[float, float]]:
+        """Get the indexed position of a point."""
+        point = self._points.get(key)
+        return (point[0], point[1]) if point else None
+
+    def items(self) -> Iterator[Tuple[str, float, float]]:
+        """Iterate over (key, latitude, longitude) for every indexed point."""
+        for key, (latitude, longitude, _) in self._points.items():
+            yield key, latitude, longitude
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._points.clear()
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: Optional[int] = None,
+        radius_km: Optional[float] = None,
+    ) -> List[Tuple[str, float]]:
+        """Get up to ``k`` points within ``radius_km``, closest first, as (key, distance_km)."""
+        if not self._points or k == 0:
+            return []
+
+        center_lat, center_lon = self._cell(latitude, longitude)
+        found: List[Tuple[float, str]] = []
+        visited = 0
+        ring = 0
+        while True:
+            for cell in self._ring(center_lat, center_lon, ring):
+                bucket = self._cells.get(cell)
+                if not bucket:
+                    continue
+                visited += len(bucket)
+                for key, (lat, lon) in bucket.items():
+                    distance = haversine_km(latitude, longitude, lat, lon)
+                    if radius_km is None or distance <= radius_km:
+                        found.append((distance, key))
+
+            # Every unvisited point lies at least ``ring`` whole cells away.
+            cleared_km = ring * self.cell_km * self._lon_scale(latitude, ring + 1)
+            if visited >= len(self._points):
+                break
+            if radius_km is not None and cleared_km > radius_km:
+                break
+            if k is not None and len(found) >= k:
+                found.sort()
+                del found[k:]
+                if found[-1][0] <= cleared_km:
+                    break
+            ring += 1
+
+        found.sort()
+        if k is not None:
+            del found[k:]
+        return [(key, distance) for distance, key in found]
+
+    def within_radius(self, latitude: float, longitude: float, radius_km: float) -> List[Tuple[str, float]]:
+        """Get every point within ``radius_km``, closest first."""
+        return self.nearest(latitude, longitude, radius_km=radius_km)
+
+    def _lon_scale(self, latitude: float, rings: int) -> float:
+        # Longitude cells narrow towards the poles; use the narrowest latitude reached.
+        extent = min(abs(latitude) + rings * self.cell_deg, 89.0)
+        return math.cos(math.radians(extent))
+
+    @staticmethod
+    def _ring(center_lat: int, center_lon: int, ring: int) -> Iterator[Cell]:
+        if ring == 0:
+            yield (center_lat, center_lon)
+            return
+        for dlon in range(-ring, ring + 1):
+            yield (center_lat - ring, center_lon + dlon)
+            yield (center_lat + ring, center_lon + dlon)
+        for dlat in range(-ring + 1, ring):
+            yield (center_lat + dlat, center_lon - ring)
+            yield (center_lat + dlat, center_lon + ring)
+
+    def _discard_from_cell(self, key: str, cell: Cell) -> None:
+        bucket = self._cells.get(cell)
+        if bucket is None:
+            return
+        bucket.pop(key, None)
+        if not bucket:
+            del self._cells[cell]
+
+
+# Latest known positions of online drivers
+driver_index = GridIndex(settings.DRIVER_INDEX_CELL_KM)
+
+# Pickup points of rides still waiting for a driver, keyed by ride id
+pending_pickups = GridIndex(settings.PICKUP_INDEX_CELL_KM)
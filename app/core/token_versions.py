@@ -0,0 +1,70 @@
+from typing import Dict, Optional, Tuple
+import time
+
+from app.core.config import settings
+
+class InMemoryTokenVersionBackend:
+    """Per-process minimum token versions; expired entries are dropped lazily on read."""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[int, float]] = {}
+
+    def get(self, user_id: str) -> Optional[int]:
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[1] <= time.time():
+            del self._entries[user_id]
+            entry = None
+        return entry[0] if entry else None
+
+    def set(self, user_id: str, version: int, ttl: float) -> None:
+        self._entries[user_id] = (version, time.time() + ttl)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+class RedisTokenVersionBackend:
+    """Minimum token versions shared across workers; Redis key expiry implements the TTL."""
+
+    def __init__(self, client, prefix: str = "token_version:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, user_id: str) -> Optional[int]:
+        value = self.client.get(self.prefix + user_id)
+        return int(value) if value is not None else None
+
+    def set(self, user_id: str, version: int, ttl: float) -> None:
+        self.client.set(self.prefix + user_id, str(version), px=max(1, int(ttl * 1000)))
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+class TokenVersionRegistry:
+    """Revokes stateless access tokens issued before a user's claims changed.
+
+    Tokens carry the user's ``token_version``; bumping it records the new
+    minimum here. Entries only need to outlive the access tokens they
+    revoke, so they expire after one token lifetime.
+    """
+
+    def __init__(self, backend, ttl: float = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60):
+        self.backend = backend
+        self.ttl = ttl
+
+    def revoke_before(self, user_id: str, version: int) -> None:
+        """Reject the user's tokens with a version below ``version``."""
+        self.backend.set(user_id, version, self.ttl)
+
+    def is_current(self, user_id: str, version: int) -> bool:
+        minimum = self.backend.get(user_id)
+        return minimum is None or version >= minimum
+
+def create_token_version_registry() -> TokenVersionRegistry:
+    """Build the registry for the configured backend."""
+    if settings.TOKEN_VERSION_BACKEND == "redis":
+        from app.core.redis import get_redis
+        return TokenVersionRegistry(RedisTokenVersionBackend(get_redis()))
+    return TokenVersionRegistry(InMemoryTokenVersionBackend())
+
+token_versions = create_token_version_registry()
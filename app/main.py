@@ -4,20 +4,86 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from contextlib import asynccontextmanager, contextmanager
+import asyncio
 import time
 import logging
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import async_engine, get_db
 from app.api.v1 import auth, users, rides, payments, notifications, drivers
+from app.services.location_service import location_buffer
+from app.services.ride_service import RideService, quote_cache, invalidate_quotes
+from app.services.auth_service import user_cache
+from app.services.dispatch_service import dispatcher
+from app.services.surge_service import surge_engine
+from app.services.notification_service import notification_stream
+from app.services.offer_service import offer_feed
+from app.core.presence import presence
+from app.core.spatial import driver_index
+from app.core.routing import road_router
+from app.core.realtime import realtime_hub
+from app.core.events import event_bus, RedisEventBridge
+from app.core.security import password_hasher, token_cache
+from app.core.revocation import revoked_tokens
+from app.core.refresh_tokens import refresh_families
+from app.core.rate_limit import rate_limiter
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.core.admission import admission_controller
+from app.middleware.admission import AdmissionMiddleware
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Schema changes ship as Alembic migrations: run `alembic upgrade head` (or scripts/init_db.py)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@contextmanager
+def db_session_scope():
+    """Session for background work, honouring any get_db override."""
+    provider = app.dependency_overrides.get(get_db, get_db)
+    yield from provider()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run background workers for the lifetime of the app."""
+    if settings.ROAD_GRAPH_PATH and road_router.graph is None:
+        graph = await asyncio.to_thread(road_router.load, settings.ROAD_GRAPH_PATH)
+        logger.info("Loaded road graph with %d nodes and %d edges", graph.num_nodes, graph.num_edges)
+        invalidate_quotes()
+    
+    with db_session_scope() as db:
+        RideService(db).index_pending_rides()
+    await revoked_tokens.refresh()
+    
+    tasks = [
+        asyncio.create_task(location_buffer.run(db_session_scope, settings.LOCATION_FLUSH_INTERVAL_SECONDS)),
+        asyncio.create_task(presence.run(driver_index, settings.PRESENCE_SWEEP_INTERVAL_SECONDS)),
+        asyncio.create_task(surge_engine.run(settings.SURGE_RECOMPUTE_SECONDS)),
+        asyncio.create_task(notification_stream.run(settings.NOTIFICATION_HEARTBEAT_SECONDS)),
+        asyncio.create_task(event_bus.run()),
+        asyncio.create_task(offer_feed.run(event_bus)),
+        asyncio.create_task(revoked_tokens.run(settings.TOKEN_REVOCATION_SYNC_SECONDS)),
+    ]
+    if settings.ADMISSION_CONTROL_ENABLED:
+        tasks.append(asyncio.create_task(admission_controller.run(settings.ADMISSION_SAMPLE_INTERVAL_SECONDS)))
+    if settings.EVENT_BUS_BACKEND == "redis":
+        from app.core.redis import get_redis
+        tasks.append(asyncio.create_task(RedisEventBridge(event_bus, get_redis()).run()))
+    if settings.DISPATCH_ENABLED:
+        tasks.append(asyncio.create_task(dispatcher.run(settings.DISPATCH_INTERVAL_SECONDS)))
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    
+    # Persist whatever arrived since the last periodic flush
+    if len(location_buffer):
+        with db_session_scope() as db:
+            location_buffer.flush(db)
+    if async_engine is not None:
+        await async_engine.dispose()
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
@@ -25,9 +91,18 @@ app = FastAPI(
     version=settings.APP_VERSION,
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
+    lifespan=lifespan,
 )
 
 # Add middleware
+if settings.RATE_LIMIT_ENABLED:
+    # Added first so CORS headers also reach rejected requests
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
+if settings.ADMISSION_CONTROL_ENABLED:
+    # Outside the rate limiter so a shed request costs as little as possible
+    app.add_middleware(AdmissionMiddleware, controller=admission_controller)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
@@ -85,6 +160,24 @@ async def health_check():
         "environment": settings.ENVIRONMENT
     }
 
+@app.get("/metrics")
+async def metrics():
+    return {
+        "quote_cache": quote_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "revoked_tokens": revoked_tokens.stats(),
+        "refresh_tokens": refresh_families.stats(),
+        "password_hashing": password_hasher.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "admission": admission_controller.stats(),
+        "surge": surge_engine.stats(),
+        "realtime": realtime_hub.stats(),
+        "notification_streams": notification_stream.connection_count(),
+        "events": event_bus.stats(),
+        "ride_offers": offer_feed.stats()
+    }
+
 # Include API routers
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(users.router, prefix="/api/v1")
@@ -0,0 +1,32 @@
+from fastapi.responses import JSONResponse
+from app.core.admission import AdmissionController
+from app.core.config import settings
+
+class AdmissionMiddleware:
+    """ASGI middleware answering shed requests with an immediate 503 and Retry-After.
+
+    Only plain HTTP requests outside the controller's exempt paths are
+    counted; websockets pass straight through.
+    """
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        priority = self.controller.classify(scope["path"]) if scope["type"] == "http" else None
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+        if not await self.controller.acquire(priority):
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy, try again shortly", "error_code": "HTTP_503"},
+                headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)}
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(priority)
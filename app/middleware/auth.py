@@ -15,7 +15,7 @@ async def get_current_user(
     payload = verify_token(token)
     
     auth_service = AuthService(db)
-    user = auth_service.get_user_by_email(payload["sub"])
+    user = auth_service.get_token_user(payload)
     
     if not user:
         raise HTTPException(
@@ -0,0 +1,49 @@
+import math
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from app.core.rate_limit import RateLimiter
+from app.core.security import verify_token
+
+class RateLimitMiddleware:
+    """ASGI middleware rejecting callers that exceed their token bucket with 429.
+
+    Requests carrying a valid bearer token are limited per user, everything
+    else per client IP, and every request also counts against its client IP
+    (run uvicorn with --proxy-headers behind a proxy so the IP is the
+    caller's). Only plain HTTP requests are limited; websockets and lifespan
+    events pass straight through.
+    """
+
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        client = scope.get("client")
+        address = client[0] if client else "unknown"
+        wait = await self.limiter.check_async(self._identity(scope, address), scope["path"], address)
+        if wait:
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests", "error_code": "HTTP_429"},
+                headers={"Retry-After": str(math.ceil(wait))}
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    def _identity(self, scope, address: str) -> str:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    try:
+                        payload = verify_token(token)
+                    except HTTPException:
+                        break
+                    return "user:" + str(payload.get("uid") or payload.get("sub"))
+                break
+        return "ip:" + address
@@ -3,6 +3,7 @@ from .ride import Ride
 from .payment import Payment, PaymentMethod
 from .rating import Rating
 from .notification import Notification
+from .driver_location import DriverLocation
 
 __all__ = [
     "User",
@@ -10,6 +11,7 @@ __all__ = [
     "Payment",
     "PaymentMethod",
     "Rating",
-    "Notification"
+    "Notification",
+    "DriverLocation"
 ]
 
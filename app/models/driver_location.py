@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class DriverLocation(Base):
+    __tablename__ = "driver_locations"
+    
+    # One row per driver holding the latest known position
+    driver_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    heading = Column(Float, nullable=True)  # degrees from north
+    speed = Column(Float, nullable=True)  # km/h
+    accuracy = Column(Float, nullable=True)  # metres
+    recorded_at = Column(DateTime(timezone=True), nullable=False)
+    
+    # Timestamps
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    driver = relationship("User")
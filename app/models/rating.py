@@ -15,7 +15,7 @@ class Rating(Base):
     # Foreign keys
     ride_id = Column(String, ForeignKey("rides.id"), nullable=False)
     passenger_id = Column(String, ForeignKey("users.id"), nullable=False)
-    driver_id = Column(String, ForeignKey("users.id"), nullable=False)
+    driver_id = Column(String, ForeignKey("users.id"), index=True, nullable=False)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, Text, ForeignKey, Enum
+from sqlalchemy import Column, String, Integer, Float, DateTime, Text, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -19,6 +19,11 @@ class RideType(str, enum.Enum):
 
 class Ride(Base):
     __tablename__ = "rides"
+    __table_args__ = (
+        Index("ix_rides_passenger_id_status", "passenger_id", "status"),
+        Index("ix_rides_driver_id_status_completed_at", "driver_id", "status", "completed_at"),
+        Index("ix_rides_status_driver_id", "status", "driver_id"),
+    )
     
     id = Column(String, primary_key=True, index=True)
     status = Column(Enum(RideStatus), default=RideStatus.REQUESTED)
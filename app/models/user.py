@@ -23,6 +23,7 @@ class User(Base):
     profile_picture = Column(String, nullable=True)
     rating = Column(Float, default=0.0)
     total_rides = Column(Integer, default=0)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")  # bumped to revoke access tokens
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     last_active_at = Column(DateTime(timezone=True), server_default=func.now())
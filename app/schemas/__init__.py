@@ -1,16 +1,19 @@
 from .user import UserCreate, UserUpdate, UserResponse, UserLogin, UserRegister
-from .ride import RideRequest, RideResponse, RideHistory, RideEstimate
+from .ride import RideRequest, RideEstimateRequest, RideResponse, RideHistory, RideEstimate
 from .payment import PaymentRequest, PaymentResponse, PaymentHistory, PaymentMethodCreate, PaymentMethodResponse
 from .notification import NotificationResponse, NotificationHistory
 from .auth import AuthResponse, TokenResponse
-from .driver import DriverStatus, DriverEarnings, RideRequestResponse, DriverStats
+from .driver import (
+    DriverStatus, AvailableDriver, LocationPoint, DriverLocationUpdate, LocationUpdateResult,
+    DriverEarnings, RideRequestResponse, DriverStats
+)
 from .common import ErrorResponse, SuccessResponse
 
 __all__ = [
     # User schemas
     "UserCreate", "UserUpdate", "UserResponse", "UserLogin", "UserRegister",
     # Ride schemas
-    "RideRequest", "RideResponse", "RideHistory", "RideEstimate",
+    "RideRequest", "RideEstimateRequest", "RideResponse", "RideHistory", "RideEstimate",
     # Payment schemas
     "PaymentRequest", "PaymentResponse", "PaymentHistory", "PaymentMethodCreate", "PaymentMethodResponse",
     # Notification schemas
@@ -18,7 +21,8 @@ __all__ = [
     # Auth schemas
     "AuthResponse", "TokenResponse",
     # Driver schemas
-    "DriverStatus", "DriverEarnings", "RideRequestResponse", "DriverStats",
+    "DriverStatus", "AvailableDriver", "LocationPoint", "DriverLocationUpdate", "LocationUpdateResult",
+    "DriverEarnings", "RideRequestResponse", "DriverStats",
     # Common schemas
     "ErrorResponse", "SuccessResponse"
 ]
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Optional
 from app.schemas.user import UserResponse
 
 class AuthResponse(BaseModel):
@@ -12,3 +13,8 @@ class TokenResponse(BaseModel):
     refresh_token: str
     expires_in: int
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
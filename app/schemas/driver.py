@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
 from app.models.ride import RideStatus, RideType
@@ -6,9 +6,33 @@ from app.models.ride import RideStatus, RideType
 class DriverStatus(BaseModel):
     is_online: bool
     status: str  # online, offline, busy
-    last_active: datetime
+    last_active: Optional[datetime] = None
     current_location: Optional[dict] = None
 
+class AvailableDriver(BaseModel):
+    driver_id: str
+    latitude: float
+    longitude: float
+    distance_km: float
+
+class LocationPoint(BaseModel):
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    heading: Optional[float] = None
+    speed: Optional[float] = None
+    accuracy: Optional[float] = None
+    recorded_at: Optional[datetime] = None
+
+class DriverLocationUpdate(BaseModel):
+    # Clients may buffer pings while offline and send them in one request
+    points: List[LocationPoint] = Field(..., min_length=1, max_length=100)
+
+class LocationUpdateResult(BaseModel):
+    accepted: int
+    latitude: float
+    longitude: float
+    recorded_at: datetime
+
 class DriverEarnings(BaseModel):
     period: str
     total_earnings: float
@@ -33,6 +57,7 @@ class RideRequestResponse(BaseModel):
     estimated_duration: int
     requested_at: datetime
     notes: Optional[str] = None
+    distance_km: Optional[float] = None  # from the driver to the pickup
 
 class DriverStats(BaseModel):
     total_rides: int
@@ -14,6 +14,13 @@ class RideRequest(BaseModel):
     estimated_fare: Optional[float] = None
     notes: Optional[str] = None
 
+class RideEstimateRequest(BaseModel):
+    pickup_latitude: float
+    pickup_longitude: float
+    destination_latitude: float
+    destination_longitude: float
+    ride_type: RideType = RideType.STANDARD
+
 class RideResponse(BaseModel):
     id: str
     status: RideStatus
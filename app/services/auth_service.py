@@ -1,20 +1,44 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from sqlalchemy import inspect
 from typing import Optional
 from datetime import datetime, timedelta
 import uuid
 
-from app.models.user import User
+from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserLogin
-from app.schemas.auth import AuthResponse
-from app.core.security import verify_password, get_password_hash, create_access_token, create_refresh_token
+from app.schemas.auth import AuthResponse, TokenResponse
+from app.core.security import password_hasher, create_access_token, create_refresh_token, verify_token
 from app.core.config import settings
+from app.core.cache import LRUCache
+from app.core.token_versions import token_versions
+from app.core.refresh_tokens import refresh_families
+
+# Token subject -> the user's columns, so authenticated requests skip the
+# user lookup. Changes to a user must go through invalidate_cached_users.
+user_cache = LRUCache(settings.AUTH_USER_CACHE_SIZE, ttl=settings.AUTH_USER_CACHE_TTL_SECONDS)
+_USER_COLUMNS = [column.key for column in inspect(User).column_attrs if column.key != "hashed_password"]
+_user_cache_generation = 0
+
+def invalidate_cached_users(*emails: str) -> None:
+    """Forget cached users, including lookups still in flight."""
+    global _user_cache_generation
+    _user_cache_generation += 1
+    for email in emails:
+        user_cache.invalidate(email)
+
+def access_token_claims(user: User) -> dict:
+    """Claims for a user's access token; stateless tokens also carry id, role and version."""
+    claims = {"sub": user.email}
+    if settings.AUTH_STATELESS_TOKENS:
+        claims.update(uid=user.id, role=UserRole(user.role).value, ver=user.token_version or 0)
+    return claims
 
 class AuthService:
     def __init__(self, db: Session):
         self.db = db
     
-    def register_user(self, user_data: UserCreate) -> AuthResponse:
+    async def register_user(self, user_data: UserCreate) -> AuthResponse:
         """Register a new user."""
         # Check if user already exists
         existing_user = self.db.query(User).filter(
@@ -28,7 +52,7 @@ class AuthService:
             )
         
         # Create new user
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await password_hasher.hash(user_data.password)
         user = User(
             id=str(uuid.uuid4()),
             first_name=user_data.first_name,
@@ -44,22 +68,13 @@ class AuthService:
         self.db.commit()
         self.db.refresh(user)
         
-        # Create tokens
-        access_token = create_access_token(data={"sub": user.email})
-        refresh_token = create_refresh_token(data={"sub": user.email})
-        
-        return AuthResponse(
-            user=user,
-            access_token=access_token,
-            refresh_token=refresh_token,
-            expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
-        )
+        return AuthResponse(user=user, **self._issue_tokens(user))
     
-    def login_user(self, login_data: UserLogin) -> AuthResponse:
+    async def login_user(self, login_data: UserLogin) -> AuthResponse:
         """Authenticate and login user."""
         user = self.db.query(User).filter(User.email == login_data.email).first()
         
-        if not user or not verify_password(login_data.password, user.hashed_password):
+        if not user or not await password_hasher.verify(login_data.password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password"
@@ -68,22 +83,86 @@ class AuthService:
         # Update last active
         user.last_active_at = datetime.utcnow()
         self.db.commit()
+        invalidate_cached_users(user.email)
         
-        # Create tokens
-        access_token = create_access_token(data={"sub": user.email})
-        refresh_token = create_refresh_token(data={"sub": user.email})
+        return AuthResponse(user=user, **self._issue_tokens(user))
+    
+    def refresh_tokens(self, refresh_token: str) -> TokenResponse:
+        """Exchange a refresh token for a new pair, rotating it within its login session."""
+        payload = verify_token(refresh_token, token_type="refresh")
+        family_id, new_jti = payload.get("fid"), uuid.uuid4().hex
+        # A token that is not its family's live one is a replay and ends the session
+        if not family_id or not refresh_families.rotate(family_id, payload["jti"], new_jti):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token is no longer valid"
+            )
         
-        return AuthResponse(
-            user=user,
-            access_token=access_token,
-            refresh_token=refresh_token,
-            expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
-        )
+        user = self.get_authenticated_user(payload["sub"])
+        if not user or payload.get("ver") != user.token_version:
+            refresh_families.end(family_id)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token is no longer valid"
+            )
+        return TokenResponse(**self._issue_tokens(user, family_id, new_jti))
+    
+    def _issue_tokens(self, user: User, family_id: Optional[str] = None, refresh_jti: Optional[str] = None) -> dict:
+        """Create an access and refresh token, opening a new login session unless one is given."""
+        refresh_jti = refresh_jti or uuid.uuid4().hex
+        family_id = family_id or refresh_families.start(refresh_jti)
+        return {
+            "access_token": create_access_token(data=access_token_claims(user)),
+            "refresh_token": create_refresh_token(data={
+                "sub": user.email, "fid": family_id, "jti": refresh_jti, "ver": user.token_version or 0
+            }),
+            "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        }
     
     def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email."""
         return self.db.query(User).filter(User.email == email).first()
     
+    def get_token_user(self, payload: dict, profile: bool = False) -> Optional[User]:
+        """Resolve verified access token claims to a user.
+        
+        Stateless tokens are trusted without a lookup, so unless ``profile``
+        is set the user only has ``id``, ``email``, ``role`` and
+        ``token_version``.
+        """
+        version = payload.get("ver")
+        if settings.AUTH_STATELESS_TOKENS and "uid" in payload:
+            if not token_versions.is_current(payload["uid"], version or 0):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Token has been revoked"
+                )
+            if not profile:
+                return User(id=payload["uid"], email=payload["sub"], role=UserRole(payload["role"]), token_version=version)
+        
+        user = self.get_authenticated_user(payload["sub"])
+        if user and version is not None and version != user.token_version:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked"
+            )
+        return user
+    
+    def get_authenticated_user(self, email: str) -> Optional[User]:
+        """Resolve a token subject to a detached user, from the cache when possible."""
+        columns = user_cache.get(email)
+        if columns is None:
+            generation = _user_cache_generation
+            user = self.get_user_by_email(email)
+            if not user:
+                return None
+            columns = {key: getattr(user, key) for key in _USER_COLUMNS}
+            # Skip the store if the user changed while it was being read
+            if generation == _user_cache_generation:
+                user_cache.set(email, columns)
+        # A fresh copy per request, so no ORM state is shared between sessions
+        return User(**columns)
+    
     def get_user_by_id(self, user_id: str) -> Optional[User]:
         """Get user by ID."""
         return self.db.query(User).filter(User.id == user_id).first()
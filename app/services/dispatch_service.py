@@ -0,0 +1,283 @@
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+import asyncio
+import logging
+import time
+import numpy as np
+
+from app.core.config import settings
+from app.core.spatial import GridIndex, EARTH_RADIUS_KM, driver_index, pending_pickups
+from app.core import geo
+from app.core.presence import PresenceRegistry, presence
+from app.services.offer_service import offer_feed
+
+logger = logging.getLogger(__name__)
+
+Point = Tuple[str, float, float]
+
+@dataclass
+class RideOffer:
+    ride_id: str
+    driver_id: str
+    pickup_eta_seconds: float
+    expires_at: float  # time.monotonic() deadline
+
+def candidate_costs(
+    rides: np.ndarray,
+    drivers: np.ndarray,
+    k: int,
+    max_pickup_km: float,
+    seconds_per_km: float,
+    chunk: int = 256
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Keep the ``k`` closest drivers per ride as an (n, k) candidate/ETA pair.
+
+    ``rides`` and ``drivers`` are (n, 2) and (m, 2) arrays of lat/lon degrees.
+    Drivers beyond ``max_pickup_km`` get an infinite cost.
+    """
+    n, m = len(rides), len(drivers)
+    k = min(k, m)
+    candidates = np.zeros((n, k), dtype=np.int64)
+    costs = np.full((n, k), np.inf)
+    if n == 0 or k == 0:
+        return candidates, costs
+
+    # Sorting both sides by latitude lets each chunk of rides look only at the
+    # band of drivers that can possibly be within reach.
+    driver_order = np.argsort(drivers[:, 0], kind="stable")
+    driver_lat = np.radians(drivers[driver_order, 0])
+    driver_lon = np.radians(drivers[driver_order, 1])
+    ride_order = np.argsort(rides[:, 0], kind="stable")
+    ride_lat_all = np.radians(rides[ride_order, 0])
+    ride_lon_all = np.radians(rides[ride_order, 1])
+    reach = max_pickup_km / EARTH_RADIUS_KM
+
+    for start in range(0, n, chunk):
+        ride_lat = ride_lat_all[start:start + chunk, None]
+        ride_lon = ride_lon_all[start:start + chunk, None]
+        lo = np.searchsorted(driver_lat, ride_lat[0, 0] - reach, side="left")
+        hi = np.searchsorted(driver_lat, ride_lat[-1, 0] + reach, side="right")
+        if hi - lo < k:
+            # Too few drivers in the band to fill k slots; widen to everyone
+            lo, hi = 0, m
+        band_lat = driver_lat[lo:hi]
+        band_lon = driver_lon[lo:hi]
+
+        # Equirectangular distances are plenty to rank candidates
+        approx = geo.equirectangular(ride_lat, ride_lon, band_lat, band_lon, dtype=np.float32)
+        if k < hi - lo:
+            nearest = np.argpartition(approx, k - 1, axis=1)[:, :k]
+        else:
+            nearest = np.broadcast_to(np.arange(hi - lo), approx.shape).copy()
+
+        # Exact haversine on the survivors only
+        distance = geo.haversine(ride_lat, ride_lon, band_lat[nearest], band_lon[nearest])
+
+        rows = ride_order[start:start + chunk]
+        candidates[rows] = driver_order[lo + nearest]
+        costs[rows] = np.where(distance <= max_pickup_km, distance * seconds_per_km, np.inf)
+    return candidates, costs
+
+def solve_assignment(
+    candidates: np.ndarray,
+    costs: np.ndarray,
+    num_drivers: int,
+    deadline: Optional[float] = None,
+    epsilon: float = 1.0
+) -> np.ndarray:
+    """Assign rides to drivers minimising total cost with a vectorised auction.
+
+    Rides bid for their candidate drivers in Jacobi rounds, so the result is
+    within ``n * epsilon`` of the optimum. Each ride also owns a private "stay
+    unassigned" option valued just below its worst feasible pickup, which
+    keeps the auction finite when drivers are scarce. Rides left on that
+    option, or still open when the ``time.perf_counter()`` deadline passes,
+    are completed greedily with the remaining free drivers. Returns the
+    driver index per ride, or -1.
+    """
+    n = len(candidates)
+    assigned = np.full(n, -1, dtype=np.int64)
+    feasible = np.isfinite(costs)
+    if n == 0 or not feasible.any():
+        return assigned
+
+    # Append each ride's private opt-out as object num_drivers + ride
+    worst = costs[feasible].max()
+    options = np.hstack([candidates, (num_drivers + np.arange(n))[:, None]])
+    benefit = np.hstack([
+        np.where(feasible, -costs, -np.inf),
+        np.full((n, 1), -(worst + 1.0))
+    ])
+    prices = np.zeros(num_drivers + n)
+    owner = np.full(num_drivers + n, -1, dtype=np.int64)
+    rows = np.flatnonzero(feasible.any(axis=1))
+
+    while True:
+        bidders = rows[assigned[rows] < 0]
+        if len(bidders) == 0:
+            break
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+
+        values = benefit[bidders] - prices[options[bidders]]
+        picked = np.arange(len(bidders))
+        best_slot = values.argmax(axis=1)
+        best = values[picked, best_slot]
+        values[picked, best_slot] = -np.inf
+        # A lone option still needs a finite increment
+        second = np.maximum(values.max(axis=1), best - worst - 1.0)
+
+        targets = options[bidders, best_slot]
+        bids = prices[targets] + (best - second) + epsilon
+
+        # Highest bid per object wins
+        order = np.lexsort((bids, targets))
+        last = np.r_[targets[order][1:] != targets[order][:-1], True]
+        winners = order[last]
+        won = targets[winners]
+
+        previous = owner[won]
+        assigned[previous[previous >= 0]] = -1
+        owner[won] = bidders[winners]
+        assigned[bidders[winners]] = won
+        prices[won] = bids[winners]
+
+    assigned[assigned >= num_drivers] = -1
+    return _complete_greedily(assigned, candidates, costs, num_drivers)
+
+def _complete_greedily(
+    assigned: np.ndarray, candidates: np.ndarray, costs: np.ndarray, num_drivers: int
+) -> np.ndarray:
+    """Fill unassigned rides with their cheapest free candidate, cheapest pairs first."""
+    open_rides = np.flatnonzero(assigned < 0)
+    pair_costs = costs[open_rides]
+    ride_of, slot = np.nonzero(np.isfinite(pair_costs))
+    order = np.argsort(pair_costs[ride_of, slot], kind="stable")
+    taken = np.zeros(num_drivers, dtype=bool)
+    taken[assigned[assigned >= 0]] = True
+    for index in order:
+        ride = open_rides[ride_of[index]]
+        driver = candidates[ride, slot[index]]
+        if assigned[ride] < 0 and not taken[driver]:
+            assigned[ride] = driver
+            taken[driver] = True
+    return assigned
+
+class Dispatcher:
+    """Periodically matches pending rides to online drivers and sends offers.
+
+    Each tick snapshots both spatial indexes, solves one global assignment
+    over rides and available drivers without a live offer, and hands the resulting
+    offers to ``send_offers``, which runs on the event loop and may return
+    the offers it actually delivered; the rest are retried next tick. When
+    run as a task, offers go out on the drivers' offer feed, so they are
+    retracted with every other offer once the ride is taken. A ride leaving
+    the pending index (accepted, cancelled) releases its offer at the next
+    tick; unanswered offers expire after ``offer_ttl`` seconds and the pair
+    becomes eligible again.
+    """
+
+    def __init__(
+        self,
+        drivers: GridIndex = driver_index,
+        pickups: GridIndex = pending_pickups,
+        registry: Optional[PresenceRegistry] = presence,
+        send_offers: Optional[Callable[[List[RideOffer]], Optional[List[RideOffer]]]] = None,
+        max_pickup_km: float = settings.DISPATCH_MAX_PICKUP_KM,
+        candidates_per_ride: int = settings.DISPATCH_CANDIDATES_PER_RIDE,
+        offer_ttl: float = settings.DISPATCH_OFFER_TTL_SECONDS,
+        time_budget_ms: float = settings.DISPATCH_TIME_BUDGET_MS
+    ):
+        self.drivers = drivers
+        self.pickups = pickups
+        self.registry = registry
+        self.send_offers = send_offers
+        self.max_pickup_km = max_pickup_km
+        self.candidates_per_ride = candidates_per_ride
+        self.offer_ttl = offer_ttl
+        self.time_budget_ms = time_budget_ms
+        self.offers: Dict[str, RideOffer] = {}
+        self.last_tick_ms = 0.0
+
+    def snapshot(self) -> Tuple[List[Point], List[Point]]:
+        """Collect rides and drivers that are free to be matched."""
+        now = time.monotonic()
+        self.offers = {
+            ride_id: offer for ride_id, offer in self.offers.items()
+            if offer.expires_at > now and ride_id in self.pickups
+        }
+        offered_drivers = {offer.driver_id for offer in self.offers.values()}
+        rides = [point for point in self.pickups.items() if point[0] not in self.offers]
+        drivers = [point for point in self.drivers.items() if point[0] not in offered_drivers]
+        if self.registry is not None:
+            available = set(self.registry.available(point[0] for point in drivers))
+            drivers = [point for point in drivers if point[0] in available]
+        return rides, drivers
+
+    def match(self, rides: Sequence[Point], drivers: Sequence[Point]) -> List[RideOffer]:
+        """Compute offers for a snapshot."""
+        started = time.perf_counter()
+        if not rides or not drivers:
+            return []
+
+        ride_coords = np.array([(lat, lon) for _, lat, lon in rides], dtype=np.float64)
+        driver_coords = np.array([(lat, lon) for _, lat, lon in drivers], dtype=np.float64)
+        seconds_per_km = float(geo.eta_seconds(1.0))
+        candidates, costs = candidate_costs(
+            ride_coords, driver_coords, self.candidates_per_ride, self.max_pickup_km, seconds_per_km
+        )
+        assigned = solve_assignment(
+            candidates, costs, len(drivers), deadline=started + self.time_budget_ms / 1000
+        )
+
+        expires_at = time.monotonic() + self.offer_ttl
+        offers = []
+        for ride, driver in enumerate(assigned):
+            if driver < 0:
+                continue
+            slot = np.flatnonzero(candidates[ride] == driver)[0]
+            offers.append(RideOffer(
+                ride_id=rides[ride][0],
+                driver_id=drivers[driver][0],
+                pickup_eta_seconds=float(costs[ride, slot]),
+                expires_at=expires_at
+            ))
+        self.last_tick_ms = (time.perf_counter() - started) * 1000
+        return offers
+
+    def tick(self) -> List[RideOffer]:
+        """Run one synchronous dispatch round."""
+        offers = self.match(*self.snapshot())
+        self._publish(offers)
+        return offers
+
+    async def run(self, interval: float) -> None:
+        """Dispatch every ``interval`` seconds until cancelled."""
+        if self.send_offers is None:
+            self.send_offers = _offer_on_feed
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # Snapshot and send on the loop thread; the indexes and the feed are not thread-safe
+                rides, drivers = self.snapshot()
+                offers = await asyncio.to_thread(self.match, rides, drivers)
+                self._publish(offers)
+            except Exception:
+                logger.exception("Dispatch tick failed")
+
+    def _record(self, offers: List[RideOffer]) -> None:
+        for offer in offers:
+            self.offers[offer.ride_id] = offer
+
+    def _publish(self, offers: List[RideOffer]) -> None:
+        if offers and self.send_offers is not None:
+            delivered = self.send_offers(offers)
+            if delivered is not None:
+                offers = delivered
+        self._record(offers)
+
+def _offer_on_feed(offers: List[RideOffer]) -> List[RideOffer]:
+    """Push offers to the matched drivers' offer feeds; returns those delivered."""
+    return [offer for offer in offers if offer_feed.dispatched(offer.ride_id, offer.driver_id)]
+
+dispatcher = Dispatcher()
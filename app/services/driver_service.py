@@ -1,6 +1,8 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from datetime import datetime, timedelta
 import uuid
 
@@ -8,124 +10,157 @@ from app.models.user import User
 from app.models.ride import Ride, RideStatus
 from app.models.rating import Rating
 from app.schemas.driver import DriverStatus, DriverEarnings, RideRequestResponse, DriverStats
+from app.core.spatial import driver_index, pending_pickups
+from app.core.presence import presence, Presence, PresenceStatus
+from app.core.config import settings
+from app.services.surge_service import surge_engine
+from app.services.tracking_service import ride_tracker
+from app.core.events import event_bus, EventTopic
+from app.services.offer_service import offer_feed, ride_request_response
 
 class DriverService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Union[Session, AsyncSession]):
         self.db = db
     
-    def toggle_driver_status(self, driver_id: str, status: Optional[str] = None) -> DriverStatus:
+    def toggle_driver_status(
+        self,
+        driver_id: str,
+        status: Optional[str] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None
+    ) -> DriverStatus:
         """Toggle driver online/offline status."""
-        driver = self.db.query(User).filter(User.id == driver_id).first()
-        if not driver:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Driver not found"
-            )
-        
-        # For now, we'll use a simple approach
-        # In a real implementation, you might have a separate DriverStatus table
-        current_status = getattr(driver, 'driver_status', 'offline')
-        
+        current = presence.get(driver_id)
         if status:
-            new_status = status
+            try:
+                new_status = PresenceStatus(status)
+            except ValueError:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Status must be one of online, offline or busy"
+                )
         else:
-            new_status = 'online' if current_status == 'offline' else 'offline'
+            new_status = PresenceStatus.ONLINE if current.status == PresenceStatus.OFFLINE else PresenceStatus.OFFLINE
         
-        # Update driver status (you might want to add a driver_status field to User model)
-        # For now, we'll simulate this
-        driver.last_active_at = datetime.utcnow()
-        self.db.commit()
+        updated = presence.set_status(driver_id, new_status)
         
-        return DriverStatus(
-            is_online=new_status == 'online',
-            status=new_status,
-            last_active=driver.last_active_at
+        # Keep the persisted activity timestamp for history and reporting
+        self.db.query(User).filter(User.id == driver_id).update(
+            {User.last_active_at: datetime.utcnow()}, synchronize_session=False
         )
+        self.db.commit()
+        
+        # Only drivers on shift are matchable, so keep the spatial index in step
+        if updated.is_online:
+            if latitude is not None and longitude is not None:
+                driver_index.upsert(driver_id, latitude, longitude)
+                if updated.status == PresenceStatus.ONLINE:
+                    surge_engine.record_driver(driver_id, latitude, longitude)
+        else:
+            driver_index.remove(driver_id)
+        
+        return self._status_response(driver_id, updated)
     
     def get_driver_status(self, driver_id: str) -> DriverStatus:
         """Get current driver status."""
-        driver = self.db.query(User).filter(User.id == driver_id).first()
-        if not driver:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Driver not found"
-            )
-        
-        # Simulate driver status
-        is_online = driver.last_active_at and (datetime.utcnow() - driver.last_active_at).seconds < 300  # 5 minutes
-        
+        return self._status_response(driver_id, presence.get(driver_id))
+    
+    def _status_response(self, driver_id: str, current: Presence) -> DriverStatus:
         return DriverStatus(
-            is_online=is_online,
-            status='online' if is_online else 'offline',
-            last_active=driver.last_active_at or datetime.utcnow()
+            is_online=current.is_online,
+            status=current.status.value,
+            last_active=current.last_seen,
+            current_location=self._current_location(driver_id) if current.is_online else None
         )
     
-    def get_ride_requests(self, driver_id: str) -> List[RideRequestResponse]:
-        """Get available ride requests for driver."""
-        # Get rides that are requested and not assigned to any driver
-        rides = self.db.query(Ride).filter(
+    def _current_location(self, driver_id: str) -> Optional[dict]:
+        """Get the driver's last indexed position."""
+        position = driver_index.get(driver_id)
+        if position is None:
+            return None
+        return {"latitude": position[0], "longitude": position[1]}
+    
+    def get_ride_requests(self, driver_id: str, radius: Optional[float] = None) -> List[RideRequestResponse]:
+        """Get available ride requests near the driver, closest pickup first."""
+        position = driver_index.get(driver_id)
+        if position is None:
+            # Without a known position there is nothing to measure distance from
+            return []
+        
+        nearby = pending_pickups.nearest(
+            position[0], position[1],
+            k=settings.MAX_PAGE_SIZE,
+            radius_km=radius or settings.RIDE_REQUEST_RADIUS_KM
+        )
+        if not nearby:
+            return []
+        distances = dict(nearby)
+        
+        # The index is only a candidate filter; the database decides what is still open
+        rides = self.db.query(Ride).options(joinedload(Ride.passenger)).filter(
+            Ride.id.in_(distances),
             Ride.status == RideStatus.REQUESTED,
             Ride.driver_id.is_(None)
         ).all()
+        rides.sort(key=lambda ride: distances[ride.id])
         
-        requests = []
-        for ride in rides:
-            # Get passenger info
-            passenger = self.db.query(User).filter(User.id == ride.passenger_id).first()
-            
-            requests.append(RideRequestResponse(
-                id=ride.id,
-                passenger_name=f"{passenger.first_name} {passenger.last_name}",
-                passenger_phone=passenger.phone,
-                pickup_address=ride.pickup_address,
-                destination_address=ride.destination_address,
-                pickup_latitude=ride.pickup_latitude,
-                pickup_longitude=ride.pickup_longitude,
-                destination_latitude=ride.destination_latitude,
-                destination_longitude=ride.destination_longitude,
-                ride_type=ride.ride_type,
-                fare=ride.fare,
-                distance=ride.distance,
-                estimated_duration=ride.duration,
-                requested_at=ride.requested_at,
-                notes=ride.notes
-            ))
-        
-        return requests
+        # Drop pickups another worker has already assigned or cancelled
+        open_ids = {ride.id for ride in rides}
+        for ride_id in distances:
+            if ride_id not in open_ids:
+                pending_pickups.remove(ride_id)
+        
+        return [ride_request_response(ride, distances[ride.id]) for ride in rides]
     
     def accept_ride_request(self, ride_id: str, driver_id: str) -> None:
         """Accept a ride request."""
-        ride = self.db.query(Ride).filter(Ride.id == ride_id).first()
+        # Claim the ride in one conditional UPDATE so concurrent accepts cannot
+        # both win; the affected row count is the outcome.
+        accepted = self.db.query(Ride).filter(
+            Ride.id == ride_id,
+            Ride.status == RideStatus.REQUESTED,
+            Ride.driver_id.is_(None)
+        ).update({
+            Ride.driver_id: driver_id,
+            Ride.status: RideStatus.ACCEPTED,
+            Ride.accepted_at: datetime.utcnow()
+        }, synchronize_session=False)
+        self.db.commit()
+        
+        if accepted:
+            pending_pickups.remove(ride_id)
+            presence.set_status(driver_id, PresenceStatus.BUSY)
+            ride_tracker.status_changed(ride_id, RideStatus.ACCEPTED, driver_id)
+            event_bus.publish(EventTopic.RIDE_STATUS_CHANGED, {
+                "ride_id": ride_id,
+                "status": RideStatus.ACCEPTED.value,
+                "driver_id": driver_id,
+            })
+            return
+        
+        # Lost the race or never had a chance; only now look up why
+        ride = self.db.query(Ride.status, Ride.driver_id).filter(Ride.id == ride_id).first()
         if not ride:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Ride not found"
             )
         
-        if ride.status != RideStatus.REQUESTED:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Ride is no longer available"
-            )
-        
         if ride.driver_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Ride has already been accepted by another driver"
             )
         
-        # Assign driver to ride
-        ride.driver_id = driver_id
-        ride.status = RideStatus.ACCEPTED
-        ride.accepted_at = datetime.utcnow()
-        
-        self.db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Ride is no longer available"
+        )
     
     def reject_ride_request(self, ride_id: str, driver_id: str, reason: Optional[str] = None) -> None:
         """Reject a ride request."""
-        # In a real implementation, you might want to track rejections
-        # For now, we'll just log it or do nothing
-        pass
+        # Pass a pushed offer on to the next nearest driver
+        offer_feed.declined(ride_id, driver_id)
     
     def get_driver_earnings(self, driver_id: str, period: str = "today") -> DriverEarnings:
         """Get driver earnings for specified period."""
@@ -212,7 +247,20 @@ class DriverService:
             Ride.status.in_([RideStatus.ACCEPTED, RideStatus.ARRIVED, RideStatus.STARTED])
         ).all()
         
-        return [{
+        return [self._active_ride_row(ride) for ride in active_rides]
+    
+    async def get_active_rides_async(self, driver_id: str) -> List[dict]:
+        """Get driver's active rides through an asyncio session."""
+        active_rides = await self.db.scalars(select(Ride).where(
+            Ride.driver_id == driver_id,
+            Ride.status.in_([RideStatus.ACCEPTED, RideStatus.ARRIVED, RideStatus.STARTED])
+        ))
+        
+        return [self._active_ride_row(ride) for ride in active_rides]
+    
+    @staticmethod
+    def _active_ride_row(ride: Ride) -> dict:
+        return {
             "id": ride.id,
             "status": ride.status,
             "pickup_address": ride.pickup_address,
@@ -222,7 +270,7 @@ class DriverService:
             "accepted_at": ride.accepted_at,
             "arrived_at": ride.arrived_at,
             "started_at": ride.started_at
-        } for ride in active_rides]
+        }
     
     def get_driver_ride_history(self, driver_id: str, page: int = 1, limit: int = 20) -> List[dict]:
         """Get driver's ride history."""
@@ -230,7 +278,19 @@ class DriverService:
             Ride.driver_id == driver_id
         ).offset((page - 1) * limit).limit(limit).all()
         
-        return [{
+        return [self._history_row(ride) for ride in rides]
+    
+    async def get_driver_ride_history_async(self, driver_id: str, page: int = 1, limit: int = 20) -> List[dict]:
+        """Get driver's ride history through an asyncio session."""
+        rides = await self.db.scalars(
+            select(Ride).where(Ride.driver_id == driver_id).offset((page - 1) * limit).limit(limit)
+        )
+        
+        return [self._history_row(ride) for ride in rides]
+    
+    @staticmethod
+    def _history_row(ride: Ride) -> dict:
+        return {
             "id": ride.id,
             "status": ride.status,
             "pickup_address": ride.pickup_address,
@@ -242,4 +302,4 @@ class DriverService:
             "accepted_at": ride.accepted_at,
             "completed_at": ride.completed_at,
             "passenger_id": ride.passenger_id
-        } for ride in rides]
+        }
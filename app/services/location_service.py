@@ -0,0 +1,169 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql, sqlite
+from typing import Callable, ContextManager, Dict, List
+from datetime import datetime, timezone
+import asyncio
+import logging
+
+from app.models.driver_location import DriverLocation
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.schemas.driver import LocationPoint, LocationUpdateResult
+from app.core.spatial import driver_index
+from app.core.presence import presence, PresenceStatus
+from app.services.surge_service import surge_engine
+from app.services.tracking_service import ride_tracker
+
+logger = logging.getLogger(__name__)
+
+class LocationBuffer:
+    """Latest driver positions waiting to be persisted.
+
+    Pings update the spatial index straight away, but only the newest point per
+    driver is kept here, so a flush writes at most one row per driver no matter
+    how many pings arrived since the previous one. The newest accepted point
+    per driver is also kept across flushes, for the busiest ``max_drivers``,
+    so a late batch of older pings is ignored even after the newer one has
+    been written. Timestamps from the future are clamped to server time.
+    """
+
+    def __init__(self, max_drivers: int = settings.LOCATION_LATEST_MAX_DRIVERS):
+        self._pending: Dict[str, dict] = {}
+        self._latest = LRUCache(max_drivers)
+        self.ingested = 0
+        self.flushed = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def ingest(self, driver_id: str, points: List[LocationPoint]) -> LocationUpdateResult:
+        """Record a batch of pings for a driver."""
+        now = datetime.now(timezone.utc)
+        latest = None
+        latest_at = None
+        for point in points:
+            # A skewed client clock must not date a ping past every later one
+            recorded_at = min(_as_utc(point.recorded_at), now) if point.recorded_at else now
+            if latest_at is None or recorded_at >= latest_at:
+                latest, latest_at = point, recorded_at
+
+        self.ingested += len(points)
+        current = self._latest.get(driver_id)
+        if current is None or latest_at >= current["recorded_at"]:
+            self._pending[driver_id] = current = {
+                "driver_id": driver_id,
+                "latitude": latest.latitude,
+                "longitude": latest.longitude,
+                "heading": latest.heading,
+                "speed": latest.speed,
+                "accuracy": latest.accuracy,
+                "recorded_at": latest_at,
+            }
+            self._latest.set(driver_id, current)
+            # Pings double as heartbeats; only drivers on shift are matchable
+            state = presence.heartbeat(driver_id)
+            if state.is_online:
+                driver_index.upsert(driver_id, latest.latitude, latest.longitude)
+            if state.status == PresenceStatus.ONLINE:
+                surge_engine.record_driver(driver_id, latest.latitude, latest.longitude)
+            elif state.status == PresenceStatus.BUSY:
+                ride_tracker.driver_moved(
+                    driver_id, latest.latitude, latest.longitude, latest.heading, latest.speed, latest_at
+                )
+
+        return LocationUpdateResult(
+            accepted=len(points),
+            latitude=current["latitude"],
+            longitude=current["longitude"],
+            recorded_at=current["recorded_at"]
+        )
+
+    def discard(self, driver_id: str) -> None:
+        """Forget a driver's unflushed and newest positions."""
+        self._pending.pop(driver_id, None)
+        self._latest.invalidate(driver_id)
+
+    def clear(self) -> None:
+        self._pending.clear()
+        self._latest.clear()
+
+    def flush(self, db: Session) -> int:
+        """Persist buffered positions in one bulk upsert."""
+        rows = self._take()
+        try:
+            return self._write(db, rows)
+        except Exception:
+            self._requeue(rows)
+            raise
+
+    async def run(self, session_scope: Callable[[], ContextManager[Session]], interval: float) -> None:
+        """Flush periodically until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            # Taken on the loop, where ingest writes; only the rows go to the thread
+            rows = self._take()
+            if not rows:
+                continue
+            try:
+                await asyncio.to_thread(self._write_in_scope, session_scope, rows)
+            except Exception:
+                self._requeue(rows)
+                logger.exception("Failed to flush driver locations")
+
+    def _take(self) -> List[dict]:
+        # Swap rather than copy so pings arriving mid-flush land in the next batch
+        rows, self._pending = list(self._pending.values()), {}
+        return rows
+
+    def _requeue(self, rows: List[dict]) -> None:
+        # Put rows back unless a newer ping has superseded them meanwhile
+        for row in rows:
+            self._pending.setdefault(row["driver_id"], row)
+
+    def _write(self, db: Session, rows: List[dict]) -> int:
+        if not rows:
+            return 0
+        try:
+            _upsert_locations(db, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        self.flushed += len(rows)
+        return len(rows)
+
+    def _write_in_scope(self, session_scope: Callable[[], ContextManager[Session]], rows: List[dict]) -> int:
+        with session_scope() as db:
+            return self._write(db, rows)
+
+def _upsert_locations(db: Session, rows: List[dict]) -> None:
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        insert = postgresql.insert
+    elif dialect == "sqlite":
+        insert = sqlite.insert
+    else:
+        # Fall back to the ORM merge, one statement per row
+        for row in rows:
+            db.merge(DriverLocation(**row))
+        return
+
+    statement = insert(DriverLocation)
+    statement = statement.on_conflict_do_update(
+        index_elements=[DriverLocation.driver_id],
+        set_={
+            column: statement.excluded[column]
+            for column in ("latitude", "longitude", "heading", "speed", "accuracy", "recorded_at")
+        } | {"updated_at": datetime.now(timezone.utc)},
+        # Never let a late write replace a newer stored position
+        where=DriverLocation.recorded_at < statement.excluded.recorded_at
+    )
+    db.execute(statement, rows)
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+# Process-wide buffer shared by the ingestion endpoint and the flush task
+location_buffer = LocationBuffer()
@@ -1,13 +1,93 @@
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from typing import Optional, List
+from typing import Dict, Iterable, Optional, List, Set, Tuple, Union
 from datetime import datetime
+import asyncio
+import logging
 import uuid
 
 from app.models.notification import Notification
+from app.core.realtime import RealtimeHub, Subscriber, realtime_hub
+from app.core.events import event_bus, EventTopic
+from app.schemas.notification import NotificationResponse
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT = {"type": "heartbeat"}
+
+class NotificationStream:
+    """Pushes new notifications and unread counts to connected users.
+
+    Writers publish only for users with an open stream, so disconnected users
+    cost nothing and connected ones get one COUNT per change instead of one
+    per poll. Heartbeats for every connection come from a single ``run`` loop.
+    """
+
+    def __init__(self, hub: RealtimeHub = realtime_hub):
+        self.hub = hub
+        self._connections: Dict[Subscriber, str] = {}
+
+    @staticmethod
+    def topic(user_id: str) -> str:
+        return f"notifications:{user_id}"
+
+    def connect(self, user_id: str) -> Subscriber:
+        """Subscribe a connection to a user's notifications; call on the event loop."""
+        subscriber = self.hub.subscribe(self.topic(user_id))
+        self._connections[subscriber] = user_id
+        return subscriber
+
+    def disconnect(self, subscriber: Subscriber) -> None:
+        user_id = self._connections.pop(subscriber, None)
+        if user_id is not None:
+            self.hub.unsubscribe(self.topic(user_id), subscriber)
+
+    def clear(self) -> None:
+        for subscriber in list(self._connections):
+            self.disconnect(subscriber)
+
+    def connection_count(self) -> int:
+        return len(self._connections)
+
+    def connected(self, user_ids: Iterable[str]) -> Set[str]:
+        """The subset of users with at least one open stream."""
+        return {user_id for user_id in user_ids if self.hub.subscriber_count(self.topic(user_id))}
+
+    def notification_created(self, notification: Notification) -> None:
+        self.hub.publish(self.topic(notification.user_id), {
+            "type": "notification",
+            "notification": NotificationResponse.model_validate(notification).model_dump(mode="json"),
+        })
+
+    def unread_count_changed(self, user_id: str, unread_count: int) -> None:
+        # Only the latest count matters to a client that is behind
+        self.hub.publish(self.topic(user_id), {
+            "type": "unread_count",
+            "unread_count": unread_count,
+        }, coalesce_key="unread_count")
+
+    def heartbeat(self) -> int:
+        """Queue a heartbeat on every connection; returns how many are open."""
+        for subscriber in list(self._connections):
+            if not subscriber.put(HEARTBEAT, coalesce_key="heartbeat"):
+                self.disconnect(subscriber)
+        return len(self._connections)
+
+    async def run(self, interval: float) -> None:
+        """Send heartbeats every ``interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.heartbeat()
+            except Exception:
+                logger.exception("Failed to send notification heartbeats")
+
+notification_stream = NotificationStream()
 
 class NotificationService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Union[Session, AsyncSession]):
         self.db = db
     
     def create_notification(self, user_id: str, title: str, message: str, notification_type: str) -> Notification:
@@ -25,8 +105,34 @@ class NotificationService:
         self.db.commit()
         self.db.refresh(notification)
         
+        self._publish([(user_id, notification.id, notification_type, notification)])
         return notification
     
+    def create_notifications(self, items: List[Tuple[str, str, str, str]]) -> List[Notification]:
+        """Create several notifications in one commit from (user_id, title, message, type) tuples."""
+        notifications = [
+            Notification(
+                id=str(uuid.uuid4()),
+                title=title,
+                message=message,
+                type=notification_type,
+                user_id=user_id,
+                is_read=False
+            )
+            for user_id, title, message, notification_type in items
+        ]
+        
+        # Read the fields before commit expires them, so publishing needs no reload
+        created = [
+            (notification.user_id, notification.id, notification.type, notification)
+            for notification in notifications
+        ]
+        self.db.add_all(notifications)
+        self.db.commit()
+        
+        self._publish(created)
+        return notifications
+    
     def get_user_notifications(self, user_id: str, page: int = 1, limit: int = 20) -> tuple[List[Notification], int]:
         """Get user's notifications."""
         notifications = self.db.query(Notification).filter(
@@ -37,6 +143,19 @@ class NotificationService:
         
         return notifications, total
     
+    async def get_user_notifications_async(
+        self, user_id: str, page: int = 1, limit: int = 20
+    ) -> tuple[List[Notification], int]:
+        """Get user's notifications through an asyncio session."""
+        notifications = await self.db.scalars(
+            select(Notification).where(Notification.user_id == user_id).offset((page - 1) * limit).limit(limit)
+        )
+        total = await self.db.scalar(
+            select(func.count()).select_from(Notification).where(Notification.user_id == user_id)
+        )
+        
+        return notifications.all(), total
+    
     def mark_notification_as_read(self, notification_id: str, user_id: str) -> Notification:
         """Mark a notification as read."""
         notification = self.db.query(Notification).filter(
@@ -50,20 +169,25 @@ class NotificationService:
                 detail="Notification not found"
             )
         
+        was_unread = not notification.is_read
         notification.is_read = True
         self.db.commit()
         self.db.refresh(notification)
         
+        if was_unread:
+            self._publish_unread_counts([user_id])
         return notification
     
     def mark_all_notifications_as_read(self, user_id: str) -> bool:
         """Mark all user notifications as read."""
-        self.db.query(Notification).filter(
+        updated = self.db.query(Notification).filter(
             Notification.user_id == user_id,
             Notification.is_read == False
         ).update({"is_read": True})
         
         self.db.commit()
+        if updated:
+            self._publish_unread_counts([user_id])
         return True
     
     def get_unread_count(self, user_id: str) -> int:
@@ -72,4 +196,33 @@ class NotificationService:
             Notification.user_id == user_id,
             Notification.is_read == False
         ).count()
-
+    
+    def _publish(self, created: List[Tuple[str, str, str, Notification]]) -> None:
+        """Announce new notifications from (user_id, id, type, notification) tuples."""
+        for user_id, notification_id, notification_type, _ in created:
+            event_bus.publish(EventTopic.NOTIFICATION_CREATED, {
+                "notification_id": notification_id,
+                "user_id": user_id,
+                "type": notification_type,
+            })
+        # Only rows for connected users are serialised, so no others are reloaded
+        connected = notification_stream.connected({user_id for user_id, *_ in created})
+        if not connected:
+            return
+        for user_id, _, _, notification in created:
+            if user_id in connected:
+                notification_stream.notification_created(notification)
+        self._publish_unread_counts(connected)
+    
+    def _publish_unread_counts(self, user_ids: Iterable[str]) -> None:
+        """Push fresh unread counts to whichever of these users are connected."""
+        connected = notification_stream.connected(user_ids)
+        if not connected:
+            return
+        counts = dict.fromkeys(connected, 0)
+        counts.update(self.db.query(Notification.user_id, func.count(Notification.id)).filter(
+            Notification.user_id.in_(connected),
+            Notification.is_read == False
+        ).group_by(Notification.user_id).all())
+        for user_id, count in counts.items():
+            notification_stream.unread_count_changed(user_id, count)
@@ -0,0 +1,236 @@
+from typing import Dict, List, Optional, Set, Tuple
+import logging
+
+from app.models.ride import Ride, RideStatus
+from app.schemas.driver import RideRequestResponse
+from app.core.config import settings
+from app.core.events import EventBus, EventTopic, OverflowPolicy, event_bus
+from app.core.presence import PresenceRegistry, presence
+from app.core.realtime import RealtimeHub, Subscriber, realtime_hub
+from app.core.spatial import GridIndex, driver_index, haversine_km, pending_pickups
+
+logger = logging.getLogger(__name__)
+
+def ride_request_response(ride: Ride, distance_km: Optional[float] = None) -> RideRequestResponse:
+    """Describe an open ride the way drivers see it."""
+    passenger = ride.passenger
+    return RideRequestResponse(
+        id=ride.id,
+        passenger_name=f"{passenger.first_name} {passenger.last_name}",
+        passenger_phone=passenger.phone,
+        pickup_address=ride.pickup_address,
+        destination_address=ride.destination_address,
+        pickup_latitude=ride.pickup_latitude,
+        pickup_longitude=ride.pickup_longitude,
+        destination_latitude=ride.destination_latitude,
+        destination_longitude=ride.destination_longitude,
+        ride_type=ride.ride_type,
+        fare=ride.fare,
+        distance=ride.distance,
+        estimated_duration=ride.duration,
+        requested_at=ride.requested_at,
+        notes=ride.notes,
+        distance_km=round(distance_km, 3) if distance_km is not None else None
+    )
+
+class OfferFeed:
+    """Pushes each new ride to the nearest available connected drivers.
+
+    Rides arrive as ``ride.requested`` events and are offered to up to
+    ``fanout`` drivers at once; an offer is retracted as soon as the ride is
+    accepted or cancelled. When a holder declines or takes another ride, the
+    next nearest driver who has not seen the ride is offered it instead.
+    Everything is answered from the in-memory indexes, so drivers on the feed
+    never hit the database to discover work.
+    """
+
+    def __init__(
+        self,
+        hub: RealtimeHub = realtime_hub,
+        drivers: GridIndex = driver_index,
+        pickups: GridIndex = pending_pickups,
+        registry: PresenceRegistry = presence,
+        fanout: int = settings.OFFER_FANOUT_DRIVERS,
+        radius_km: float = settings.RIDE_REQUEST_RADIUS_KM
+    ):
+        self.hub = hub
+        self.drivers = drivers
+        self.pickups = pickups
+        self.registry = registry
+        self.fanout = fanout
+        self.radius_km = radius_km
+        self.clear()
+
+    @staticmethod
+    def topic(driver_id: str) -> str:
+        return f"offers:{driver_id}"
+
+    def clear(self) -> None:
+        self._rides: Dict[str, dict] = {}  # open ride -> request as sent to drivers
+        self._holders: Dict[str, Set[str]] = {}  # ride -> drivers currently offered it
+        self._seen: Dict[str, Set[str]] = {}  # ride -> every driver ever offered it
+        self._driver_offers: Dict[str, Set[str]] = {}  # driver -> rides they hold
+        self.offers_sent = 0
+        self.retractions_sent = 0
+
+    def connect(self, driver_id: str) -> Tuple[Subscriber, List[dict]]:
+        """Subscribe a driver and return the offers they should see right away.
+
+        Call on the event loop. The snapshot holds the offers the driver
+        already has, plus nearby open rides that are still short of drivers.
+        """
+        subscriber = self.hub.subscribe(self.topic(driver_id))
+        position = self.drivers.get(driver_id)
+        if position is not None and self.registry.available([driver_id]):
+            nearby = self.pickups.nearest(position[0], position[1], radius_km=self.radius_km)
+            for ride_id, _ in nearby:
+                holders = self._holders.get(ride_id)
+                if holders is not None and len(holders) < self.fanout and driver_id not in self._seen[ride_id]:
+                    self._hold(ride_id, driver_id, push=False)
+        return subscriber, [
+            self._offer_message(ride_id, driver_id) for ride_id in self._driver_offers.get(driver_id, ())
+        ]
+
+    def disconnect(self, driver_id: str, subscriber: Subscriber) -> None:
+        """Unsubscribe a driver; once their last feed closes, pass their offers on."""
+        self.hub.unsubscribe(self.topic(driver_id), subscriber)
+        if not self.hub.subscriber_count(self.topic(driver_id)):
+            for ride_id in list(self._driver_offers.get(driver_id, ())):
+                self.declined(ride_id, driver_id)
+
+    def ride_requested(self, ride_id: str, request: dict) -> int:
+        """Offer a new ride; returns how many drivers got it."""
+        self._rides[ride_id] = request
+        self._holders[ride_id] = set()
+        self._seen[ride_id] = set()
+        return self._fill(ride_id)
+
+    def ride_closed(self, ride_id: str, reason: str) -> int:
+        """Retract a ride from everyone holding it; returns how many were told."""
+        if self._rides.pop(ride_id, None) is None:
+            return 0
+        self._seen.pop(ride_id, None)
+        holders = self._holders.pop(ride_id, set())
+        for driver_id in holders:
+            self._release(driver_id, ride_id)
+            self._retract(driver_id, ride_id, reason)
+        return len(holders)
+
+    def dispatched(self, ride_id: str, driver_id: str) -> bool:
+        """Offer a ride to the driver the dispatcher matched it with.
+
+        Returns False if the feed does not know the ride yet or the driver
+        has no open feed, so the dispatcher can try again.
+        """
+        holders = self._holders.get(ride_id)
+        if holders is None or not self.hub.subscriber_count(self.topic(driver_id)):
+            return False
+        if driver_id not in holders:
+            self._hold(ride_id, driver_id)
+        return True
+
+    def declined(self, ride_id: str, driver_id: str) -> None:
+        """Take a ride back from a driver who passed on it and offer it onwards."""
+        holders = self._holders.get(ride_id)
+        if holders is None or driver_id not in holders:
+            return
+        holders.discard(driver_id)
+        self._release(driver_id, ride_id)
+        self._fill(ride_id)
+
+    def driver_engaged(self, driver_id: str) -> None:
+        """Retract a driver's other offers once they are on a trip."""
+        for ride_id in list(self._driver_offers.get(driver_id, ())):
+            self._holders[ride_id].discard(driver_id)
+            self._release(driver_id, ride_id)
+            self._retract(driver_id, ride_id, "driver_busy")
+            self._fill(ride_id)
+
+    def _fill(self, ride_id: str) -> int:
+        """Top a ride up to ``fanout`` holders with the nearest eligible drivers."""
+        holders, seen = self._holders[ride_id], self._seen[ride_id]
+        needed = self.fanout - len(holders)
+        if needed <= 0:
+            return 0
+        request = self._rides[ride_id]
+        nearby = self.drivers.nearest(
+            request["pickup_latitude"], request["pickup_longitude"],
+            k=self.fanout * 4 + len(seen), radius_km=self.radius_km
+        )
+        # Only drivers with an open feed can be offered anything
+        connected = [
+            driver_id for driver_id, _ in nearby
+            if driver_id not in seen and self.hub.subscriber_count(self.topic(driver_id))
+        ]
+        chosen = self.registry.available(connected)[:needed]
+        for driver_id in chosen:
+            self._hold(ride_id, driver_id)
+        return len(chosen)
+
+    def _hold(self, ride_id: str, driver_id: str, push: bool = True) -> None:
+        self._holders[ride_id].add(driver_id)
+        self._seen[ride_id].add(driver_id)
+        self._driver_offers.setdefault(driver_id, set()).add(ride_id)
+        if push:
+            self.hub.publish(self.topic(driver_id), self._offer_message(ride_id, driver_id), coalesce_key=ride_id)
+        self.offers_sent += 1
+
+    def _release(self, driver_id: str, ride_id: str) -> None:
+        offers = self._driver_offers.get(driver_id)
+        if offers is not None:
+            offers.discard(ride_id)
+            if not offers:
+                del self._driver_offers[driver_id]
+
+    def _retract(self, driver_id: str, ride_id: str, reason: str) -> None:
+        # Replaces the offer if the driver has not been sent it yet
+        self.hub.publish(self.topic(driver_id), {
+            "type": "retract",
+            "ride_id": ride_id,
+            "reason": reason,
+        }, coalesce_key=ride_id)
+        self.retractions_sent += 1
+
+    def _offer_message(self, ride_id: str, driver_id: str) -> dict:
+        request = dict(self._rides[ride_id])
+        position = self.drivers.get(driver_id)
+        if position is not None:
+            distance = haversine_km(position[0], position[1], request["pickup_latitude"], request["pickup_longitude"])
+            request["distance_km"] = round(distance, 3)
+        return {"type": "offer", "ride_id": ride_id, "request": request}
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for the metrics endpoint."""
+        return {
+            "open_rides": len(self._rides),
+            "drivers_holding_offers": len(self._driver_offers),
+            "offers_sent": self.offers_sent,
+            "retractions_sent": self.retractions_sent,
+        }
+
+    async def run(self, bus: EventBus = event_bus) -> None:
+        """Follow ride events until cancelled."""
+        # Blocking rather than dropping, so no retraction is ever lost
+        subscription = bus.subscribe(
+            "ride-offers", [EventTopic.RIDE_REQUESTED, EventTopic.RIDE_STATUS_CHANGED],
+            policy=OverflowPolicy.BLOCK
+        )
+        try:
+            while True:
+                event = await subscription.get()
+                try:
+                    self.handle(event.topic, event.payload)
+                except Exception:
+                    logger.exception("Failed to handle %s for ride offers", event.topic.value)
+        finally:
+            bus.unsubscribe(subscription)
+
+    def handle(self, topic: EventTopic, payload: dict) -> None:
+        if topic is EventTopic.RIDE_REQUESTED:
+            self.ride_requested(payload["ride_id"], payload["request"])
+        elif payload["status"] != RideStatus.REQUESTED.value:
+            self.ride_closed(payload["ride_id"], payload["status"])
+            if payload["status"] == RideStatus.ACCEPTED.value and payload.get("driver_id"):
+                self.driver_engaged(payload["driver_id"])
+
+offer_feed = OfferFeed()
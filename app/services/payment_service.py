@@ -1,14 +1,17 @@
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from typing import Optional, List
+from typing import Optional, List, Union
 from datetime import datetime
 import uuid
 
 from app.models.payment import Payment, PaymentMethod, PaymentStatus, PaymentMethodType
 from app.schemas.payment import PaymentRequest, PaymentMethodCreate
+from app.core.events import event_bus, EventTopic
 
 class PaymentService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Union[Session, AsyncSession]):
         self.db = db
     
     def process_payment(self, payment_data: PaymentRequest, user_id: str) -> Payment:
@@ -29,12 +32,18 @@ class PaymentService:
         self.db.commit()
         self.db.refresh(payment)
         
+        self._publish(EventTopic.PAYMENT_COMPLETED, payment)
         return payment
     
     def get_payment_methods(self, user_id: str) -> List[PaymentMethod]:
         """Get user's payment methods."""
         return self.db.query(PaymentMethod).filter(PaymentMethod.user_id == user_id).all()
     
+    async def get_payment_methods_async(self, user_id: str) -> List[PaymentMethod]:
+        """Get user's payment methods through an asyncio session."""
+        methods = await self.db.scalars(select(PaymentMethod).where(PaymentMethod.user_id == user_id))
+        return methods.all()
+    
     def add_payment_method(self, method_data: PaymentMethodCreate, user_id: str) -> PaymentMethod:
         """Add a new payment method for user."""
         # If this is set as default, unset other defaults
@@ -69,6 +78,15 @@ class PaymentService:
         
         return payments, total
     
+    async def get_payment_history_async(self, user_id: str, page: int = 1, limit: int = 20) -> tuple[List[Payment], int]:
+        """Get user's payment history through an asyncio session."""
+        payments = await self.db.scalars(
+            select(Payment).where(Payment.user_id == user_id).offset((page - 1) * limit).limit(limit)
+        )
+        total = await self.db.scalar(select(func.count()).select_from(Payment).where(Payment.user_id == user_id))
+        
+        return payments.all(), total
+    
     def get_payment_by_id(self, payment_id: str) -> Optional[Payment]:
         """Get payment by ID."""
         return self.db.query(Payment).filter(Payment.id == payment_id).first()
@@ -92,5 +110,15 @@ class PaymentService:
         self.db.commit()
         self.db.refresh(payment)
         
+        self._publish(EventTopic.PAYMENT_REFUNDED, payment)
         return payment
+    
+    def _publish(self, topic: EventTopic, payment: Payment) -> None:
+        event_bus.publish(topic, {
+            "payment_id": payment.id,
+            "user_id": payment.user_id,
+            "ride_id": payment.ride_id,
+            "amount": payment.amount,
+            "method": payment.method.value,
+        })
 
@@ -1,20 +1,65 @@
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from typing import Optional, List
+from typing import Optional, List, Union
 from datetime import datetime
+import time
 import uuid
 
 from app.models.ride import Ride, RideStatus, RideType
 from app.models.user import User
 from app.models.rating import Rating
-from app.schemas.ride import RideRequest, RideEstimate
+from app.schemas.ride import RideRequest, RideEstimateRequest, RideEstimate
+from app.schemas.driver import AvailableDriver
+from app.core.spatial import driver_index, pending_pickups, snap_to_cell
+from app.core.cache import LRUCache
+from app.services.surge_service import surge_engine
+from app.services.tracking_service import ride_tracker
+from app.core.events import event_bus, EventTopic
+from app.services.offer_service import ride_request_response
+from app.core.presence import presence, PresenceStatus
+from app.core.routing import road_router
+from app.core.config import settings
+
+# Fare multiplier per vehicle class
+RIDE_TYPE_MULTIPLIERS = {
+    RideType.STANDARD: 1.0,
+    RideType.COMFORT: 1.3,
+    RideType.PREMIUM: 1.8,
+}
+
+# Estimates keyed by snapped pickup/destination cells, ride type, time bucket
+# and pricing parameters, so re-quotes while a pin is dragged skip routing
+quote_cache = LRUCache(settings.QUOTE_CACHE_SIZE, ttl=settings.QUOTE_CACHE_TTL_SECONDS)
+
+def pricing_version() -> tuple:
+    """Current pricing parameters; part of every quote key."""
+    return (
+        settings.BASE_FARE, settings.FARE_PER_KM, settings.FARE_PER_MINUTE, settings.MINIMUM_FARE,
+        tuple(RIDE_TYPE_MULTIPLIERS.items())
+    )
+
+def invalidate_quotes() -> None:
+    """Drop every cached quote, e.g. after loading a new road graph."""
+    quote_cache.clear()
 
 class RideService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Union[Session, AsyncSession]):
         self.db = db
     
     def create_ride_request(self, ride_data: RideRequest, passenger_id: str) -> Ride:
         """Create a new ride request."""
+        # Priced from the exact pickup and destination, not the cached cell quote
+        estimate = self._apply_surge(
+            self._quote(
+                (ride_data.pickup_latitude, ride_data.pickup_longitude),
+                (ride_data.destination_latitude, ride_data.destination_longitude),
+                ride_data.ride_type
+            ),
+            ride_data.pickup_latitude,
+            ride_data.pickup_longitude
+        )
         ride = Ride(
             id=str(uuid.uuid4()),
             status=RideStatus.REQUESTED,
@@ -25,9 +70,9 @@ class RideService:
             destination_latitude=ride_data.destination_latitude,
             destination_longitude=ride_data.destination_longitude,
             ride_type=ride_data.ride_type,
-            fare=ride_data.estimated_fare or 100.0,  # Default fare
-            distance=5.0,  # Default distance - would be calculated in real implementation
-            duration=15,  # Default duration - would be calculated in real implementation
+            fare=estimate.fare,
+            distance=estimate.distance,
+            duration=estimate.duration,
             notes=ride_data.notes,
             passenger_id=passenger_id
         )
@@ -36,8 +81,31 @@ class RideService:
         self.db.commit()
         self.db.refresh(ride)
         
+        pending_pickups.upsert(ride.id, ride.pickup_latitude, ride.pickup_longitude)
+        surge_engine.record_request(ride.pickup_latitude, ride.pickup_longitude)
+        event_bus.publish(EventTopic.RIDE_REQUESTED, {
+            "ride_id": ride.id,
+            "passenger_id": passenger_id,
+            "ride_type": ride.ride_type.value,
+            "pickup_latitude": ride.pickup_latitude,
+            "pickup_longitude": ride.pickup_longitude,
+            "fare": ride.fare,
+            # What drivers are offered; the passenger is already in the session
+            "request": ride_request_response(ride).model_dump(mode="json"),
+        })
         return ride
     
+    def index_pending_rides(self) -> int:
+        """Load pickups of unassigned rides into the pending pickup index."""
+        rides = self.db.query(Ride.id, Ride.pickup_latitude, Ride.pickup_longitude).filter(
+            Ride.status == RideStatus.REQUESTED,
+            Ride.driver_id.is_(None)
+        ).all()
+        
+        for ride_id, latitude, longitude in rides:
+            pending_pickups.upsert(ride_id, latitude, longitude)
+        return len(rides)
+    
     def get_active_ride(self, user_id: str) -> Optional[Ride]:
         """Get active ride for a user."""
         return self.db.query(Ride).filter(
@@ -55,18 +123,57 @@ class RideService:
         
         return rides, total
     
-    def get_ride_estimate(self, ride_data: dict) -> RideEstimate:
+    async def get_ride_history_async(self, user_id: str, page: int = 1, limit: int = 20) -> tuple[List[Ride], int]:
+        """Get ride history for a user through an asyncio session."""
+        rides = await self.db.scalars(
+            select(Ride).where(Ride.passenger_id == user_id).offset((page - 1) * limit).limit(limit)
+        )
+        total = await self.db.scalar(select(func.count()).select_from(Ride).where(Ride.passenger_id == user_id))
+        
+        return rides.all(), total
+    
+    def get_ride_estimate(self, ride_data: RideEstimateRequest) -> RideEstimate:
         """Get ride fare estimate."""
-        # Mock estimate - in real implementation, use Google Maps API
+        pickup = snap_to_cell(ride_data.pickup_latitude, ride_data.pickup_longitude, settings.QUOTE_CELL_KM)
+        destination = snap_to_cell(
+            ride_data.destination_latitude, ride_data.destination_longitude, settings.QUOTE_CELL_KM
+        )
+        key = (
+            pickup, destination, ride_data.ride_type,
+            int(time.time() // settings.QUOTE_TIME_BUCKET_SECONDS), pricing_version()
+        )
+        estimate = quote_cache.get_or_set(key, lambda: self._quote(pickup, destination, ride_data.ride_type))
+        # Surge moves every few seconds, so it is applied on top of the cached quote
+        return self._apply_surge(estimate.model_copy(deep=True), ride_data.pickup_latitude, ride_data.pickup_longitude)
+    
+    def _apply_surge(self, estimate: RideEstimate, latitude: float, longitude: float) -> RideEstimate:
+        surge = surge_engine.multiplier(latitude, longitude)
+        if surge != 1.0:
+            breakdown = estimate.breakdown
+            subtotal = breakdown["baseFare"] + breakdown["distanceFare"] + breakdown["timeFare"]
+            estimate.fare = round(max(settings.MINIMUM_FARE, subtotal * surge), 2)
+            breakdown["surgeMultiplier"] = surge
+        return estimate
+    
+    def _quote(self, pickup: tuple, destination: tuple, ride_type: RideType) -> RideEstimate:
+        route = road_router.route(*pickup, *destination)
+        minutes = max(1, round(route.duration_seconds / 60))
+        multiplier = RIDE_TYPE_MULTIPLIERS[ride_type]
+        base_fare = settings.BASE_FARE * multiplier
+        distance_fare = route.distance_km * settings.FARE_PER_KM * multiplier
+        time_fare = minutes * settings.FARE_PER_MINUTE * multiplier
+        fare = max(settings.MINIMUM_FARE, base_fare + distance_fare + time_fare)
+        
         return RideEstimate(
-            distance=5.2,
-            duration=15,
-            fare=120.0,
+            distance=round(route.distance_km, 2),
+            duration=minutes,
+            fare=round(fare, 2),
             breakdown={
-                "baseFare": 50.0,
-                "distanceFare": 60.0,
-                "timeFare": 10.0,
-                "surgeMultiplier": 1.0
+                "baseFare": round(base_fare, 2),
+                "distanceFare": round(distance_fare, 2),
+                "timeFare": round(time_fare, 2),
+                "surgeMultiplier": 1.0,
+                "routed": route.routed
             }
         )
     
@@ -99,15 +206,43 @@ class RideService:
         self.db.commit()
         self.db.refresh(ride)
         
+        if ride.status != RideStatus.REQUESTED or ride.driver_id:
+            pending_pickups.remove(ride.id)
+        if ride.status in (RideStatus.COMPLETED, RideStatus.CANCELLED):
+            self._release_driver(ride)
+        self._ride_changed(ride)
+        
         return ride
     
-    def get_available_drivers(self, latitude: float, longitude: float, radius: float = 5.0) -> List[User]:
-        """Get available drivers near a location."""
-        # Mock implementation - in real implementation, use geospatial queries
-        return self.db.query(User).filter(
-            User.role == "driver",
-            User.is_verified == True
-        ).limit(10).all()
+    def get_available_drivers(
+        self, latitude: float, longitude: float, radius: float = 5.0, limit: Optional[int] = None
+    ) -> List[AvailableDriver]:
+        """Get available drivers near a location, closest first."""
+        limit = min(limit or settings.AVAILABLE_DRIVERS_LIMIT, settings.MAX_PAGE_SIZE)
+        
+        # Over-fetch so drivers busy on a trip can be dropped in one presence
+        # lookup; widen until enough are free or the radius holds no more
+        k, checked, available = limit * 3, 0, []
+        while True:
+            nearby = driver_index.nearest(latitude, longitude, k=k, radius_km=radius)
+            available += presence.available(driver_id for driver_id, _ in nearby[checked:])
+            checked = len(nearby)
+            if len(available) >= limit or len(nearby) < k:
+                break
+            k *= 2
+        distances = dict(nearby)
+        
+        drivers = []
+        for driver_id in available[:limit]:
+            distance = distances[driver_id]
+            driver_latitude, driver_longitude = driver_index.get(driver_id)
+            drivers.append(AvailableDriver(
+                driver_id=driver_id,
+                latitude=driver_latitude,
+                longitude=driver_longitude,
+                distance_km=round(distance, 3)
+            ))
+        return drivers
     
     def get_ride_by_id(self, ride_id: str) -> Optional[Ride]:
         """Get ride by ID."""
@@ -129,6 +264,10 @@ class RideService:
         self.db.commit()
         self.db.refresh(ride)
         
+        pending_pickups.remove(ride.id)
+        self._release_driver(ride)
+        self._ride_changed(ride)
+        
         return ride
     
     def complete_ride(self, ride_id: str) -> Ride:
@@ -146,8 +285,26 @@ class RideService:
         self.db.commit()
         self.db.refresh(ride)
         
+        pending_pickups.remove(ride.id)
+        self._release_driver(ride)
+        self._ride_changed(ride)
+        
         return ride
     
+    def _ride_changed(self, ride: Ride) -> None:
+        """Tell live trackers and event subscribers about a ride's new status."""
+        ride_tracker.ride_updated(ride)
+        event_bus.publish(EventTopic.RIDE_STATUS_CHANGED, {
+            "ride_id": ride.id,
+            "status": ride.status.value,
+            "driver_id": ride.driver_id,
+        })
+    
+    def _release_driver(self, ride: Ride) -> None:
+        """Make the ride's driver matchable again once the trip is over."""
+        if ride.driver_id and presence.get(ride.driver_id).status == PresenceStatus.BUSY:
+            presence.set_status(ride.driver_id, PresenceStatus.ONLINE)
+    
     def rate_ride(self, ride_id: str, user_id: str, rating: int, comment: Optional[str] = None) -> None:
         """Rate a ride."""
         ride = self.get_ride_by_id(ride_id)
@@ -0,0 +1,134 @@
+from typing import Callable, Dict, Tuple
+import asyncio
+import logging
+import math
+import time
+import numpy as np
+
+from app.core.config import settings
+from app.core.spatial import KM_PER_DEGREE
+
+logger = logging.getLogger(__name__)
+
+Cell = Tuple[int, int]
+
+class SurgeEngine:
+    """Per-cell surge multipliers from sliding-window supply and demand.
+
+    Ride requests and available-driver sightings are counted into a ring of
+    ``window / bucket`` time buckets per grid cell as they happen, so nothing
+    is ever rescanned. ``recompute`` turns the window totals into multipliers
+    for every cell in one vectorised pass and publishes the cells that surge,
+    which makes ``multiplier`` a single dict lookup.
+
+    Demand is requests in the window; supply is the average number of
+    distinct available drivers seen per bucket.
+    """
+
+    def __init__(
+        self,
+        cell_km: float = settings.SURGE_CELL_KM,
+        window_seconds: float = settings.SURGE_WINDOW_SECONDS,
+        bucket_seconds: float = settings.SURGE_BUCKET_SECONDS,
+        clock: Callable[[], float] = time.time
+    ):
+        self.cell_deg = cell_km / KM_PER_DEGREE
+        self.bucket_seconds = bucket_seconds
+        self.slots = max(1, math.ceil(window_seconds / bucket_seconds))
+        self.clock = clock
+        self.clear()
+
+    def clear(self) -> None:
+        self._cells: Dict[Cell, int] = {}
+        self._demand = np.zeros((self.slots, 64), dtype=np.int32)
+        self._supply = np.zeros((self.slots, 64), dtype=np.int32)
+        self._slot_epochs = np.full(self.slots, -1, dtype=np.int64)
+        self._seen: Dict[str, Tuple[int, int]] = {}  # driver -> (epoch, cell index) last counted
+        self._published: Dict[Cell, float] = {}
+
+    def _cell(self, latitude: float, longitude: float) -> Cell:
+        return (math.floor(latitude / self.cell_deg), math.floor(longitude / self.cell_deg))
+
+    def _index(self, cell: Cell) -> int:
+        index = self._cells.get(cell)
+        if index is None:
+            index = self._cells[cell] = len(self._cells)
+            capacity = self._demand.shape[1]
+            if index >= capacity:
+                grow = ((0, 0), (0, capacity))
+                self._demand = np.pad(self._demand, grow)
+                self._supply = np.pad(self._supply, grow)
+        return index
+
+    def _slot(self, now: float) -> Tuple[int, int]:
+        epoch = int(now // self.bucket_seconds)
+        slot = epoch % self.slots
+        if self._slot_epochs[slot] != epoch:
+            # The bucket last held counts from a full window ago
+            self._demand[slot] = 0
+            self._supply[slot] = 0
+            self._slot_epochs[slot] = epoch
+        return epoch, slot
+
+    def record_request(self, latitude: float, longitude: float) -> None:
+        """Count a ride request at its pickup point."""
+        _, slot = self._slot(self.clock())
+        self._demand[slot, self._index(self._cell(latitude, longitude))] += 1
+
+    def record_driver(self, driver_id: str, latitude: float, longitude: float) -> None:
+        """Count an available driver, at most once per bucket."""
+        epoch, slot = self._slot(self.clock())
+        index = self._index(self._cell(latitude, longitude))
+        if self._seen.get(driver_id) == (epoch, index):
+            return
+        self._seen[driver_id] = (epoch, index)
+        self._supply[slot, index] += 1
+
+    def multiplier(self, latitude: float, longitude: float) -> float:
+        """Current multiplier for the cell containing a point."""
+        return self._published.get(self._cell(latitude, longitude), 1.0)
+
+    def recompute(self) -> int:
+        """Recalculate every cell's multiplier; returns how many cells surge."""
+        now = self.clock()
+        epoch = int(now // self.bucket_seconds)
+        live = (self._slot_epochs > epoch - self.slots)[:, None]
+        count = len(self._cells)
+        demand = np.where(live, self._demand[:, :count], 0).sum(axis=0)
+        supply = np.where(live, self._supply[:, :count], 0).sum(axis=0) / max(1, int(live.sum()))
+
+        ratio = demand / np.maximum(supply, 1e-9)
+        raw = 1.0 + settings.SURGE_SENSITIVITY * (ratio - settings.SURGE_DEMAND_THRESHOLD)
+        step = settings.SURGE_STEP
+        multipliers = np.clip(np.floor(raw / step + 1e-9) * step, 1.0, settings.SURGE_MAX_MULTIPLIER)
+        multipliers[demand < settings.SURGE_MIN_REQUESTS] = 1.0
+
+        cells = list(self._cells)
+        self._published = {
+            cells[index]: round(float(multipliers[index]), 2) for index in np.flatnonzero(multipliers > 1.0)
+        }
+        # Forget drivers that have not been counted within the window
+        if len(self._seen) > 2 * max(1, int(supply.sum())) + 1024:
+            self._seen = {
+                driver_id: seen for driver_id, seen in self._seen.items() if seen[0] > epoch - self.slots
+            }
+        return len(self._published)
+
+    def stats(self) -> Dict[str, float]:
+        """Counters for the metrics endpoint."""
+        return {
+            "cells": len(self._cells),
+            "surging_cells": len(self._published),
+            "max_multiplier": max(self._published.values(), default=1.0),
+        }
+
+    async def run(self, interval: float) -> None:
+        """Recompute multipliers every ``interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.recompute()
+            except Exception:
+                logger.exception("Failed to recompute surge multipliers")
+
+surge_engine = SurgeEngine()
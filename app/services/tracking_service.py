@@ -0,0 +1,79 @@
+from typing import Dict, Optional, Tuple
+from datetime import datetime
+
+from app.models.ride import Ride, RideStatus
+from app.core.realtime import RealtimeHub, realtime_hub
+
+# Statuses during which the assigned driver's position is streamed
+TRACKED_STATUSES = (RideStatus.ACCEPTED, RideStatus.ARRIVED, RideStatus.STARTED)
+
+class RideTracker:
+    """Pushes ride status transitions and driver movement to ride subscribers.
+
+    Keeps a driver -> active ride map so a location ping is routed to the
+    right ride topic with a dict lookup, and skips positions that have not
+    changed since the last one sent.
+    """
+
+    def __init__(self, hub: RealtimeHub = realtime_hub):
+        self.hub = hub
+        self._driver_rides: Dict[str, str] = {}
+        self._last_sent: Dict[str, Tuple[float, float]] = {}
+
+    @staticmethod
+    def topic(ride_id: str) -> str:
+        return f"ride:{ride_id}"
+
+    def clear(self) -> None:
+        self._driver_rides.clear()
+        self._last_sent.clear()
+
+    def follow(self, ride_id: str, status: RideStatus, driver_id: Optional[str] = None) -> None:
+        """Start or stop routing the driver's pings to the ride, to match its status."""
+        if driver_id and status in TRACKED_STATUSES:
+            self._driver_rides[driver_id] = ride_id
+        elif driver_id and self._driver_rides.get(driver_id) == ride_id:
+            del self._driver_rides[driver_id]
+            self._last_sent.pop(driver_id, None)
+
+    def status_changed(self, ride_id: str, status: RideStatus, driver_id: Optional[str] = None) -> int:
+        """Publish a status transition."""
+        status = RideStatus(status)
+        self.follow(ride_id, status, driver_id)
+        return self.hub.publish(self.topic(ride_id), {
+            "type": "status",
+            "ride_id": ride_id,
+            "status": status.value,
+            "driver_id": driver_id,
+        })
+
+    def ride_updated(self, ride: Ride) -> int:
+        """Publish a ride's current status."""
+        return self.status_changed(ride.id, ride.status, ride.driver_id)
+
+    def driver_moved(
+        self,
+        driver_id: str,
+        latitude: float,
+        longitude: float,
+        heading: Optional[float] = None,
+        speed: Optional[float] = None,
+        recorded_at: Optional[datetime] = None
+    ) -> int:
+        """Publish a driver's new position to their active ride, if any."""
+        ride_id = self._driver_rides.get(driver_id)
+        if ride_id is None or self._last_sent.get(driver_id) == (latitude, longitude):
+            return 0
+        self._last_sent[driver_id] = (latitude, longitude)
+        return self.hub.publish(self.topic(ride_id), {
+            "type": "location",
+            "ride_id": ride_id,
+            "driver_id": driver_id,
+            "latitude": latitude,
+            "longitude": longitude,
+            "heading": heading,
+            "speed": speed,
+            "recorded_at": recorded_at.isoformat() if recorded_at else None,
+        }, coalesce_key="location")
+
+ride_tracker = RideTracker()
@@ -5,6 +5,8 @@ from datetime import datetime
 
 from app.models.user import User
 from app.schemas.user import UserUpdate
+from app.core.token_versions import token_versions
+from app.services.auth_service import invalidate_cached_users
 
 class UserService:
     def __init__(self, db: Session):
@@ -23,15 +25,25 @@ class UserService:
                 detail="User not found"
             )
         
+        previous_email, previous_role = user.email, user.role
+        
         # Update fields
         update_dict = update_data.dict(exclude_unset=True)
         for field, value in update_dict.items():
             if hasattr(user, field) and value is not None:
                 setattr(user, field, value)
         
+        # Access tokens carry the email and role, so outstanding ones are revoked
+        claims_changed = (user.email, user.role) != (previous_email, previous_role)
+        if claims_changed:
+            user.token_version = (user.token_version or 0) + 1
+        
         user.updated_at = datetime.utcnow()
         self.db.commit()
         self.db.refresh(user)
+        invalidate_cached_users(previous_email, user.email)
+        if claims_changed:
+            token_versions.revoke_before(user.id, user.token_version)
         
         return user
     
@@ -55,7 +67,10 @@ class UserService:
         # In a real implementation, you might want to add an is_active field
         # For now, we'll just update the last_active_at timestamp
         user.last_active_at = datetime.utcnow()
+        user.token_version = (user.token_version or 0) + 1
         self.db.commit()
+        invalidate_cached_users(user.email)
+        token_versions.revoke_before(user.id, user.token_version)
         
         return True
 
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark ride acceptance under contention: read-check-write vs conditional UPDATE
+
+Run from the repository root: python -m benchmarks.bench_accept_contention
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.ride import Ride, RideStatus
+from app.services.driver_service import DriverService
+
+RIDES = 50
+DRIVERS = 300
+WORKERS = 32
+
+def legacy_accept(db, ride_id: str, driver_id: str) -> None:
+    """The previous SELECT, check in Python, then commit implementation."""
+    ride = db.query(Ride).filter(Ride.id == ride_id).first()
+    if ride.status != RideStatus.REQUESTED or ride.driver_id:
+        raise HTTPException(status_code=400, detail="Ride is no longer available")
+    ride.driver_id = driver_id
+    ride.status = RideStatus.ACCEPTED
+    ride.accepted_at = datetime.utcnow()
+    db.commit()
+
+def conditional_accept(db, ride_id: str, driver_id: str) -> None:
+    DriverService(db).accept_ride_request(ride_id, driver_id)
+
+def run(label: str, accept):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    ride_ids = [str(uuid.uuid4()) for _ in range(RIDES)]
+    with Session() as db:
+        db.add_all(Ride(
+            id=ride_id, status=RideStatus.REQUESTED, pickup_address="A", destination_address="B",
+            pickup_latitude=-1.29, pickup_longitude=36.82, destination_latitude=-1.30,
+            destination_longitude=36.78, fare=150.0, distance=5.0, duration=15, passenger_id="p"
+        ) for ride_id in ride_ids)
+        db.commit()
+
+    # Every driver goes for the same handful of hot rides first
+    attempts = [(ride_id, f"driver-{i}") for i in range(DRIVERS) for ride_id in ride_ids[:5]]
+    random.Random(3).shuffle(attempts)
+
+    def attempt(args):
+        ride_id, driver_id = args
+        db = Session()
+        start = time.perf_counter()
+        try:
+            accept(db, ride_id, driver_id)
+            won = True
+        except HTTPException:
+            won = False
+        finally:
+            db.close()
+        return won, (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(attempt, attempts))
+    elapsed = time.perf_counter() - start
+
+    wins = Counter(ride_id for (ride_id, _), (won, _) in zip(attempts, results) if won)
+    latencies = sorted(ms for _, ms in results)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{label}: {len(attempts)} accepts by {DRIVERS} drivers on 5 rides, {WORKERS} threads")
+    print(f"  successful accepts per ride: {sorted(wins.values(), reverse=True)} (correct is [1, 1, 1, 1, 1])")
+    print(f"  latency p50 {statistics.median(latencies):6.2f} ms  p99 {p99:6.2f} ms  "
+          f"throughput {len(attempts) / elapsed:8.0f} accepts/sec")
+    engine.dispose()
+
+if __name__ == "__main__":
+    run("read-check-write", legacy_accept)
+    run("conditional UPDATE", conditional_accept)
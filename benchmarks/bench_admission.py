@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Measure ride status update latency while history requests flood the loop
+
+Drives a loop-bound ASGI app directly, once bare and once behind
+AdmissionMiddleware, and reports the status updates' p99 and how many
+history requests were shed. Wall-clock numbers depend on the machine, so
+this lives here rather than in the test suite.
+
+Run from the repository root: python -m benchmarks.bench_admission
+"""
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.core.admission import LOW, AdmissionController
+from app.middleware.admission import AdmissionMiddleware
+
+LOW_REQUESTS = 300
+CRITICAL_REQUESTS = 40
+
+async def endpoint(scope, receive, send):
+    if scope["path"] == "/api/v1/rides/history":
+        # CPU-bound work on the event loop, like serialising a long history
+        time.sleep(0.002)
+        await asyncio.sleep(0)
+        time.sleep(0.002)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+def p99(samples: list) -> float:
+    return statistics.quantiles(samples, n=100)[98]
+
+def overload(app) -> tuple:
+    """Flood ``app`` with history requests while timing ride status updates."""
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            async def update(index):
+                # Timed from when the client means to send, so loop lag before sending counts
+                sent = start + index * 0.01
+                await asyncio.sleep(sent - time.perf_counter())
+                response = await http.put(f"/api/v1/rides/ride-{index}/status")
+                return response.status_code, time.perf_counter() - sent
+
+            start = time.perf_counter()
+            flood = [http.get("/api/v1/rides/history") for _ in range(LOW_REQUESTS)]
+            updates = [update(index) for index in range(CRITICAL_REQUESTS)]
+            results = await asyncio.gather(*flood, *updates)
+        return results[:LOW_REQUESTS], results[LOW_REQUESTS:]
+
+    return asyncio.run(scenario())
+
+def main():
+    print(f"{LOW_REQUESTS} history requests, {CRITICAL_REQUESTS} status updates")
+    _, unprotected = overload(endpoint)
+    print(f"  no admission control   p99 {p99([latency for _, latency in unprotected]) * 1000:7.1f} ms")
+
+    controller = AdmissionController(target_latency=0.02, low_priority_concurrency=4, queue_timeout=0.05)
+    _, protected = overload(AdmissionMiddleware(endpoint, controller))
+    print(
+        f"  admission control      p99 {p99([latency for _, latency in protected]) * 1000:7.1f} ms;"
+        f"  shed {controller.shed[LOW]} history requests"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark the sync and asyncio database paths under concurrent read load
+
+Each mode runs a fresh single uvicorn worker against the same scratch SQLite
+database and serves GET /rides/history and /notifications/ to concurrent
+passengers. Alongside the load, /health is probed on a timer: on the sync path
+every query runs on the event loop thread, so even requests that never touch
+the database queue behind it.
+
+Run from the repository root: python -m benchmarks.bench_async_db
+"""
+import asyncio
+import logging
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+PASSENGERS = 200
+ROWS_PER_PASSENGER = 40
+REQUESTS = 4000
+CONCURRENCY = 10  # below the server's DB pool size
+PROBE_INTERVAL = 0.02
+PATHS = ["/rides/history?limit=20", "/notifications/?limit=20"]
+
+MODES = [
+    ("sync", {"DATABASE_ASYNC": "false"}),
+    ("asyncio", {"DATABASE_ASYNC": "true"}),
+]
+
+workdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/async.db"
+
+import httpx
+from app.core.database import Base, engine, SessionLocal
+from app.core.security import create_access_token
+from app.models import User, Ride, Notification
+from app.models.ride import RideStatus
+from app.models.user import UserRole
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+def percentiles(samples: list) -> str:
+    samples = sorted(samples)
+    return f"p50 {statistics.median(samples):6.1f} ms   p99 {samples[max(0, int(len(samples) * 0.99) - 1)]:6.1f} ms"
+
+def seed() -> list:
+    Base.metadata.create_all(bind=engine)
+    users, rides, notifications, tokens = [], [], [], []
+    for index in range(PASSENGERS):
+        user_id = str(uuid.uuid4())
+        users.append(dict(
+            id=user_id, first_name="P", last_name=str(index), email=f"p{index}@bench.local",
+            phone=f"+2541{index:08d}", hashed_password="x", role=UserRole.PASSENGER
+        ))
+        tokens.append(create_access_token({"sub": f"p{index}@bench.local"}))
+        for _ in range(ROWS_PER_PASSENGER):
+            rides.append(dict(
+                id=str(uuid.uuid4()), status=RideStatus.COMPLETED, pickup_address="A", destination_address="B",
+                pickup_latitude=-1.29, pickup_longitude=36.82, destination_latitude=-1.30,
+                destination_longitude=36.78, fare=150.0, distance=5.0, duration=15, passenger_id=user_id
+            ))
+            notifications.append(dict(
+                id=str(uuid.uuid4()), title="Ride", message="Completed", type="ride", user_id=user_id
+            ))
+    with SessionLocal() as db:
+        db.bulk_insert_mappings(User, users)
+        db.bulk_insert_mappings(Ride, rides)
+        db.bulk_insert_mappings(Notification, notifications)
+        db.commit()
+    return tokens
+
+async def run_mode(tokens: list, overrides: dict) -> dict:
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, **overrides}
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        limits = httpx.Limits(max_connections=CONCURRENCY + 1)
+        async with httpx.AsyncClient(timeout=httpx.Timeout(60, pool=None), limits=limits) as http:
+            for _ in range(100):
+                try:
+                    await http.get(f"{base}/health")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            # Warm the user cache so both modes measure the list queries
+            for token in tokens:
+                await http.get(f"{base}/api/v1/rides/history?limit=1", headers={"Authorization": f"Bearer {token}"})
+
+            latencies, probes, failures = [], [], 0
+            queue = iter(range(REQUESTS))
+            running = True
+
+            async def worker():
+                nonlocal failures
+                for index in queue:
+                    token = tokens[index % len(tokens)]
+                    sent = time.perf_counter()
+                    response = await http.get(
+                        f"{base}/api/v1{PATHS[index % len(PATHS)]}", headers={"Authorization": f"Bearer {token}"}
+                    )
+                    latencies.append((time.perf_counter() - sent) * 1000)
+                    failures += response.status_code != 200
+
+            async def probe():
+                while running:
+                    sent = time.perf_counter()
+                    await http.get(f"{base}/health")
+                    probes.append((time.perf_counter() - sent) * 1000)
+                    await asyncio.sleep(PROBE_INTERVAL)
+
+            prober = asyncio.create_task(probe())
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+            elapsed = time.perf_counter() - start
+            running = False
+            await prober
+    finally:
+        server.terminate()
+        server.wait()
+    return {"rps": REQUESTS / elapsed, "latencies": latencies, "probes": probes, "failures": failures}
+
+async def main():
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    tokens = seed()
+    print(f"{REQUESTS} list requests ({', '.join(PATHS)}), {CONCURRENCY} concurrent, "
+          f"{PASSENGERS} passengers x {ROWS_PER_PASSENGER} rows")
+    for name, overrides in MODES:
+        result = await run_mode(tokens, overrides)
+        print(f"  {name:<8} {result['rps']:7.0f} req/s   list {percentiles(result['latencies'])}   "
+              f"/health {percentiles(result['probes'])}   errors {result['failures']}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark one dispatch tick over thousands of pending rides and online drivers
+
+Run from the repository root: python -m benchmarks.bench_dispatch
+"""
+import time
+import numpy as np
+
+from app.core.config import settings
+from app.services.dispatch_service import candidate_costs, solve_assignment, _complete_greedily
+
+CENTER = (-1.2921, 36.8219)
+SPREAD_DEG = 0.15  # roughly a 33 km square
+
+def run(rides: int, drivers: int, budget_ms: float):
+    rng = np.random.default_rng(rides * 31 + drivers)
+    ride_coords = np.column_stack([
+        CENTER[0] + rng.uniform(-SPREAD_DEG, SPREAD_DEG, rides),
+        CENTER[1] + rng.uniform(-SPREAD_DEG, SPREAD_DEG, rides),
+    ])
+    driver_coords = np.column_stack([
+        CENTER[0] + rng.uniform(-SPREAD_DEG, SPREAD_DEG, drivers),
+        CENTER[1] + rng.uniform(-SPREAD_DEG, SPREAD_DEG, drivers),
+    ])
+    seconds_per_km = 3600.0 * settings.ROAD_DETOUR_FACTOR / settings.AVERAGE_SPEED_KMH
+
+    start = time.perf_counter()
+    candidates, costs = candidate_costs(
+        ride_coords, driver_coords, settings.DISPATCH_CANDIDATES_PER_RIDE,
+        settings.DISPATCH_MAX_PICKUP_KM, seconds_per_km
+    )
+    candidate_ms = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    assigned = solve_assignment(candidates, costs, drivers, deadline=start + budget_ms / 1e3)
+    solve_ms = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    greedy = _complete_greedily(np.full(rides, -1), candidates, costs, drivers)
+    greedy_ms = (time.perf_counter() - start) * 1e3
+
+    def summary(assignment):
+        matched = assignment >= 0
+        slots = (candidates[matched] == assignment[matched][:, None]).argmax(axis=1)
+        return matched.sum(), costs[matched][np.arange(matched.sum()), slots].sum()
+
+    matched, total = summary(assigned)
+    greedy_matched, greedy_total = summary(greedy)
+    print(f"{rides} rides x {drivers} drivers (budget {budget_ms:.0f} ms)")
+    print(f"  candidates {candidate_ms:8.1f} ms   auction {solve_ms:8.1f} ms   greedy {greedy_ms:8.1f} ms")
+    print(f"  auction: {matched} matched, mean pickup {total / max(matched, 1):6.1f} s")
+    print(f"  greedy:  {greedy_matched} matched, mean pickup {greedy_total / max(greedy_matched, 1):6.1f} s")
+
+if __name__ == "__main__":
+    for rides, drivers in ((1_000, 1_000), (2_000, 3_000), (5_000, 5_000), (5_000, 2_000)):
+        run(rides, drivers, settings.DISPATCH_TIME_BUDGET_MS)
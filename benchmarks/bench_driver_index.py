@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark the in-memory driver index against the users-table query path
+
+Run from the repository root: python -m benchmarks.bench_driver_index
+"""
+import random
+import time
+import uuid
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.spatial import GridIndex, haversine_km
+from app.models import User
+from app.models.user import UserRole
+
+CENTER = (-1.2921, 36.8219)  # Nairobi CBD
+SPREAD_DEG = 0.25  # roughly a 55 km square
+QUERIES = 2000
+
+def timed(label: str, fn, queries):
+    start = time.perf_counter()
+    for query in queries:
+        fn(*query)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<38} {elapsed / len(queries) * 1e6:10.1f} us/query")
+
+def seed_users(session, count: int):
+    session.bulk_insert_mappings(User, [
+        {
+            "id": str(uuid.uuid4()),
+            "first_name": "Driver",
+            "last_name": str(i),
+            "email": f"driver{i}@bench.local",
+            "phone": f"+2547{i:08d}",
+            "hashed_password": "x",
+            "role": UserRole.DRIVER,
+            "is_verified": True,
+        }
+        for i in range(count)
+    ])
+    session.commit()
+
+def run(count: int):
+    rng = random.Random(42)
+    positions = {
+        f"driver-{i}": (CENTER[0] + rng.uniform(-SPREAD_DEG, SPREAD_DEG),
+                        CENTER[1] + rng.uniform(-SPREAD_DEG, SPREAD_DEG))
+        for i in range(count)
+    }
+    queries = [
+        (CENTER[0] + rng.uniform(-SPREAD_DEG, SPREAD_DEG), CENTER[1] + rng.uniform(-SPREAD_DEG, SPREAD_DEG))
+        for _ in range(QUERIES)
+    ]
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    seed_users(session, count)
+
+    index = GridIndex(cell_km=1.0)
+    start = time.perf_counter()
+    for key, (lat, lon) in positions.items():
+        index.upsert(key, lat, lon)
+    build_ms = (time.perf_counter() - start) * 1e3
+
+    print(f"{count} drivers (index build {build_ms:.1f} ms)")
+    timed("users query (legacy, ignores location)", lambda lat, lon: session.query(User).filter(
+        User.role == "driver",
+        User.is_verified == True
+    ).limit(10).all(), queries[:200])
+    timed("full scan + distance filter", lambda lat, lon: sorted(
+        (haversine_km(lat, lon, p[0], p[1]), key) for key, p in positions.items()
+    )[:10], queries[:20])
+    timed("index nearest k=10, r=5km", lambda lat, lon: index.nearest(lat, lon, k=10, radius_km=5.0), queries)
+    timed("index nearest k=1", lambda lat, lon: index.nearest(lat, lon, k=1), queries)
+    timed("index within 1km", lambda lat, lon: index.within_radius(lat, lon, 1.0), queries)
+
+    session.close()
+    engine.dispose()
+
+if __name__ == "__main__":
+    for count in (1_000, 10_000, 50_000):
+        run(count)
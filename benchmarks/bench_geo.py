@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorised geo kernels against a per-pair Python loop
+
+Run from the repository root: python -m benchmarks.bench_geo
+"""
+import random
+import time
+from array import array
+import numpy as np
+
+from app.core import geo
+from app.core.spatial import haversine_km
+
+CENTER = (-1.2921, 36.8219)  # Nairobi CBD
+SPREAD_DEG = 0.25
+SIZES = [(1000, 1000), (10000, 1000)]
+
+def random_buffer(rng: random.Random, count: int) -> array:
+    """Interleaved lat/lon pairs, the way the services hand them over."""
+    values = array("d")
+    for _ in range(count):
+        values.append(CENTER[0] + rng.uniform(-SPREAD_DEG, SPREAD_DEG))
+        values.append(CENTER[1] + rng.uniform(-SPREAD_DEG, SPREAD_DEG))
+    return values
+
+def naive(origins: array, destinations: array):
+    return [
+        [haversine_km(origins[i], origins[i + 1], destinations[j], destinations[j + 1])
+         for j in range(0, len(destinations), 2)]
+        for i in range(0, len(origins), 2)
+    ]
+
+def timed(label: str, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed * 1000:10.1f} ms")
+    return result, elapsed
+
+def main():
+    rng = random.Random(42)
+    for n, m in SIZES:
+        origins, destinations = random_buffer(rng, n), random_buffer(rng, m)
+        print(f"{n} x {m} pairs")
+        reference, slow = timed("per-pair Python loop", naive, origins, destinations)
+        exact, fast = timed("haversine_matrix", geo.haversine_matrix, origins, destinations)
+        timed("equirectangular_matrix f32", geo.equirectangular_matrix, origins, destinations, np.float32)
+        timed("eta_matrix", geo.eta_matrix, origins, destinations)
+        assert np.allclose(exact, np.array(reference), rtol=1e-9)
+        print(f"  speedup {slow / fast:.0f}x")
+
+if __name__ == "__main__":
+    main()
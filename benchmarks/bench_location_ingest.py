@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark driver location ingestion throughput on a single worker
+
+Run from the repository root: python -m benchmarks.bench_location_ingest
+"""
+import logging
+import random
+import time
+import uuid
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.core.database import Base, get_db
+from app.core.security import create_access_token
+from app.models import User
+from app.models.user import UserRole
+from app.schemas.driver import LocationPoint
+from app.services.location_service import LocationBuffer
+
+CENTER = (-1.2921, 36.8219)
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+def bench_buffer(drivers: int, pings: int):
+    """Ingest pings straight into the buffer, then flush once."""
+    rng = random.Random(1)
+    driver_ids = [str(uuid.uuid4()) for _ in range(drivers)]
+    batches = [
+        (rng.choice(driver_ids), [LocationPoint(
+            latitude=CENTER[0] + rng.uniform(-0.2, 0.2),
+            longitude=CENTER[1] + rng.uniform(-0.2, 0.2)
+        )])
+        for _ in range(pings)
+    ]
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    buffer = LocationBuffer()
+
+    start = time.perf_counter()
+    for driver_id, points in batches:
+        buffer.ingest(driver_id, points)
+    ingest_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    written = buffer.flush(session)
+    flush_s = time.perf_counter() - start
+
+    print(f"buffer: {pings} pings from {drivers} drivers")
+    print(f"  ingest  {pings / ingest_s:12,.0f} pings/sec")
+    print(f"  flush   {written} rows in {flush_s * 1e3:.1f} ms "
+          f"(vs {pings} commits if every ping were persisted)")
+    session.close()
+
+def bench_http(drivers: int, requests: int, batch: int):
+    """Post pings through the full HTTP stack, including authentication."""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    session = Session()
+    emails = [f"driver{i}@bench.local" for i in range(drivers)]
+    session.bulk_insert_mappings(User, [
+        {
+            "id": str(uuid.uuid4()), "first_name": "Driver", "last_name": str(i), "email": email,
+            "phone": f"+2547{i:08d}", "hashed_password": "x", "role": UserRole.DRIVER, "is_verified": True,
+        }
+        for i, email in enumerate(emails)
+    ])
+    session.commit()
+    session.close()
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    headers = [{"Authorization": f"Bearer {create_access_token({'sub': email})}"} for email in emails]
+    rng = random.Random(2)
+    payload = lambda: {"points": [
+        {"latitude": CENTER[0] + rng.uniform(-0.2, 0.2), "longitude": CENTER[1] + rng.uniform(-0.2, 0.2)}
+        for _ in range(batch)
+    ]}
+
+    with TestClient(app) as client:
+        start = time.perf_counter()
+        for i in range(requests):
+            client.post("/api/v1/drivers/location", json=payload(), headers=headers[i % drivers])
+        elapsed = time.perf_counter() - start
+
+    app.dependency_overrides.pop(get_db)
+    print(f"http: {requests} requests x {batch} points from {drivers} drivers")
+    print(f"  {requests / elapsed:12,.0f} requests/sec  {requests * batch / elapsed:12,.0f} pings/sec")
+
+if __name__ == "__main__":
+    bench_buffer(drivers=10_000, pings=200_000)
+    bench_http(drivers=500, requests=3_000, batch=1)
+    bench_http(drivers=500, requests=1_000, batch=10)
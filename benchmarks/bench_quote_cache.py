@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark fare quotes with and without the quote cache under pin-dragging traffic
+
+Run from the repository root: python -m benchmarks.bench_quote_cache
+"""
+import random
+import time
+import numpy as np
+
+from app.core.config import settings
+from app.core.routing import RoadGraph, road_router
+from app.core.spatial import haversine_km
+from app.models.ride import RideType
+from app.schemas.ride import RideEstimateRequest
+from app.services.ride_service import RideService, quote_cache
+
+CENTER = (-1.2921, 36.8219)  # Nairobi CBD
+SIZE = 150  # 22.5k intersections, about 13 km across
+BLOCK_DEG = 0.0008
+SESSIONS = 100
+DRAGS_PER_SESSION = 25
+DRAG_STEP_DEG = 0.0003  # about 30 m per re-quote
+
+def build_graph(rng: np.random.Generator) -> RoadGraph:
+    rows, cols = np.divmod(np.arange(SIZE * SIZE), SIZE)
+    latitudes = CENTER[0] + (rows - SIZE / 2) * BLOCK_DEG
+    longitudes = CENTER[1] + (cols - SIZE / 2) * BLOCK_DEG
+    right = np.flatnonzero(cols < SIZE - 1)
+    down = np.flatnonzero(rows < SIZE - 1)
+    tails = np.concatenate([right, right + 1, down, down + SIZE])
+    heads = np.concatenate([right + 1, right, down + SIZE, down])
+    metres = np.array([
+        1000 * haversine_km(latitudes[a], longitudes[a], latitudes[b], longitudes[b]) for a, b in zip(tails, heads)
+    ])
+    return RoadGraph(latitudes, longitudes, tails, heads, metres, metres / (rng.uniform(20, 60, len(metres)) / 3.6))
+
+def quote_traffic(rng: random.Random):
+    """Sessions of one initial quote followed by small pin drags."""
+    spread = SIZE / 2 * BLOCK_DEG * 0.8
+    requests = []
+    for _ in range(SESSIONS):
+        point = [CENTER[0] + rng.uniform(-spread, spread), CENTER[1] + rng.uniform(-spread, spread),
+                 CENTER[0] + rng.uniform(-spread, spread), CENTER[1] + rng.uniform(-spread, spread)]
+        ride_type = rng.choice(list(RideType))
+        for _ in range(DRAGS_PER_SESSION):
+            requests.append(RideEstimateRequest(
+                pickup_latitude=point[0], pickup_longitude=point[1],
+                destination_latitude=point[2], destination_longitude=point[3],
+                ride_type=ride_type
+            ))
+            moved = rng.choice((0, 2))  # drag either the pickup or the destination pin
+            point[moved] += rng.uniform(-DRAG_STEP_DEG, DRAG_STEP_DEG)
+            point[moved + 1] += rng.uniform(-DRAG_STEP_DEG, DRAG_STEP_DEG)
+    return requests
+
+def timed(label: str, fn, requests):
+    start = time.perf_counter()
+    for request in requests:
+        fn(request)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<26} {elapsed / len(requests) * 1e6:10.1f} us/quote")
+
+def main():
+    road_router.graph = build_graph(np.random.default_rng(42))
+    requests = quote_traffic(random.Random(42))
+    service = RideService(None)
+    
+    print(f"Graph: {road_router.graph.num_nodes} nodes; {len(requests)} quotes in {SESSIONS} sessions, "
+          f"cell {settings.QUOTE_CELL_KM * 1000:.0f} m")
+    timed("uncached (route + price)", lambda request: service._quote(
+        (request.pickup_latitude, request.pickup_longitude),
+        (request.destination_latitude, request.destination_longitude),
+        request.ride_type
+    ), requests)
+    quote_cache.clear()
+    quote_cache.reset_stats()
+    timed("quote cache", service.get_ride_estimate, requests)
+    stats = quote_cache.stats()
+    print(f"  hit rate {stats['hit_rate']:.1%} ({stats['hits']} hits, {stats['misses']} misses)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark the rate-limit middleware's per-request overhead
+
+Drives a bare ASGI app directly, with and without RateLimitMiddleware in
+front, for anonymous (per-IP) and authenticated (per-user, cached token)
+requests spread over many callers, so the cost measured is the middleware's
+alone rather than routing or serialisation.
+
+Run from the repository root: python -m benchmarks.bench_rate_limit
+"""
+import asyncio
+import time
+
+from app.core.rate_limit import InMemoryBucketStore, RateLimiter
+from app.core.security import create_access_token
+from app.middleware.rate_limit import RateLimitMiddleware
+
+CALLERS = 5000
+REQUESTS = 200_000
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+async def send(message):
+    pass
+
+def scopes(authenticated: bool) -> list:
+    scopes = []
+    for index in range(CALLERS):
+        headers = [(b"host", b"api.tearide.test")]
+        if authenticated:
+            token = create_access_token({"sub": f"user{index}@example.com", "uid": f"{index:036d}"})
+            headers.append((b"authorization", f"Bearer {token}".encode()))
+        scopes.append({
+            "type": "http", "method": "GET", "path": "/api/v1/rides/history", "headers": headers,
+            "client": (f"10.0.{index // 256}.{index % 256}", 50000)
+        })
+    return scopes
+
+async def timed(app, requests: list) -> float:
+    start = time.perf_counter()
+    for index in range(REQUESTS):
+        await app(requests[index % CALLERS], receive, send)
+    return (time.perf_counter() - start) / REQUESTS
+
+async def main():
+    print(f"{REQUESTS} requests from {CALLERS} callers")
+    baseline = await timed(endpoint, scopes(authenticated=False))
+    print(f"  {'no middleware':<28} {baseline * 1e6:6.2f} us/request")
+    for label, authenticated in (("per-IP (anonymous)", False), ("per-user (bearer token)", True)):
+        requests = scopes(authenticated)
+        # Generous limit so every request is admitted and the full path is timed
+        limiter = RateLimiter(InMemoryBucketStore(), per_minute=1_000_000, per_ip_minute=1_000_000, routes={})
+        app = RateLimitMiddleware(endpoint, limiter)
+        for request in requests:
+            await app(request, receive, send)
+        elapsed = await timed(app, requests)
+        print(f"  {label:<28} {elapsed * 1e6:6.2f} us/request   "
+              f"overhead {(elapsed - baseline) * 1e6:5.2f} us;  {limiter.stats()}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
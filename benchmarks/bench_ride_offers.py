@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Benchmark pushed ride offers against /drivers/requests polling with 5k drivers
+
+Starts a single uvicorn worker against a scratch SQLite database, puts every
+driver online with an open /drivers/offers socket, then requests rides. The
+first driver offered each ride accepts it straight away, so the run measures
+request-to-offer, offer-to-confirmed-accept and accept-to-retraction latency. For
+comparison it times /drivers/requests polls, which is what every driver would
+otherwise run on a timer.
+
+Run from the repository root: python -m benchmarks.bench_ride_offers
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+DRIVERS = 5000
+RIDES = 200
+OPEN_RIDES = 50  # left waiting so the polling baseline has work to find
+RIDE_INTERVAL = 0.05
+POLLS = 500
+POLL_INTERVAL_SECONDS = 5.0  # a typical client polling timer
+CONNECT_CONCURRENCY = 50
+HTTP_CONCURRENCY = 10  # below the server's DB pool size
+CENTER = (-1.2921, 36.8219)
+SPREAD = 0.05  # degrees, roughly an 11 km square
+
+workdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/offers.db"
+
+import httpx
+import websockets
+from app.core.database import Base, engine, SessionLocal
+from app.core.security import create_access_token
+from app.models import User
+from app.models.user import UserRole
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+def percentiles(samples: list) -> str:
+    samples = sorted(samples)
+    return (f"p50 {statistics.median(samples):7.1f} ms   "
+            f"p99 {samples[max(0, int(len(samples) * 0.99) - 1)]:7.1f} ms   (n={len(samples)})")
+
+def seed():
+    Base.metadata.create_all(bind=engine)
+    users, drivers, passengers = [], [], []
+    for index in range(DRIVERS):
+        users.append(dict(
+            id=str(uuid.uuid4()), first_name="D", last_name=str(index), email=f"d{index}@bench.local",
+            phone=f"+2541{index:08d}", hashed_password="x", role=UserRole.DRIVER
+        ))
+        drivers.append(create_access_token({"sub": f"d{index}@bench.local"}))
+    for index in range(RIDES + OPEN_RIDES):
+        users.append(dict(
+            id=str(uuid.uuid4()), first_name="P", last_name=str(index), email=f"p{index}@bench.local",
+            phone=f"+2542{index:08d}", hashed_password="x", role=UserRole.PASSENGER
+        ))
+        passengers.append(create_access_token({"sub": f"p{index}@bench.local"}))
+    with SessionLocal() as db:
+        db.bulk_insert_mappings(User, users)
+        db.commit()
+    return drivers, passengers
+
+async def main():
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    drivers, passengers = seed()
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy()
+    )
+    base = f"http://127.0.0.1:{port}/api/v1"
+    rng = random.Random(7)
+    point = lambda: (CENTER[0] + rng.uniform(-SPREAD, SPREAD), CENTER[1] + rng.uniform(-SPREAD, SPREAD))
+    try:
+        limits = httpx.Limits(max_connections=HTTP_CONCURRENCY)
+        async with httpx.AsyncClient(timeout=httpx.Timeout(60, pool=None), limits=limits) as http:
+            for _ in range(100):
+                try:
+                    await http.get(f"http://127.0.0.1:{port}/health")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            gate = asyncio.Semaphore(HTTP_CONCURRENCY)
+
+            async def call(method, path, token, **kwargs):
+                async with gate:
+                    return await http.request(method, f"{base}{path}", headers={"Authorization": f"Bearer {token}"}, **kwargs)
+
+            async def request_ride(passenger):
+                pickup, destination = point(), point()
+                response = await call("POST", "/rides/request", passenger, json={
+                    "pickup": "A", "destination": "B",
+                    "pickup_latitude": pickup[0], "pickup_longitude": pickup[1],
+                    "destination_latitude": destination[0], "destination_longitude": destination[1]
+                })
+                return response.json()["id"]
+
+            # Offers can beat the POST response back, so stamps are matched up afterwards
+            requested_at, accepted_at = {}, {}
+            offers, retracts, accepts = {}, [], []
+            accepting = False  # the polling baseline's rides are left open
+
+            async def accept(ride_id, driver):
+                sent = time.perf_counter()
+                response = await call("POST", f"/drivers/requests/{ride_id}/accept", driver)
+                if response.status_code == 200:
+                    accepted_at[ride_id] = (sent, time.perf_counter(), driver)
+
+            async def feed(connection, driver):
+                async for raw in connection:
+                    if not accepting:
+                        continue
+                    message = json.loads(raw)
+                    now = time.perf_counter()
+                    if message["type"] == "offer":
+                        received = offers.setdefault(message["ride_id"], [])
+                        received.append(now)
+                        if len(received) == 1:
+                            accepts.append(asyncio.create_task(accept(message["ride_id"], driver)))
+                    elif message["type"] == "retract" and message["reason"] == "accepted":
+                        retracts.append((message["ride_id"], driver, now))
+
+            connect_gate = asyncio.Semaphore(CONNECT_CONCURRENCY)
+            connections, readers = [], []
+
+            async def open_feed(driver):
+                async with connect_gate:
+                    connection = await websockets.connect(
+                        f"ws://127.0.0.1:{port}/api/v1/drivers/offers?token={driver}", ping_interval=None
+                    )
+                    await connection.recv()  # snapshot
+                connections.append(connection)
+                readers.append(asyncio.create_task(feed(connection, driver)))
+
+            start = time.perf_counter()
+            await asyncio.gather(*(open_feed(driver) for driver in drivers))
+            connect_seconds = time.perf_counter() - start
+
+            # Online last, so no presence lapses before the rides come in
+            start = time.perf_counter()
+            await asyncio.gather(*(call("PUT", "/drivers/status", token, json=dict(
+                zip(("latitude", "longitude"), point()), status="online"
+            )) for token in drivers))
+            online_seconds = time.perf_counter() - start
+
+            # Baseline: what each driver's polling timer costs and how stale it is
+            for passenger in passengers[RIDES:]:
+                await request_ride(passenger)
+            poll_latencies = []
+            for token in drivers[:POLLS]:
+                sent = time.perf_counter()
+                await call("GET", "/drivers/requests", token)
+                poll_latencies.append((time.perf_counter() - sent) * 1000)
+
+            accepting = True
+            for passenger in passengers[:RIDES]:
+                sent = time.perf_counter()
+                requested_at[await request_ride(passenger)] = sent
+                await asyncio.sleep(RIDE_INTERVAL)
+            await asyncio.sleep(2.0)
+            await asyncio.gather(*accepts)
+            metrics = (await http.get(f"http://127.0.0.1:{port}/metrics")).json()["ride_offers"]
+
+            offer_latency = [(stamp - requested_at[ride_id]) * 1000
+                             for ride_id in requested_at for stamp in offers.get(ride_id, ())]
+            accept_latency = [(accepted_at[ride_id][1] - offers[ride_id][0]) * 1000
+                              for ride_id in requested_at if ride_id in accepted_at]
+            retract_latency = [(stamp - accepted_at[ride_id][0]) * 1000 for ride_id, driver, stamp in retracts
+                               if ride_id in requested_at and ride_id in accepted_at and accepted_at[ride_id][2] != driver]
+            offers_received = sum(len(offers.get(ride_id, ())) for ride_id in requested_at)
+            accepted = sum(ride_id in accepted_at for ride_id in requested_at)
+
+            poll_rate = DRIVERS / POLL_INTERVAL_SECONDS
+            print(f"Drivers: {DRIVERS} online with an open offer feed; {RIDES} rides requested")
+            print(f"  {'drivers online':<26} {online_seconds:8.2f} s;  feeds connected in {connect_seconds:.2f} s")
+            print(f"  {'polling /drivers/requests':<26} {percentiles(poll_latencies)}")
+            print(f"  {'':<26} every {POLL_INTERVAL_SECONDS:.0f} s from {DRIVERS} drivers = {poll_rate:.0f} req/s "
+                  f"(~{poll_rate * statistics.mean(poll_latencies) / 1000:.1f} worker-seconds/s), "
+                  f"rides seen after ~{POLL_INTERVAL_SECONDS / 2:.1f} s on average")
+            print(f"  {'pushed: request -> offer':<26} {percentiles(offer_latency)}")
+            print(f"  {'pushed: offer -> accepted':<26} {percentiles(accept_latency)}")
+            print(f"  {'pushed: accept -> retracts':<26} {percentiles(retract_latency)}")
+            print(f"  {'offers per ride':<26} {offers_received / RIDES:8.1f};  accepted {accepted}/{RIDES};  "
+                  f"feed polls during run: 0")
+            print(f"  {'server offer feed':<26} {metrics}")
+
+            for task in readers:
+                task.cancel()
+            await asyncio.gather(*readers, return_exceptions=True)
+            await asyncio.gather(*(connection.close() for connection in connections), return_exceptions=True)
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Load test live ride tracking: thousands of idle and active sockets on one worker
+
+Starts a single uvicorn worker against a scratch SQLite database, opens one
+WebSocket per ride, then streams driver pings for the active rides through
+POST /drivers/location and measures ping-to-socket latency and server memory.
+A slice of the active sockets never reads, to show their queues stay bounded.
+
+Run from the repository root: python -m benchmarks.bench_ride_tracking
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+IDLE_SOCKETS = 2500
+ACTIVE_SOCKETS = 500
+SLOW_READERS = 25  # active sockets that never read
+ROUNDS = 10
+ROUND_INTERVAL = 0.5
+CONNECT_CONCURRENCY = 50
+CENTER = (-1.2921, 36.8219)
+
+workdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/tracking.db"
+
+import httpx
+import websockets
+from app.core.database import Base, engine, SessionLocal
+from app.core.security import create_access_token
+from app.models import User, Ride
+from app.models.ride import RideStatus
+from app.models.user import UserRole
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def seed():
+    """One passenger per ride; active rides also get an assigned driver."""
+    Base.metadata.create_all(bind=engine)
+    users, rides, sockets, drivers = [], [], [], []
+    for index in range(IDLE_SOCKETS + ACTIVE_SOCKETS):
+        passenger_id, ride_id = str(uuid.uuid4()), str(uuid.uuid4())
+        active = index < ACTIVE_SOCKETS
+        users.append(dict(
+            id=passenger_id, first_name="P", last_name=str(index), email=f"p{index}@bench.local",
+            phone=f"+2541{index:08d}", hashed_password="x", role=UserRole.PASSENGER
+        ))
+        ride = dict(
+            id=ride_id, status=RideStatus.REQUESTED, pickup_address="A", destination_address="B",
+            pickup_latitude=CENTER[0], pickup_longitude=CENTER[1],
+            destination_latitude=CENTER[0] + 0.02, destination_longitude=CENTER[1] + 0.02,
+            fare=200.0, distance=4.0, duration=12, passenger_id=passenger_id
+        )
+        if active:
+            driver_id = str(uuid.uuid4())
+            users.append(dict(
+                id=driver_id, first_name="D", last_name=str(index), email=f"d{index}@bench.local",
+                phone=f"+2542{index:08d}", hashed_password="x", role=UserRole.DRIVER
+            ))
+            ride.update(status=RideStatus.ACCEPTED, driver_id=driver_id)
+            drivers.append(create_access_token({"sub": f"d{index}@bench.local"}))
+        rides.append(ride)
+        sockets.append((ride_id, create_access_token({"sub": f"p{index}@bench.local"}), active))
+    with SessionLocal() as db:
+        db.bulk_insert_mappings(User, users)
+        db.bulk_insert_mappings(Ride, rides)
+        db.commit()
+    return sockets, drivers
+
+async def reader(connection, latencies: list, slow: bool):
+    if slow:
+        await asyncio.Future()  # hold the socket open without reading
+    async for raw in connection:
+        message = json.loads(raw)
+        if message["type"] == "location" and message["recorded_at"]:
+            sent = datetime.fromisoformat(message["recorded_at"])
+            latencies.append((datetime.now(timezone.utc) - sent).total_seconds() * 1000)
+
+async def main():
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    sockets, drivers = seed()
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy()
+    )
+    base = f"http://127.0.0.1:{port}/api/v1"
+    try:
+        limits = httpx.Limits(max_connections=10)
+        async with httpx.AsyncClient(timeout=httpx.Timeout(60, pool=None), limits=limits) as http:
+            for _ in range(100):
+                try:
+                    await http.get(f"http://127.0.0.1:{port}/health")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            baseline = rss_mb(server.pid)
+
+            # Drivers are on a trip, so their pings are routed to the ride socket
+            for token in drivers:
+                await http.put(f"{base}/drivers/status", json={"status": "busy"},
+                               headers={"Authorization": f"Bearer {token}"})
+
+            gate = asyncio.Semaphore(CONNECT_CONCURRENCY)
+            latencies, readers, connections = [], [], []
+
+            async def open_socket(ride_id, token, slow):
+                async with gate:
+                    connection = await websockets.connect(
+                        f"ws://127.0.0.1:{port}/api/v1/rides/{ride_id}/track?token={token}",
+                        max_queue=16, ping_interval=None
+                    )
+                    await connection.recv()  # snapshot
+                connections.append(connection)
+                readers.append(asyncio.create_task(reader(connection, latencies, slow)))
+
+            start = time.perf_counter()
+            slow_rides = {ride_id for ride_id, _, active in sockets[:SLOW_READERS] if active}
+            await asyncio.gather(*(open_socket(ride_id, token, ride_id in slow_rides)
+                                   for ride_id, token, _ in sockets))
+            connect_seconds = time.perf_counter() - start
+            connected = rss_mb(server.pid)
+
+            rng = random.Random(42)
+            positions = {token: [CENTER[0] + rng.uniform(-0.05, 0.05), CENTER[1] + rng.uniform(-0.05, 0.05)]
+                         for token in drivers}
+            senders = asyncio.Semaphore(10)  # below the server's DB pool size
+
+            async def ping(token, latitude, longitude):
+                async with senders:
+                    # Stamp on send so client-side queueing is not counted
+                    await http.post(f"{base}/drivers/location", json={"points": [{
+                        "latitude": latitude, "longitude": longitude,
+                        "recorded_at": datetime.now(timezone.utc).isoformat()
+                    }]}, headers={"Authorization": f"Bearer {token}"})
+
+            pings = 0
+            start = time.perf_counter()
+            for _ in range(ROUNDS):
+                round_start = time.perf_counter()
+                requests = []
+                for token, position in positions.items():
+                    position[0] += rng.uniform(-0.0005, 0.0005)
+                    position[1] += rng.uniform(-0.0005, 0.0005)
+                    requests.append(ping(token, position[0], position[1]))
+                await asyncio.gather(*requests)
+                pings += len(requests)
+                await asyncio.sleep(max(0.0, ROUND_INTERVAL - (time.perf_counter() - round_start)))
+            stream_seconds = time.perf_counter() - start
+            await asyncio.sleep(1.0)
+            metrics = (await http.get(f"http://127.0.0.1:{port}/metrics")).json()["realtime"]
+
+            total = len(sockets)
+            print(f"Sockets: {total} ({IDLE_SOCKETS} idle, {ACTIVE_SOCKETS} active, {SLOW_READERS} never read)")
+            print(f"  {'connect all':<24} {connect_seconds:8.2f} s ({total / connect_seconds:.0f} sockets/s)")
+            print(f"  {'server RSS':<24} {baseline:8.1f} MB -> {connected:.1f} MB "
+                  f"({(connected - baseline) * 1024 / total:.1f} KB/socket)")
+            print(f"  {'pings streamed':<24} {pings:8d} in {stream_seconds:.1f} s")
+            latencies.sort()
+            print(f"  {'ping -> socket latency':<24} p50 {statistics.median(latencies):.1f} ms   "
+                  f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.1f} ms   ({len(latencies)} received)")
+            print(f"  {'server RSS after stream':<24} {rss_mb(server.pid):8.1f} MB; hub {metrics}")
+
+            for task in readers:
+                task.cancel()
+            await asyncio.gather(*readers, return_exceptions=True)
+            await asyncio.gather(*(connection.close() for connection in connections), return_exceptions=True)
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    asyncio.run(main())
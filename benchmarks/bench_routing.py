@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark road graph startup and per-query routing latency on a city-sized graph
+
+Run from the repository root: python -m benchmarks.bench_routing
+"""
+import csv
+import heapq
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app.core.routing import RoadGraph, EDGE_COLUMNS
+
+CENTER = (-1.2921, 36.8219)  # Nairobi CBD
+SIZE = 400  # 160k intersections, about 36 km across
+BLOCK_DEG = 0.0008
+QUERIES = 200
+LANDMARKS = 8
+
+def write_city(path: str, rng: random.Random):
+    """Perturbed grid with fast arterials every tenth street and some one-ways."""
+    def position(row, col):
+        return (CENTER[0] + (row - SIZE / 2) * BLOCK_DEG + rng.uniform(-1e-4, 1e-4),
+                CENTER[1] + (col - SIZE / 2) * BLOCK_DEG + rng.uniform(-1e-4, 1e-4))
+    
+    nodes = {(row, col): position(row, col) for row in range(SIZE) for col in range(SIZE)}
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(EDGE_COLUMNS)
+        for (row, col), (lat, lon) in nodes.items():
+            for neighbour, arterial in (((row, col + 1), row % 10 == 0), ((row + 1, col), col % 10 == 0)):
+                if neighbour not in nodes or rng.random() < 0.05:
+                    continue
+                n_lat, n_lon = nodes[neighbour]
+                speed = 60 if arterial else rng.choice((20, 30, 40))
+                oneway = int(not arterial and rng.random() < 0.1)
+                writer.writerow([f"{row}:{col}", "%d:%d" % neighbour, lat, lon, n_lat, n_lon, "", speed, oneway])
+
+def dijkstra(graph: RoadGraph, source: int, target: int):
+    indptr, heads, seconds, _ = graph.forward
+    dist = {source: 0.0}
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if u == target:
+            return d
+        if d > dist[u]:
+            continue
+        for edge in range(indptr[u], indptr[u + 1]):
+            v = heads[edge]
+            if d + seconds[edge] < dist.get(v, float("inf")):
+                dist[v] = d + seconds[edge]
+                heapq.heappush(heap, (dist[v], v))
+    return None
+
+def timed(label: str, fn, pairs):
+    latencies, results = [], []
+    for source, target in pairs:
+        start = time.perf_counter()
+        results.append(fn(source, target))
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    print(f"  {label:<28} p50 {statistics.median(latencies):8.2f} ms   "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1]:8.2f} ms")
+    return results
+
+def main():
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = os.path.join(workdir, "edges.csv")
+        npz_path = os.path.join(workdir, "graph.npz")
+        alt_path = os.path.join(workdir, "graph_alt.npz")
+        write_city(csv_path, rng)
+        
+        start = time.perf_counter()
+        graph = RoadGraph.from_csv(csv_path)
+        csv_seconds = time.perf_counter() - start
+        graph.save(npz_path)
+        start = time.perf_counter()
+        graph = RoadGraph.from_npz(npz_path)
+        npz_seconds = time.perf_counter() - start
+        
+        builder = RoadGraph.from_npz(npz_path)
+        start = time.perf_counter()
+        builder.add_landmarks(LANDMARKS)
+        build_seconds = time.perf_counter() - start
+        builder.save(alt_path)
+        start = time.perf_counter()
+        alt_graph = RoadGraph.from_npz(alt_path)
+        alt_seconds = time.perf_counter() - start
+    
+    print(f"Graph: {graph.num_nodes} nodes, {graph.num_edges} directed edges")
+    print(f"  {'startup from CSV':<28} {csv_seconds:8.2f} s")
+    print(f"  {'startup from NPZ':<28} {npz_seconds:8.2f} s")
+    print(f"  {f'build {LANDMARKS} landmarks (offline)':<28} {build_seconds:8.2f} s")
+    print(f"  {'startup from NPZ + landmarks':<28} {alt_seconds:8.2f} s")
+    
+    pairs = [(rng.randrange(graph.num_nodes), rng.randrange(graph.num_nodes)) for _ in range(QUERIES)]
+    print(f"Queries: {QUERIES} random origin/destination pairs")
+    routed = timed("bidirectional A* + ALT", alt_graph.shortest_path, pairs)
+    timed("bidirectional A*", graph.shortest_path, pairs)
+    baseline = timed("Dijkstra (baseline)", lambda s, t: dijkstra(graph, s, t), pairs[:QUERIES // 4])
+    for found, expected in zip(routed, baseline):
+        assert (found is None) == (expected is None)
+        assert found is None or abs(found[0] - expected) < 1e-6, (found, expected)
+
+if __name__ == "__main__":
+    main()
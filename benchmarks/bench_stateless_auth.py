@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /drivers/status with and without the per-request user lookup
+
+The endpoint itself is answered from memory, so its throughput is mostly the
+cost of authentication. Each mode runs a fresh single uvicorn worker against
+the same scratch SQLite database:
+
+  db lookup   user cache disabled, every request queries the users table
+  cached      the default user cache, one query per driver per TTL
+  stateless   AUTH_STATELESS_TOKENS, authorised from the token claims alone
+
+Run from the repository root: python -m benchmarks.bench_stateless_auth
+"""
+import asyncio
+import logging
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+DRIVERS = 1000
+REQUESTS = 10000
+CONCURRENCY = 10  # below the server's DB pool size
+
+MODES = [
+    ("db lookup", {"AUTH_STATELESS_TOKENS": "false", "AUTH_USER_CACHE_TTL_SECONDS": "0"}),
+    ("cached", {"AUTH_STATELESS_TOKENS": "false"}),
+    ("stateless", {"AUTH_STATELESS_TOKENS": "true"}),
+]
+
+workdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/auth.db"
+
+import httpx
+from app.core.database import Base, engine, SessionLocal
+from app.core.security import create_access_token
+from app.models import User
+from app.models.user import UserRole
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+def seed() -> list:
+    """Drivers with stateless-format tokens; the lookup modes verify the same tokens."""
+    Base.metadata.create_all(bind=engine)
+    users, tokens = [], []
+    for index in range(DRIVERS):
+        user_id, email = str(uuid.uuid4()), f"d{index}@bench.local"
+        users.append(dict(
+            id=user_id, first_name="D", last_name=str(index), email=email,
+            phone=f"+2541{index:08d}", hashed_password="x", role=UserRole.DRIVER, token_version=0
+        ))
+        tokens.append(create_access_token({"sub": email, "uid": user_id, "role": "driver", "ver": 0}))
+    with SessionLocal() as db:
+        db.bulk_insert_mappings(User, users)
+        db.commit()
+    return tokens
+
+async def run_mode(tokens: list, overrides: dict) -> dict:
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, **overrides}
+    )
+    url = f"http://127.0.0.1:{port}/api/v1/drivers/status"
+    try:
+        limits = httpx.Limits(max_connections=CONCURRENCY)
+        async with httpx.AsyncClient(timeout=httpx.Timeout(60, pool=None), limits=limits) as http:
+            for _ in range(100):
+                try:
+                    await http.get(f"http://127.0.0.1:{port}/health")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+
+            latencies, failures = [], 0
+            queue = iter(range(REQUESTS))
+
+            async def worker():
+                nonlocal failures
+                for index in queue:
+                    sent = time.perf_counter()
+                    response = await http.get(url, headers={"Authorization": f"Bearer {tokens[index % DRIVERS]}"})
+                    latencies.append((time.perf_counter() - sent) * 1000)
+                    failures += response.status_code != 200
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+            elapsed = time.perf_counter() - start
+            cache = (await http.get(f"http://127.0.0.1:{port}/metrics")).json()["user_cache"]
+    finally:
+        server.terminate()
+        server.wait()
+    latencies.sort()
+    return {
+        "rps": REQUESTS / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "failures": failures,
+        "cache": cache,
+    }
+
+async def main():
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    tokens = seed()
+    print(f"GET /drivers/status: {REQUESTS} requests from {DRIVERS} drivers, {CONCURRENCY} concurrent")
+    baseline = None
+    for name, overrides in MODES:
+        result = await run_mode(tokens, overrides)
+        baseline = baseline or result["rps"]
+        print(f"  {name:<10} {result['rps']:8.0f} req/s ({result['rps'] / baseline:4.2f}x)   "
+              f"p50 {result['p50']:6.2f} ms   p99 {result['p99']:6.2f} ms   "
+              f"errors {result['failures']}   user cache hits {result['cache']['hits']} "
+              f"misses {result['cache']['misses']}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Benchmark surge bookkeeping: event recording, the vectorised recompute and lookups
+
+Run from the repository root: python -m benchmarks.bench_surge
+"""
+import random
+import time
+
+from app.services.surge_service import SurgeEngine
+
+CENTER = (-1.2921, 36.8219)  # Nairobi CBD
+SPREAD_DEG = 0.3  # about 4,500 one-kilometre cells
+DRIVERS = 20000
+REQUESTS = 100000
+LOOKUPS = 200000
+
+def point(rng: random.Random):
+    return CENTER[0] + rng.uniform(-SPREAD_DEG, SPREAD_DEG), CENTER[1] + rng.uniform(-SPREAD_DEG, SPREAD_DEG)
+
+def main():
+    rng = random.Random(42)
+    engine = SurgeEngine()
+    drivers = [(f"driver-{i}", *point(rng)) for i in range(DRIVERS)]
+    requests = [point(rng) for _ in range(REQUESTS)]
+    lookups = [point(rng) for _ in range(LOOKUPS)]
+    
+    start = time.perf_counter()
+    for driver_id, latitude, longitude in drivers:
+        engine.record_driver(driver_id, latitude, longitude)
+    for latitude, longitude in requests:
+        engine.record_request(latitude, longitude)
+    elapsed = time.perf_counter() - start
+    print(f"  {'record event':<24} {elapsed / (DRIVERS + REQUESTS) * 1e6:10.2f} us/event")
+    
+    start = time.perf_counter()
+    surging = engine.recompute()
+    elapsed = time.perf_counter() - start
+    print(f"  {'recompute all cells':<24} {elapsed * 1000:10.2f} ms ({engine.stats()['cells']} cells, {surging} surging)")
+    
+    start = time.perf_counter()
+    for latitude, longitude in lookups:
+        engine.multiplier(latitude, longitude)
+    elapsed = time.perf_counter() - start
+    print(f"  {'multiplier lookup':<24} {elapsed / LOOKUPS * 1e6:10.2f} us/lookup")
+
+if __name__ == "__main__":
+    main()
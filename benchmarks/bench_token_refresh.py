@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark re-login against refresh-token exchange throughput
+
+Starts a single uvicorn worker against a scratch SQLite database. Each user
+first logs in (paying a bcrypt verify), then rotates their refresh token
+through POST /auth/refresh the way a client would every access-token
+lifetime.
+
+Run from the repository root: python -m benchmarks.bench_token_refresh
+"""
+import asyncio
+import logging
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+USERS = 200
+REFRESHES_PER_USER = 10
+CONCURRENCY = 10  # below the server's DB pool size
+PASSWORD = "password123"
+
+workdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/refresh.db"
+# Every request comes from one anonymous IP, which the rate limiter would throttle
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+import httpx
+from app.core.database import Base, engine, SessionLocal
+from app.core.security import get_password_hash
+from app.models import User
+from app.models.user import UserRole
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+def percentiles(samples: list) -> str:
+    samples = sorted(samples)
+    return f"p50 {statistics.median(samples):7.1f} ms   p99 {samples[max(0, int(len(samples) * 0.99) - 1)]:7.1f} ms"
+
+def seed() -> list:
+    Base.metadata.create_all(bind=engine)
+    hashed = get_password_hash(PASSWORD)
+    users = [dict(
+        id=str(uuid.uuid4()), first_name="P", last_name=str(index), email=f"p{index}@example.com",
+        phone=f"+2541{index:08d}", hashed_password=hashed, role=UserRole.PASSENGER
+    ) for index in range(USERS)]
+    with SessionLocal() as db:
+        db.bulk_insert_mappings(User, users)
+        db.commit()
+    return [user["email"] for user in users]
+
+async def main():
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    emails = seed()
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy()
+    )
+    base = f"http://127.0.0.1:{port}/api/v1/auth"
+    try:
+        limits = httpx.Limits(max_connections=CONCURRENCY)
+        async with httpx.AsyncClient(timeout=httpx.Timeout(60, pool=None), limits=limits) as http:
+            for _ in range(100):
+                try:
+                    await http.get(f"http://127.0.0.1:{port}/health")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            gate = asyncio.Semaphore(CONCURRENCY)
+            login_latencies, refresh_latencies, failures = [], [], 0
+
+            async def post(path, body, latencies):
+                nonlocal failures
+                async with gate:
+                    sent = time.perf_counter()
+                    response = await http.post(f"{base}{path}", json=body)
+                    latencies.append((time.perf_counter() - sent) * 1000)
+                failures += response.status_code != 200
+                return response.json()
+
+            start = time.perf_counter()
+            sessions = await asyncio.gather(*(
+                post("/login", {"email": email, "password": PASSWORD}, login_latencies) for email in emails
+            ))
+            login_seconds = time.perf_counter() - start
+
+            async def keep_alive(session):
+                token = session["refresh_token"]
+                for _ in range(REFRESHES_PER_USER):
+                    token = (await post("/refresh", {"refresh_token": token}, refresh_latencies))["refresh_token"]
+
+            start = time.perf_counter()
+            await asyncio.gather(*(keep_alive(session) for session in sessions))
+            refresh_seconds = time.perf_counter() - start
+            metrics = (await http.get(f"http://127.0.0.1:{port}/metrics")).json()
+    finally:
+        server.terminate()
+        server.wait()
+
+    login_rate = len(login_latencies) / login_seconds
+    refresh_rate = len(refresh_latencies) / refresh_seconds
+    print(f"{USERS} users, {CONCURRENCY} concurrent requests")
+    print(f"  {'login (bcrypt)':<16} {login_rate:8.0f} req/s   {percentiles(login_latencies)}")
+    print(f"  {'refresh':<16} {refresh_rate:8.0f} req/s   {percentiles(refresh_latencies)}   "
+          f"({refresh_rate / login_rate:.0f}x)")
+    print(f"  errors {failures};  refresh families {metrics['refresh_tokens']};  "
+          f"hashes {metrics['password_hashing']['completed']}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
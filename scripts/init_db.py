@@ -2,15 +2,17 @@
 """
 Database initialization script
 """
-from app.core.database import engine, Base
-from app.models import *  # Import all models
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
 
 def init_db():
-    """Initialize database tables."""
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("Database tables created successfully!")
+    """Bring the database schema up to the latest migration."""
+    print("Running database migrations...")
+    command.upgrade(Config(str(ALEMBIC_INI)), "head")
+    print("Database is up to date!")
 
 if __name__ == "__main__":
     init_db()
-
@@ -1,10 +1,22 @@
+import uuid
+from datetime import datetime
 import pytest
+from contextlib import contextmanager
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.main import app
-from app.core.database import get_db, Base
+from app.core.database import get_db, get_async_db, async_database_url, Base
 from app.core.config import settings
+from app.core.security import create_access_token
+from app.core.spatial import driver_index
+from app.core.presence import presence, PresenceStatus
+from app.models import User, Ride, Payment, PaymentMethod, Notification
+from app.models.user import UserRole
+from app.models.ride import RideStatus
+from app.models.payment import PaymentMethodType, PaymentStatus
+from app.services.ride_service import RideService
 
 # Create test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -35,3 +47,232 @@ def db_session():
     finally:
         session.close()
 
+@pytest.fixture
+def count_queries():
+    """Context manager collecting every SQL statement run against the test engine."""
+    @contextmanager
+    def counter():
+        statements = []
+        
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    
+    return counter
+
+# Rows per table for the seeded fixture: enough that any per-row query stands out
+ROWS = 25
+CENTER = (-1.2921, 36.8219)
+
+def _user(role: UserRole, index: int) -> User:
+    return User(
+        id=str(uuid.uuid4()),
+        first_name=role.value.title(),
+        last_name=str(index),
+        email=f"{role.value}{index}@example.com",
+        phone=f"+2547{role.value[0]}{index:06d}",
+        hashed_password="not-a-real-hash",
+        role=role,
+        is_verified=True
+    )
+
+def _ride(passenger: User, status: RideStatus, driver: User = None) -> Ride:
+    return Ride(
+        id=str(uuid.uuid4()),
+        status=status,
+        pickup_address="Pickup",
+        destination_address="Destination",
+        pickup_latitude=CENTER[0],
+        pickup_longitude=CENTER[1],
+        destination_latitude=-1.30,
+        destination_longitude=36.78,
+        fare=150.0,
+        distance=5.0,
+        duration=15,
+        passenger_id=passenger.id,
+        driver_id=driver.id if driver else None,
+        completed_at=datetime.utcnow() if status == RideStatus.COMPLETED else None
+    )
+
+@pytest.fixture
+def seeded(client: TestClient, db_session):
+    """Seed enough rows that any per-row query would blow the budget."""
+    admin = _user(UserRole.ADMIN, 0)
+    driver = _user(UserRole.DRIVER, 0)
+    passenger = _user(UserRole.PASSENGER, 0)
+    others = [_user(UserRole.PASSENGER, i) for i in range(1, ROWS + 1)]
+    drivers = [_user(UserRole.DRIVER, i) for i in range(1, ROWS + 1)]
+    db_session.add_all([admin, driver, passenger, *others, *drivers])
+    db_session.flush()
+    
+    db_session.add_all(_ride(other, RideStatus.REQUESTED) for other in others)
+    db_session.add_all(_ride(passenger, RideStatus.COMPLETED, driver) for _ in range(ROWS))
+    db_session.add_all(_ride(passenger, RideStatus.ACCEPTED, driver) for _ in range(3))
+    db_session.add_all(Payment(
+        id=str(uuid.uuid4()), amount=150.0, method=PaymentMethodType.MPESA,
+        status=PaymentStatus.COMPLETED, user_id=passenger.id
+    ) for _ in range(ROWS))
+    db_session.add_all(PaymentMethod(
+        id=str(uuid.uuid4()), type=PaymentMethodType.MPESA, name=f"M-Pesa {i}", user_id=passenger.id
+    ) for i in range(ROWS))
+    db_session.add_all(Notification(
+        id=str(uuid.uuid4()), title="Hi", message="Hello", type="info", user_id=passenger.id
+    ) for _ in range(ROWS))
+    db_session.commit()
+    
+    RideService(db_session).index_pending_rides()
+    driver_index.upsert(driver.id, *CENTER)
+    for index, other in enumerate(drivers):
+        driver_index.upsert(other.id, CENTER[0] + index * 0.001, CENTER[1])
+        presence.set_status(other.id, PresenceStatus.ONLINE)
+    
+    return {
+        user.role.value: {"Authorization": f"Bearer {create_access_token({'sub': user.email})}"}
+        for user in (admin, driver, passenger)
+    }
+
+@pytest.fixture
+def async_db(client: TestClient):
+    """Context manager serving requests through an aiosqlite session on the test database."""
+    @contextmanager
+    def enabled():
+        async_engine = create_async_engine(async_database_url(SQLALCHEMY_DATABASE_URL))
+        AsyncTestingSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with AsyncTestingSessionLocal() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        try:
+            yield
+        finally:
+            del app.dependency_overrides[get_async_db]
+            client.portal.call(async_engine.dispose)
+
+    return enabled
+
+@pytest.fixture(autouse=True)
+def reset_spatial_indexes():
+    from app.core.spatial import driver_index, pending_pickups
+    driver_index.clear()
+    pending_pickups.clear()
+    yield
+    driver_index.clear()
+    pending_pickups.clear()
+
+@pytest.fixture(autouse=True)
+def reset_presence():
+    from app.core.presence import presence
+    presence.backend.clear()
+    yield
+    presence.backend.clear()
+
+@pytest.fixture(autouse=True)
+def reset_location_buffer():
+    from app.services.location_service import location_buffer
+    location_buffer.clear()
+    yield
+    location_buffer.clear()
+
+@pytest.fixture(autouse=True)
+def reset_quote_cache():
+    from app.services.ride_service import quote_cache
+    quote_cache.clear()
+    quote_cache.reset_stats()
+    yield
+    quote_cache.clear()
+
+@pytest.fixture(autouse=True)
+def reset_user_cache():
+    from app.services.auth_service import user_cache
+    user_cache.clear()
+    user_cache.reset_stats()
+    yield
+    user_cache.clear()
+
+@pytest.fixture(autouse=True)
+def reset_token_cache():
+    from app.core.security import token_cache
+    token_cache.clear()
+    token_cache.reset_stats()
+    yield
+    token_cache.clear()
+
+@pytest.fixture(autouse=True)
+def reset_revoked_tokens():
+    from app.core.revocation import revoked_tokens
+    revoked_tokens.backend.clear()
+    revoked_tokens.clear()
+    yield
+    revoked_tokens.backend.clear()
+    revoked_tokens.clear()
+
+@pytest.fixture(autouse=True)
+def reset_refresh_families():
+    from app.core.refresh_tokens import refresh_families
+    refresh_families.backend.clear()
+    yield
+    refresh_families.backend.clear()
+
+@pytest.fixture(autouse=True)
+def reset_token_versions():
+    from app.core.token_versions import token_versions
+    token_versions.backend.clear()
+    yield
+    token_versions.backend.clear()
+
+@pytest.fixture(autouse=True)
+def reset_rate_limiter():
+    from app.core.rate_limit import rate_limiter
+    rate_limiter.store.clear()
+    rate_limiter.reset_stats()
+    yield
+    rate_limiter.store.clear()
+
+@pytest.fixture(autouse=True)
+def reset_admission_controller():
+    from app.core.admission import admission_controller
+    admission_controller.clear()
+    yield
+    admission_controller.clear()
+
+@pytest.fixture(autouse=True)
+def reset_surge():
+    from app.services.surge_service import surge_engine
+    surge_engine.clear()
+    yield
+    surge_engine.clear()
+
+@pytest.fixture(autouse=True)
+def reset_ride_tracker():
+    from app.services.tracking_service import ride_tracker
+    ride_tracker.clear()
+    yield
+    ride_tracker.clear()
+
+@pytest.fixture(autouse=True)
+def reset_notification_stream():
+    from app.services.notification_service import notification_stream
+    notification_stream.clear()
+    yield
+    notification_stream.clear()
+
+@pytest.fixture(autouse=True)
+def reset_event_bus():
+    from app.core.events import event_bus
+    event_bus.clear()
+    yield
+    event_bus.clear()
+
+@pytest.fixture(autouse=True)
+def reset_offer_feed():
+    from app.services.offer_service import offer_feed
+    offer_feed.clear()
+    yield
+    offer_feed.clear()
@@ -0,0 +1,101 @@
+import fnmatch
+import queue
+import time
+
+class FakeRedis:
+    """In-process stand-in for the subset of redis.Redis the app uses."""
+    
+    def __init__(self):
+        self._data = {}
+        self._expires = {}
+        self._pubsubs = []
+    
+    def _alive(self, key):
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+    
+    def get(self, key):
+        return self._data[key] if self._alive(key) else None
+    
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+    
+    def set(self, key, value, ex=None, px=None, nx=False, xx=False, get=False):
+        previous = self.get(key)
+        if (nx and previous is not None) or (xx and previous is None):
+            return previous if get else None
+        self._data[key] = str(value)
+        self._expires.pop(key, None)
+        if ex is not None:
+            self._expires[key] = time.monotonic() + ex
+        if px is not None:
+            self._expires[key] = time.monotonic() + px / 1000
+        return previous if get else True
+    
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return removed
+    
+    def zadd(self, key, mapping):
+        members = self._data.setdefault(key, {})
+        added = len(set(mapping) - set(members))
+        members.update({member: float(score) for member, score in mapping.items()})
+        return added
+    
+    def zrange(self, key, start, end, withscores=False):
+        members = sorted(self._data.get(key, {}).items(), key=lambda item: (item[1], item[0]))
+        members = members[start:] if end == -1 else members[start:end + 1]
+        return members if withscores else [member for member, _ in members]
+    
+    def zremrangebyscore(self, key, low, high):
+        low, high = float(low), float(high)
+        members = self._data.get(key, {})
+        removed = [member for member, score in members.items() if low <= score <= high]
+        for member in removed:
+            del members[member]
+        return len(removed)
+    
+    def scan_iter(self, match="*"):
+        return [key for key in list(self._data) if self._alive(key) and fnmatch.fnmatchcase(key, match)]
+    
+    def publish(self, channel, message):
+        subscribers = [pubsub for pubsub in self._pubsubs if channel in pubsub.channels]
+        for pubsub in subscribers:
+            pubsub.messages.put({"type": "message", "channel": channel, "data": message})
+        return len(subscribers)
+    
+    def pubsub(self, ignore_subscribe_messages=False):
+        pubsub = FakePubSub(ignore_subscribe_messages)
+        self._pubsubs.append(pubsub)
+        return pubsub
+
+class FakePubSub:
+    """Channel subscription on a FakeRedis; messages arrive in publish order."""
+    
+    def __init__(self, ignore_subscribe_messages=False):
+        self.channels = set()
+        self.messages = queue.Queue()
+        self.ignore_subscribe_messages = ignore_subscribe_messages
+    
+    def subscribe(self, *channels):
+        self.channels.update(channels)
+        if not self.ignore_subscribe_messages:
+            for channel in channels:
+                self.messages.put({"type": "subscribe", "channel": channel, "data": len(self.channels)})
+    
+    def get_message(self, timeout=0.0):
+        try:
+            return self.messages.get(timeout=timeout) if timeout else self.messages.get_nowait()
+        except queue.Empty:
+            return None
+    
+    def close(self):
+        self.channels.clear()
@@ -0,0 +1,109 @@
+CREATE TABLE users (
+	id VARCHAR NOT NULL,
+	first_name VARCHAR NOT NULL,
+	last_name VARCHAR NOT NULL,
+	email VARCHAR NOT NULL,
+	phone VARCHAR NOT NULL,
+	hashed_password VARCHAR NOT NULL,
+	role VARCHAR(9) NOT NULL,
+	is_verified BOOLEAN,
+	profile_picture VARCHAR,
+	rating FLOAT,
+	total_rides INTEGER,
+	created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+	updated_at DATETIME,
+	last_active_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+	PRIMARY KEY (id)
+);
+CREATE INDEX ix_users_id ON users (id);
+CREATE UNIQUE INDEX ix_users_phone ON users (phone);
+CREATE UNIQUE INDEX ix_users_email ON users (email);
+CREATE TABLE rides (
+	id VARCHAR NOT NULL,
+	status VARCHAR(9),
+	pickup_address VARCHAR NOT NULL,
+	destination_address VARCHAR NOT NULL,
+	pickup_latitude FLOAT NOT NULL,
+	pickup_longitude FLOAT NOT NULL,
+	destination_latitude FLOAT NOT NULL,
+	destination_longitude FLOAT NOT NULL,
+	ride_type VARCHAR(8),
+	fare FLOAT NOT NULL,
+	distance FLOAT NOT NULL,
+	duration INTEGER NOT NULL,
+	notes TEXT,
+	passenger_id VARCHAR NOT NULL,
+	driver_id VARCHAR,
+	requested_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+	accepted_at DATETIME,
+	arrived_at DATETIME,
+	started_at DATETIME,
+	completed_at DATETIME,
+	cancelled_at DATETIME,
+	cancellation_reason VARCHAR,
+	PRIMARY KEY (id),
+	FOREIGN KEY(passenger_id) REFERENCES users (id),
+	FOREIGN KEY(driver_id) REFERENCES users (id)
+);
+CREATE INDEX ix_rides_id ON rides (id);
+CREATE TABLE payment_methods (
+	id VARCHAR NOT NULL,
+	type VARCHAR(6) NOT NULL,
+	name VARCHAR NOT NULL,
+	is_default BOOLEAN,
+	phone_number VARCHAR,
+	last_four VARCHAR,
+	brand VARCHAR,
+	expiry_month INTEGER,
+	expiry_year INTEGER,
+	user_id VARCHAR NOT NULL,
+	created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+	PRIMARY KEY (id),
+	FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE INDEX ix_payment_methods_id ON payment_methods (id);
+CREATE TABLE notifications (
+	id VARCHAR NOT NULL,
+	title VARCHAR NOT NULL,
+	message TEXT NOT NULL,
+	type VARCHAR NOT NULL,
+	is_read BOOLEAN,
+	user_id VARCHAR NOT NULL,
+	created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+	PRIMARY KEY (id),
+	FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE INDEX ix_notifications_id ON notifications (id);
+CREATE TABLE payments (
+	id VARCHAR NOT NULL,
+	amount FLOAT NOT NULL,
+	method VARCHAR(6) NOT NULL,
+	status VARCHAR(9),
+	transaction_id VARCHAR,
+	description VARCHAR,
+	failure_reason VARCHAR,
+	user_id VARCHAR NOT NULL,
+	ride_id VARCHAR,
+	created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+	completed_at DATETIME,
+	PRIMARY KEY (id),
+	FOREIGN KEY(user_id) REFERENCES users (id),
+	FOREIGN KEY(ride_id) REFERENCES rides (id)
+);
+CREATE INDEX ix_payments_id ON payments (id);
+CREATE TABLE ratings (
+	id VARCHAR NOT NULL,
+	passenger_rating INTEGER,
+	driver_rating INTEGER,
+	passenger_comment TEXT,
+	driver_comment TEXT,
+	ride_id VARCHAR NOT NULL,
+	passenger_id VARCHAR NOT NULL,
+	driver_id VARCHAR NOT NULL,
+	created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+	PRIMARY KEY (id),
+	FOREIGN KEY(ride_id) REFERENCES rides (id),
+	FOREIGN KEY(passenger_id) REFERENCES users (id),
+	FOREIGN KEY(driver_id) REFERENCES users (id)
+);
+CREATE INDEX ix_ratings_id ON ratings (id);
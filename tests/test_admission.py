@@ -0,0 +1,72 @@
+import asyncio
+import httpx
+from fastapi.testclient import TestClient
+from app.core.admission import CRITICAL, LOW, NORMAL, AdmissionController, admission_controller
+from app.middleware.admission import AdmissionMiddleware
+
+LOW_REQUESTS = 20
+CRITICAL_REQUESTS = 5
+
+async def settle(condition) -> None:
+    """Yield to the loop until ``condition()`` holds."""
+    while not condition():
+        await asyncio.sleep(0)
+
+def test_paths_are_classified_by_priority():
+    """Test that acceptance and status updates are critical and history, stats and estimates low."""
+    classify = admission_controller.classify
+    assert classify("/api/v1/drivers/requests/abc/accept") == CRITICAL
+    assert classify("/api/v1/rides/abc/status") == CRITICAL
+    assert classify("/api/v1/rides/history") == LOW
+    assert classify("/api/v1/rides/estimate") == LOW
+    assert classify("/api/v1/drivers/stats") == LOW
+    assert classify("/api/v1/rides/abc") == NORMAL
+    assert classify("/health") is None
+
+def test_priority_requests_bypass_a_saturated_worker():
+    """Test that status updates pass a saturated history pool and history is shed under lag."""
+    controller = AdmissionController(target_latency=0.02, low_priority_concurrency=4, queue_timeout=60)
+    
+    async def scenario():
+        gate = asyncio.Event()
+        
+        async def endpoint(scope, receive, send):
+            if scope["path"] == "/api/v1/rides/history":
+                # History requests hold their slot until the test lets them go
+                await gate.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"{}"})
+        
+        transport = httpx.ASGITransport(app=AdmissionMiddleware(endpoint, controller))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            flood = [asyncio.create_task(http.get("/api/v1/rides/history")) for _ in range(LOW_REQUESTS)]
+            await asyncio.wait_for(settle(lambda: controller.queued == LOW_REQUESTS - 4), 5)
+            
+            # Every low-priority slot is taken and the rest are queued, yet updates go straight through
+            updates = [http.put(f"/api/v1/rides/ride-{index}/status") for index in range(CRITICAL_REQUESTS)]
+            assert [response.status_code for response in await asyncio.gather(*updates)] == [200] * CRITICAL_REQUESTS
+            
+            # Once the loop lags, new history requests are turned away at once
+            controller.record_lag(1.0)
+            lagged = await asyncio.gather(*(http.get("/api/v1/rides/history") for _ in range(3)))
+            assert [response.status_code for response in lagged] == [503] * 3
+            assert lagged[0].headers["Retry-After"] == "1"
+            assert (await http.put("/api/v1/rides/ride-x/status")).status_code == 200
+            
+            gate.set()
+            return [response.status_code for response in await asyncio.gather(*flood)]
+    
+    assert asyncio.run(scenario()) == [200] * LOW_REQUESTS
+    assert controller.queued == LOW_REQUESTS - 4
+    assert controller.shed == {LOW: 3, NORMAL: 0}
+    assert controller.admitted == LOW_REQUESTS + CRITICAL_REQUESTS + 1
+    assert controller.in_flight == 0 and controller.low_in_flight == 0
+
+def test_low_priority_shed_while_loop_lags(client: TestClient, monkeypatch):
+    """Test that a lagging loop turns history requests away with Retry-After but not others."""
+    monkeypatch.setattr(admission_controller, "loop_lag", 1.0)
+    response = client.get("/api/v1/rides/history")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert client.get("/api/v1/rides/some-ride").status_code == 401
+    assert client.get("/metrics").json()["admission"]["shed"] == {"low": 1, "normal": 0}
@@ -0,0 +1,34 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.core.database import async_database_url
+
+ASYNC_ENDPOINTS = [
+    ("/api/v1/rides/history", "passenger"),
+    ("/api/v1/payments/methods", "passenger"),
+    ("/api/v1/payments/history?page=2&limit=5", "passenger"),
+    ("/api/v1/notifications/", "passenger"),
+    ("/api/v1/drivers/active-rides", "driver"),
+    ("/api/v1/drivers/ride-history", "driver"),
+]
+
+def test_async_database_url():
+    """Test that sync driver URLs map to their asyncio drivers."""
+    assert async_database_url("sqlite:///./tearide.db") == "sqlite+aiosqlite:///./tearide.db"
+    assert async_database_url("postgresql://u:p@db/tearide") == "postgresql+asyncpg://u:p@db/tearide"
+    assert async_database_url("postgresql+psycopg2://db/tearide") == "postgresql+asyncpg://db/tearide"
+
+@pytest.mark.parametrize("path,role", ASYNC_ENDPOINTS)
+def test_async_path_matches_sync_path(client: TestClient, seeded, async_db, count_queries, path, role):
+    """Test that the asyncio session path returns exactly what the sync path does."""
+    headers = seeded[role]
+    expected = client.get(path, headers=headers)
+    assert expected.status_code == 200, expected.text
+    assert expected.json(), "endpoint returned no rows, so the comparison proves nothing"
+
+    with async_db(), count_queries() as statements:
+        response = client.get(path, headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert response.json() == expected.json()
+    # The user lookup is cached by now, so the sync engine is not touched at all
+    assert statements == [], statements
@@ -0,0 +1,66 @@
+import itertools
+import random
+import numpy as np
+from app.core.spatial import GridIndex
+from app.services.dispatch_service import Dispatcher, solve_assignment
+
+def _brute_force(costs: np.ndarray) -> float:
+    n, m = costs.shape
+    best = np.inf
+    for drivers in itertools.permutations(range(m), n):
+        best = min(best, sum(costs[i, j] for i, j in enumerate(drivers)))
+    return best
+
+def test_auction_beats_greedy_on_crossing_pairs():
+    """Test the classic case where nearest-first matching is suboptimal."""
+    candidates = np.array([[0, 1], [0, 1]])
+    costs = np.array([[1.0, 2.0], [2.0, 100.0]])
+    
+    assigned = solve_assignment(candidates, costs, num_drivers=2, epsilon=0.01)
+    assert list(assigned) == [1, 0]
+
+def test_auction_is_near_optimal():
+    """Test random square problems against exhaustive search."""
+    rng = np.random.default_rng(3)
+    for _ in range(20):
+        costs = rng.uniform(60, 900, size=(6, 6))
+        candidates = np.tile(np.arange(6), (6, 1))
+        
+        assigned = solve_assignment(candidates, costs, num_drivers=6, epsilon=0.01)
+        assert sorted(assigned) == list(range(6))
+        total = costs[np.arange(6), assigned].sum()
+        assert total <= _brute_force(costs) + 6 * 0.01
+
+def test_infeasible_and_surplus_rides_stay_unassigned():
+    """Test that rides without a reachable driver, or beyond supply, get none."""
+    candidates = np.array([[0], [0], [0]])
+    costs = np.array([[10.0], [20.0], [np.inf]])
+    
+    assigned = solve_assignment(candidates, costs, num_drivers=1)
+    assert list(assigned) == [0, -1, -1]
+
+def test_dispatcher_offers_once_until_released():
+    """Test offers are made once per tick and released when the ride leaves the pending set."""
+    drivers, pickups = GridIndex(), GridIndex()
+    rng = random.Random(5)
+    for i in range(30):
+        drivers.upsert(f"d{i}", -1.29 + rng.uniform(-0.02, 0.02), 36.82 + rng.uniform(-0.02, 0.02))
+    for i in range(10):
+        pickups.upsert(f"r{i}", -1.29 + rng.uniform(-0.02, 0.02), 36.82 + rng.uniform(-0.02, 0.02))
+    
+    sent = []
+    dispatcher = Dispatcher(drivers, pickups, registry=None, send_offers=sent.extend, max_pickup_km=10.0)
+    offers = dispatcher.tick()
+    assert len(offers) == 10
+    assert len({offer.driver_id for offer in offers}) == 10
+    assert sent == offers
+    
+    # Live offers are not repeated
+    assert dispatcher.tick() == []
+    
+    # Accepted rides drop out of the pending index and free nothing else
+    pickups.remove(offers[0].ride_id)
+    pickups.upsert("r-new", -1.29, 36.82)
+    again = dispatcher.tick()
+    assert [offer.ride_id for offer in again] == ["r-new"]
+    assert offers[0].ride_id not in dispatcher.offers
@@ -0,0 +1,87 @@
+import random
+from fastapi.testclient import TestClient
+from app.core.presence import presence, PresenceStatus
+from app.core.spatial import GridIndex, driver_index, haversine_km
+from app.services.ride_service import RideService
+
+NAIROBI = (-1.2921, 36.8219)
+
+def _random_points(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    return {
+        f"driver-{i}": (NAIROBI[0] + rng.uniform(-0.2, 0.2), NAIROBI[1] + rng.uniform(-0.2, 0.2))
+        for i in range(count)
+    }
+
+def test_nearest_matches_brute_force():
+    """Test k-nearest and radius queries against a full scan."""
+    points = _random_points(2000)
+    index = GridIndex(cell_km=0.5)
+    for key, (lat, lon) in points.items():
+        index.upsert(key, lat, lon)
+    
+    rng = random.Random(1)
+    for _ in range(25):
+        lat = NAIROBI[0] + rng.uniform(-0.2, 0.2)
+        lon = NAIROBI[1] + rng.uniform(-0.2, 0.2)
+        expected = sorted((haversine_km(lat, lon, p[0], p[1]), key) for key, p in points.items())
+        
+        nearest = index.nearest(lat, lon, k=10)
+        assert [key for key, _ in nearest] == [key for _, key in expected[:10]]
+        
+        within = index.within_radius(lat, lon, 3.0)
+        assert [key for key, _ in within] == [key for d, key in expected if d <= 3.0]
+
+def test_upsert_moves_and_remove():
+    """Test moving and removing indexed points."""
+    index = GridIndex(cell_km=1.0)
+    index.upsert("a", *NAIROBI)
+    index.upsert("a", NAIROBI[0] + 0.5, NAIROBI[1])
+    
+    assert len(index) == 1
+    assert index.nearest(*NAIROBI, k=1, radius_km=5.0) == []
+    assert index.remove("a")
+    assert not index.remove("a")
+    assert index.nearest(*NAIROBI, k=1) == []
+
+def test_available_drivers_served_from_index(client: TestClient):
+    """Test that drivers going online with a location become available nearby."""
+    user_data = {
+        "first_name": "Dan",
+        "last_name": "Driver",
+        "email": "dan@example.com",
+        "phone": "+254700000001",
+        "password": "password123",
+        "role": "driver"
+    }
+    token = client.post("/api/v1/auth/register", json=user_data).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    response = client.put(
+        "/api/v1/drivers/status",
+        json={"status": "online", "latitude": NAIROBI[0], "longitude": NAIROBI[1]},
+        headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()["current_location"] == {"latitude": NAIROBI[0], "longitude": NAIROBI[1]}
+    
+    params = {"latitude": NAIROBI[0] + 0.01, "longitude": NAIROBI[1]}
+    drivers = client.get("/api/v1/rides/drivers/available", params=params).json()
+    assert len(drivers) == 1
+    assert drivers[0]["distance_km"] < 1.2
+    
+    client.put("/api/v1/drivers/status", json={"status": "offline"}, headers=headers)
+    assert client.get("/api/v1/rides/drivers/available", params=params).json() == []
+
+def test_available_drivers_look_past_busy_ones():
+    """Test that a crowd of busy drivers nearby does not hide free ones further out."""
+    for i in range(20):
+        driver_index.upsert(f"busy-{i}", NAIROBI[0] + i * 0.0001, NAIROBI[1])
+        presence.set_status(f"busy-{i}", PresenceStatus.BUSY)
+    for i in range(3):
+        driver_index.upsert(f"free-{i}", NAIROBI[0] + 0.01 + i * 0.001, NAIROBI[1])
+        presence.set_status(f"free-{i}", PresenceStatus.ONLINE)
+    
+    drivers = RideService(None).get_available_drivers(*NAIROBI, radius=5.0, limit=2)
+    assert [driver.driver_id for driver in drivers] == ["free-0", "free-1"]
+    assert RideService(None).get_available_drivers(*NAIROBI, radius=0.5, limit=2) == []
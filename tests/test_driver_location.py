@@ -0,0 +1,144 @@
+import asyncio
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from app.core.spatial import driver_index
+from app.models.driver_location import DriverLocation
+from app.schemas.driver import LocationPoint
+from app.services.location_service import LocationBuffer, location_buffer, _upsert_locations
+
+def _register_driver(client: TestClient) -> tuple[str, dict]:
+    user_data = {
+        "first_name": "Lena",
+        "last_name": "Driver",
+        "email": "lena@example.com",
+        "phone": "+254700000002",
+        "password": "password123",
+        "role": "driver"
+    }
+    data = client.post("/api/v1/auth/register", json=user_data).json()
+    return data["user"]["id"], {"Authorization": f"Bearer {data['access_token']}"}
+
+def test_location_batch_updates_index_and_coalesces(client: TestClient, db_session):
+    """Test that a batch of pings updates the index at once and persists one row."""
+    driver_id, headers = _register_driver(client)
+    client.put("/api/v1/drivers/status", json={"status": "online"}, headers=headers)
+    now = datetime.now(timezone.utc)
+    points = [
+        {"latitude": -1.30 + i * 0.001, "longitude": 36.80, "recorded_at": (now + timedelta(seconds=i)).isoformat()}
+        for i in range(5)
+    ]
+    
+    response = client.post("/api/v1/drivers/location", json={"points": points}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["accepted"] == 5
+    assert driver_index.get(driver_id) == (-1.296, 36.80)
+    
+    # A late batch with older pings must not move the driver backwards
+    stale = [{"latitude": -1.5, "longitude": 36.5, "recorded_at": (now - timedelta(minutes=1)).isoformat()}]
+    client.post("/api/v1/drivers/location", json={"points": stale}, headers=headers)
+    assert driver_index.get(driver_id) == (-1.296, 36.80)
+    
+    assert db_session.query(DriverLocation).count() == 0
+    assert location_buffer.flush(db_session) == 1
+    assert location_buffer.flush(db_session) == 0
+    
+    client.post("/api/v1/drivers/location", json={"points": [{"latitude": -1.28, "longitude": 36.81}]}, headers=headers)
+    location_buffer.flush(db_session)
+    db_session.expire_all()
+    rows = db_session.query(DriverLocation).all()
+    assert len(rows) == 1
+    assert rows[0].driver_id == driver_id
+    assert rows[0].latitude == -1.28
+
+def test_location_requires_driver(client: TestClient):
+    """Test that passengers cannot post driver locations."""
+    user_data = {
+        "first_name": "Pat",
+        "last_name": "Passenger",
+        "email": "pat@example.com",
+        "phone": "+254700000003",
+        "password": "password123",
+        "role": "passenger"
+    }
+    token = client.post("/api/v1/auth/register", json=user_data).json()["access_token"]
+    response = client.post(
+        "/api/v1/drivers/location",
+        json={"points": [{"latitude": -1.28, "longitude": 36.81}]},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 403
+
+def test_late_batch_after_flush_is_ignored(client: TestClient, db_session):
+    """Test that a flush does not let older pings move the driver or overwrite the stored row."""
+    driver_id, headers = _register_driver(client)
+    client.put("/api/v1/drivers/status", json={"status": "online"}, headers=headers)
+    now = datetime.now(timezone.utc)
+    point = {"latitude": -1.28, "longitude": 36.81, "recorded_at": now.isoformat()}
+    client.post("/api/v1/drivers/location", json={"points": [point]}, headers=headers)
+    assert location_buffer.flush(db_session) == 1
+    
+    stale = {"latitude": -1.5, "longitude": 36.5, "recorded_at": (now - timedelta(minutes=1)).isoformat()}
+    response = client.post("/api/v1/drivers/location", json={"points": [stale]}, headers=headers)
+    assert response.json()["latitude"] == -1.28
+    assert driver_index.get(driver_id) == (-1.28, 36.81)
+    assert location_buffer.flush(db_session) == 0
+    
+    # Another worker's late write is refused by the database as well
+    _upsert_locations(db_session, [{
+        "driver_id": driver_id, "latitude": -1.5, "longitude": 36.5, "heading": None, "speed": None,
+        "accuracy": None, "recorded_at": now - timedelta(minutes=1)
+    }])
+    db_session.commit()
+    db_session.expire_all()
+    assert db_session.query(DriverLocation).one().latitude == -1.28
+
+def test_future_ping_does_not_freeze_the_driver(client: TestClient, db_session):
+    """Test that a ping from a fast client clock is clamped so later pings still move the driver."""
+    driver_id, headers = _register_driver(client)
+    client.put("/api/v1/drivers/status", json={"status": "online"}, headers=headers)
+    ahead = datetime.now(timezone.utc) + timedelta(hours=1)
+    skewed = {"latitude": -1.5, "longitude": 36.5, "recorded_at": ahead.isoformat()}
+    response = client.post("/api/v1/drivers/location", json={"points": [skewed]}, headers=headers)
+    assert datetime.fromisoformat(response.json()["recorded_at"]) <= datetime.now(timezone.utc)
+    location_buffer.flush(db_session)
+    
+    client.post("/api/v1/drivers/location", json={"points": [{"latitude": -1.28, "longitude": 36.81}]}, headers=headers)
+    assert driver_index.get(driver_id) == (-1.28, 36.81)
+    location_buffer.flush(db_session)
+    db_session.expire_all()
+    assert db_session.query(DriverLocation).one().latitude == -1.28
+
+def test_newest_positions_are_bounded_and_discarded():
+    """Test that the buffer forgets discarded drivers and only tracks the busiest few."""
+    buffer = LocationBuffer(max_drivers=2)
+    old = datetime.now(timezone.utc) - timedelta(minutes=5)
+    for driver_id in ("d1", "d2", "d3"):
+        buffer.ingest(driver_id, [LocationPoint(latitude=-1.28, longitude=36.81)])
+    assert len(buffer._latest) == 2
+    
+    buffer.discard("d3")
+    assert len(buffer) == 2 and len(buffer._latest) == 1
+    # With d3 forgotten, an older ping is accepted as its first
+    assert buffer.ingest("d3", [LocationPoint(latitude=-1.5, longitude=36.5, recorded_at=old)]).latitude == -1.5
+
+def test_periodic_flush_takes_rows_on_the_loop(client: TestClient, db_session):
+    """Test that the flush task hands the worker thread its rows instead of the live buffer."""
+    driver_id, headers = _register_driver(client)
+    client.post("/api/v1/drivers/location", json={"points": [{"latitude": -1.28, "longitude": 36.81}]}, headers=headers)
+    pending_in_thread = []
+    
+    @contextmanager
+    def session_scope():
+        pending_in_thread.append(len(location_buffer))
+        yield db_session
+    
+    async def scenario():
+        runner = asyncio.create_task(location_buffer.run(session_scope, 0.01))
+        await asyncio.sleep(0.1)
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+    
+    asyncio.run(scenario())
+    assert pending_in_thread == [0]
+    assert db_session.query(DriverLocation).one().driver_id == driver_id
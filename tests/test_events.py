@@ -0,0 +1,123 @@
+import asyncio
+from fastapi.testclient import TestClient
+from app.core.events import EventBus, EventTopic, OverflowPolicy, RedisEventBridge, event_bus
+from tests.fakes import FakeRedis
+
+def register(client: TestClient, name: str, phone: str) -> dict:
+    response = client.post("/api/v1/auth/register", json={
+        "first_name": name,
+        "last_name": "Test",
+        "email": f"{name.lower()}@example.com",
+        "phone": phone,
+        "password": "password123",
+        "role": "passenger"
+    })
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+async def drain(bus: EventBus) -> None:
+    """Let the running bus fan out everything published so far."""
+    while bus.stats()["inbox_depth"]:
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+def test_drop_policy_keeps_newest_events():
+    """Test topic filtering and that a lagging drop subscriber keeps only recent events."""
+    async def scenario():
+        bus = EventBus()
+        runner = asyncio.create_task(bus.run())
+        rides = bus.subscribe("rides", [EventTopic.RIDE_STATUS_CHANGED])
+        lagging = bus.subscribe("lagging", maxsize=3)
+        for index in range(10):
+            bus.publish(EventTopic.RIDE_STATUS_CHANGED, {"index": index})
+        bus.publish(EventTopic.PAYMENT_COMPLETED, {"index": 10})
+        await drain(bus)
+        
+        assert rides.queue.qsize() == 10
+        assert [(await lagging.get()).payload["index"] for _ in range(3)] == [8, 9, 10]
+        stats = {subscriber["name"]: subscriber for subscriber in bus.stats()["subscribers"]}
+        assert stats["lagging"]["dropped"] == 8
+        assert stats["lagging"]["received"] == 3
+        assert stats["rides"]["depth"] == 10
+        runner.cancel()
+    
+    asyncio.run(scenario())
+
+def test_block_policy_applies_backpressure():
+    """Test that a block subscriber loses nothing while it keeps reading, and the inbox is bounded."""
+    async def scenario():
+        bus = EventBus(inbox_size=4, block_timeout=0.05)
+        runner = asyncio.create_task(bus.run())
+        audit = bus.subscribe("audit", maxsize=1, policy=OverflowPolicy.BLOCK)
+        
+        accepted = [bus.publish(EventTopic.PAYMENT_COMPLETED, {"index": index}) for index in range(6)]
+        assert accepted == [True] * 4 + [False] * 2
+        assert bus.stats()["rejected"] == 2
+        assert [(await audit.get()).payload["index"] for _ in range(4)] == [0, 1, 2, 3]
+        assert audit.dropped == 0
+        
+        # A consumer that stops reading only holds up fan-out for block_timeout
+        for index in range(3):
+            bus.publish(EventTopic.PAYMENT_COMPLETED, {"index": index})
+        await asyncio.sleep(0.2)
+        assert audit.dropped == 2
+        assert bus.stats()["inbox_depth"] == 0
+        runner.cancel()
+    
+    asyncio.run(scenario())
+
+def test_publish_without_subscribers_is_a_no_op():
+    """Test that nothing is queued while nobody listens."""
+    bus = EventBus()
+    assert not bus.publish(EventTopic.RIDE_REQUESTED, {"ride_id": "r1"})
+    assert bus.stats()["published"] == 0
+
+def test_services_publish_ride_events(client: TestClient):
+    """Test that requesting and cancelling a ride publish typed events."""
+    subscription = event_bus.subscribe("test", [EventTopic.RIDE_REQUESTED, EventTopic.RIDE_STATUS_CHANGED])
+    passenger = register(client, "Eve", "+254700000301")
+    ride = client.post("/api/v1/rides/request", json={
+        "pickup": "CBD",
+        "destination": "Westlands",
+        "pickup_latitude": -1.2921,
+        "pickup_longitude": 36.8219,
+        "destination_latitude": -1.2676,
+        "destination_longitude": 36.8108
+    }, headers=passenger).json()
+    client.post(f"/api/v1/rides/{ride['id']}/cancel", json={"reason": "changed plans"}, headers=passenger)
+    
+    requested = client.portal.call(asyncio.wait_for, subscription.get(), 2)
+    cancelled = client.portal.call(asyncio.wait_for, subscription.get(), 2)
+    assert requested.topic is EventTopic.RIDE_REQUESTED
+    assert requested.payload["ride_id"] == ride["id"]
+    assert requested.payload["fare"] == ride["fare"]
+    assert cancelled.topic is EventTopic.RIDE_STATUS_CHANGED
+    assert cancelled.payload == {"ride_id": ride["id"], "status": "cancelled", "driver_id": None}
+    assert client.get("/metrics").json()["events"]["published"] == 2
+
+def test_redis_bridge_relays_between_workers():
+    """Test that events cross buses through Redis once and are not echoed back."""
+    async def scenario():
+        redis = FakeRedis()
+        first, second = EventBus(), EventBus()
+        local = first.subscribe("local")
+        remote = second.subscribe("remote")
+        tasks = [asyncio.create_task(coroutine) for coroutine in (
+            first.run(), second.run(),
+            RedisEventBridge(first, redis).run(), RedisEventBridge(second, redis).run()
+        )]
+        await asyncio.sleep(0.05)  # let both bridges subscribe
+        
+        first.publish(EventTopic.PAYMENT_COMPLETED, {"payment_id": "p1"})
+        event = await asyncio.wait_for(remote.get(), 2)
+        assert event.topic is EventTopic.PAYMENT_COMPLETED
+        assert event.payload == {"payment_id": "p1"}
+        assert event.origin == first.worker_id
+        
+        await asyncio.sleep(0.1)
+        assert local.queue.qsize() == 1
+        assert remote.queue.qsize() == 0
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    asyncio.run(scenario())
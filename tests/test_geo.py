@@ -0,0 +1,33 @@
+import random
+from array import array
+import numpy as np
+import pytest
+from app.core import geo
+from app.core.spatial import haversine_km
+
+def random_points(count: int, seed: int):
+    rng = random.Random(seed)
+    return [(rng.uniform(-1.6, -1.0), rng.uniform(36.5, 37.1)) for _ in range(count)]
+
+def test_matrices_match_scalar_haversine():
+    """Test the N x M kernels against the per-pair reference."""
+    origins, destinations = random_points(20, 1), random_points(30, 2)
+    expected = np.array([[haversine_km(*a, *b) for b in destinations] for a in origins])
+    
+    assert geo.haversine_matrix(origins, destinations) == pytest.approx(expected, rel=1e-9)
+    assert geo.equirectangular_matrix(origins, destinations) == pytest.approx(expected, rel=1e-3)
+    assert geo.haversine_pairs(origins, destinations[:20]) == pytest.approx(np.diag(expected[:, :20]), rel=1e-9)
+    assert geo.eta_matrix(origins, destinations, speed_kmh=36) == pytest.approx(
+        expected * 100 * geo.settings.ROAD_DETOUR_FACTOR, rel=1e-9
+    )
+
+def test_accepts_flat_buffers_without_copying():
+    """Test that interleaved coordinate buffers are viewed in place."""
+    points = random_points(5, 3)
+    flat = array("d", [value for point in points for value in point])
+    
+    view = geo.as_points(flat)
+    assert view.shape == (5, 2)
+    assert np.shares_memory(view, np.frombuffer(flat, dtype=np.float64))
+    assert geo.haversine_matrix(flat, memoryview(flat)) == pytest.approx(geo.haversine_matrix(points, points))
+    assert geo.haversine_matrix(points, []).shape == (5, 0)
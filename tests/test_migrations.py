@@ -0,0 +1,61 @@
+from pathlib import Path
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import Session
+from app.core.database import Base
+from app.models import User
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+# The schema create_all built before migrations and token versions existed
+PRE_MIGRATIONS_SCHEMA = Path(__file__).resolve().parent / "fixtures" / "pre_migrations_schema.sql"
+
+def alembic_config(url: str) -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("sqlalchemy.url", url)
+    return config
+
+def migrate(url: str, revision: str = "head") -> None:
+    command.upgrade(alembic_config(url), revision)
+
+def user_columns(url: str) -> set:
+    with create_engine(url).connect() as connection:
+        return {column["name"] for column in inspect(connection).get_columns("users")}
+
+def test_migrations_build_the_model_schema(tmp_path):
+    """Test that upgrading an empty database leaves nothing for autogenerate to add."""
+    url = f"sqlite:///{tmp_path}/migrated.db"
+    migrate(url)
+    with create_engine(url).connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), Base.metadata) == []
+
+def test_token_version_has_its_own_migration(tmp_path):
+    """Test that users.token_version arrives with 0003 and goes away on downgrade."""
+    url = f"sqlite:///{tmp_path}/stepped.db"
+    migrate(url, "0002")
+    assert "token_version" not in user_columns(url)
+    migrate(url)
+    assert "token_version" in user_columns(url)
+    command.downgrade(alembic_config(url), "0002")
+    assert "token_version" not in user_columns(url)
+
+def test_pre_migration_databases_are_adopted(tmp_path):
+    """Test that a database built by create_all before this schema work upgrades in place."""
+    url = f"sqlite:///{tmp_path}/legacy.db"
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        for statement in PRE_MIGRATIONS_SCHEMA.read_text().split(";"):
+            if statement.strip():
+                connection.exec_driver_sql(statement)
+        connection.exec_driver_sql(
+            "INSERT INTO users (id, first_name, last_name, email, phone, hashed_password, role) "
+            "VALUES ('u1', 'Wanjiru', 'Test', 'wanjiru@example.com', '+254700000901', 'x', 'PASSENGER')"
+        )
+
+    migrate(url)
+    with engine.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), Base.metadata) == []
+    with Session(engine) as session:
+        assert session.query(User).one().token_version == 0
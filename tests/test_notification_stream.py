@@ -0,0 +1,150 @@
+import asyncio
+import json
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.core.realtime import RealtimeHub
+from app.services.notification_service import NotificationStream, NotificationService
+from app.models import User
+
+def register(client: TestClient, name: str, phone: str) -> dict:
+    response = client.post("/api/v1/auth/register", json={
+        "first_name": name,
+        "last_name": "Test",
+        "email": f"{name.lower()}@example.com",
+        "phone": phone,
+        "password": "password123",
+        "role": "passenger"
+    })
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+class EventStream:
+    """Reads an SSE response incrementally on the TestClient's event loop.
+
+    The TestClient buffers whole responses, so the app is called directly
+    and the client disconnect is simulated on ``close``.
+    """
+
+    def __init__(self, client: TestClient, path: str):
+        self.client = client
+        self.status = None
+        self.body = ""
+        self._disconnect = None
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+            "root_path": "", "headers": [(b"host", b"testserver")],
+            "client": ("testclient", 50000), "server": ("testserver", 80),
+        }
+        self.done = client.portal.start_task_soon(self._run, scope)
+
+    async def _run(self, scope):
+        self._disconnect = asyncio.Event()
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await self._disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                self.status = message["status"]
+            elif message["type"] == "http.response.body":
+                self.body += message.get("body", b"").decode()
+
+        await self.client.app(scope, receive, send)
+
+    def events(self) -> list:
+        events = []
+        for block in self.body.split("\n\n"):
+            fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line and not line.startswith(":"))
+            if "event" in fields:
+                events.append(json.loads(fields["data"]))
+        return events
+
+    def wait_for(self, predicate, timeout: float = 5.0) -> list:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.status is not None and self.status != 200:
+                return []
+            events = self.events()
+            if predicate(events):
+                return events
+            time.sleep(0.01)
+        raise AssertionError(f"Timed out waiting for events, got {self.body!r}")
+
+    def close(self) -> None:
+        if self._disconnect is not None:
+            self.client.portal.call(self._disconnect.set)
+        self.done.result(timeout=5)
+
+def test_stream_pushes_notifications_and_unread_counts(client: TestClient, db_session):
+    """Test that new notifications and read changes reach an open stream."""
+    headers = register(client, "Nia", "+254700000201")
+    token = headers["Authorization"].split(" ")[1]
+    user = db_session.query(User).filter(User.email == "nia@example.com").first()
+    NotificationService(db_session).create_notification(user.id, "Welcome", "Hello", "general")
+
+    stream = EventStream(client, f"/api/v1/notifications/stream?token={token}")
+    try:
+        events = stream.wait_for(lambda events: len(events) >= 1)
+        assert stream.status == 200
+        assert events[0] == {"type": "unread_count", "unread_count": 1}
+
+        created = NotificationService(db_session).create_notification(user.id, "Ride", "Driver is near", "ride")
+        events = stream.wait_for(lambda events: len(events) >= 3)
+        assert events[1]["type"] == "notification"
+        assert events[1]["notification"]["id"] == created.id
+        assert events[1]["notification"]["title"] == "Ride"
+        assert events[2] == {"type": "unread_count", "unread_count": 2}
+
+        assert client.put(f"/api/v1/notifications/{created.id}/read", headers=headers).status_code == 200
+        events = stream.wait_for(lambda events: len(events) >= 4)
+        assert events[3] == {"type": "unread_count", "unread_count": 1}
+
+        assert client.put("/api/v1/notifications/read-all", headers=headers).status_code == 200
+        events = stream.wait_for(lambda events: len(events) >= 5)
+        assert events[4] == {"type": "unread_count", "unread_count": 0}
+        assert client.get("/metrics").json()["notification_streams"] == 1
+    finally:
+        stream.close()
+    assert client.get("/metrics").json()["notification_streams"] == 0
+
+def test_stream_rejects_invalid_token(client: TestClient):
+    """Test that the stream requires a valid token."""
+    stream = EventStream(client, "/api/v1/notifications/stream?token=invalid")
+    stream.wait_for(lambda events: False)
+    stream.close()
+    assert stream.status == 401
+
+def test_failed_unread_count_drops_the_subscriber(client: TestClient, monkeypatch):
+    """Test that a stream whose initial count fails leaves no subscriber behind."""
+    headers = register(client, "Kamau", "+254700000503")
+    
+    def fail(self, user_id):
+        raise RuntimeError("database unavailable")
+    
+    monkeypatch.setattr(NotificationService, "get_unread_count", fail)
+    with pytest.raises(RuntimeError):
+        client.get("/api/v1/notifications/stream", headers=headers)
+    assert client.get("/metrics").json()["notification_streams"] == 0
+
+def test_idle_connections_hold_one_heartbeat():
+    """Test that heartbeats coalesce on idle connections and stop after disconnect."""
+    async def scenario():
+        stream = NotificationStream(RealtimeHub(queue_size=4))
+        subscriber = stream.connect("user-1")
+        for _ in range(10):
+            stream.heartbeat()
+        assert len(subscriber) == 1
+        assert (await subscriber.get())["type"] == "heartbeat"
+        assert stream.connected(["user-1", "user-2"]) == {"user-1"}
+        stream.disconnect(subscriber)
+        assert stream.heartbeat() == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,57 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app.core.security import PasswordHasher, get_password_hash, verify_password
+
+LOGINS = 8
+
+def test_login_burst_does_not_stall_other_requests(client: TestClient):
+    """Test that other endpoints stay fast while logins are hashing."""
+    client.post("/api/v1/auth/register", json={
+        "first_name": "Wanjiru",
+        "last_name": "Test",
+        "email": "wanjiru@example.com",
+        "phone": "+254700000501",
+        "password": "password123",
+        "role": "passenger"
+    })
+    hashed = get_password_hash("password123")
+    start = time.perf_counter()
+    verify_password("password123", hashed)
+    hash_seconds = time.perf_counter() - start
+
+    login = lambda _: client.post("/api/v1/auth/login", json={
+        "email": "wanjiru@example.com", "password": "password123"
+    })
+    latencies = []
+    with ThreadPoolExecutor(LOGINS) as pool:
+        burst = [pool.submit(login, index) for index in range(LOGINS)]
+        while not all(future.done() for future in burst):
+            sent = time.perf_counter()
+            assert client.get("/health").status_code == 200
+            latencies.append(time.perf_counter() - sent)
+
+    assert all(future.result().status_code == 200 for future in burst)
+    assert len(latencies) > LOGINS
+    # A blocked event loop would hold each health check for about one whole hash
+    assert statistics.median(latencies) < hash_seconds / 4, (statistics.median(latencies), hash_seconds)
+    assert client.get("/metrics").json()["password_hashing"]["completed"] >= LOGINS
+
+def test_hash_rejected_after_queue_timeout():
+    """Test that work waiting too long for a worker is turned away with 503."""
+    async def scenario():
+        hasher = PasswordHasher(workers=1, queue_timeout=0.05)
+        busy = asyncio.ensure_future(hasher._run(time.sleep, 0.2))
+        await asyncio.sleep(0.01)
+        with pytest.raises(HTTPException) as rejected:
+            await hasher.verify("password123", "unused")
+        await busy
+        assert rejected.value.status_code == 503
+        assert rejected.value.headers["Retry-After"] == "1"
+        assert hasher.stats()["rejected"] == 1 and hasher.stats()["completed"] == 1
+
+    asyncio.run(scenario())
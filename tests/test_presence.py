@@ -0,0 +1,84 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.core.presence import (
+    PresenceRegistry, PresenceStatus, InMemoryPresenceBackend, RedisPresenceBackend
+)
+from app.core.spatial import GridIndex
+from tests.fakes import FakeRedis
+
+@pytest.fixture(params=["memory", "redis"])
+def registry(request):
+    if request.param == "redis":
+        return PresenceRegistry(RedisPresenceBackend(FakeRedis()), ttl=0.05)
+    return PresenceRegistry(InMemoryPresenceBackend(), ttl=0.05)
+
+def test_status_transitions_and_ttl(registry):
+    """Test online/busy/offline transitions and heartbeat expiry."""
+    assert registry.get("d1").status == PresenceStatus.OFFLINE
+    
+    registry.set_status("d1", PresenceStatus.ONLINE)
+    registry.set_status("d2", PresenceStatus.BUSY)
+    assert registry.get("d1").status == PresenceStatus.ONLINE
+    assert registry.get("d1").last_seen is not None
+    assert registry.available(["d1", "d2", "d3"]) == ["d1"]
+    
+    # Heartbeats keep a driver alive without changing the status
+    for _ in range(3):
+        time.sleep(0.03)
+        assert registry.heartbeat("d2").status == PresenceStatus.BUSY
+    assert registry.get("d1").status == PresenceStatus.OFFLINE
+    assert registry.get("d2").status == PresenceStatus.BUSY
+    
+    # A heartbeat cannot bring an offline driver back
+    assert registry.heartbeat("d1").status == PresenceStatus.OFFLINE
+    registry.set_status("d2", PresenceStatus.OFFLINE)
+    assert registry.get("d2").status == PresenceStatus.OFFLINE
+
+def test_prune_index_drops_expired_drivers(registry):
+    """Test that lapsed drivers are removed from the spatial index."""
+    index = GridIndex()
+    index.upsert("d1", -1.29, 36.82)
+    index.upsert("d2", -1.29, 36.82)
+    registry.set_status("d1", PresenceStatus.ONLINE)
+    
+    assert registry.prune_index(index) == 1
+    assert "d1" in index and "d2" not in index
+
+def test_driver_status_endpoints_use_presence(client: TestClient):
+    """Test toggling, busy-on-accept and release-on-complete through the API."""
+    user_data = {
+        "first_name": "Tom",
+        "last_name": "Driver",
+        "email": "tom@example.com",
+        "phone": "+254722000001",
+        "password": "password123",
+        "role": "driver"
+    }
+    token = client.post("/api/v1/auth/register", json=user_data).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    assert client.get("/api/v1/drivers/status", headers=headers).json()["status"] == "offline"
+    assert client.put("/api/v1/drivers/status", json={}, headers=headers).json()["status"] == "online"
+    assert client.get("/api/v1/drivers/status", headers=headers).json()["is_online"] is True
+    assert client.put("/api/v1/drivers/status", json={}, headers=headers).json()["status"] == "offline"
+    assert client.put("/api/v1/drivers/status", json={"status": "asleep"}, headers=headers).status_code == 400
+    
+    passenger = client.post("/api/v1/auth/register", json={
+        **user_data, "first_name": "Ann", "email": "ann@example.com", "phone": "+254722000002", "role": "passenger"
+    }).json()["access_token"]
+    ride = client.post("/api/v1/rides/request", json={
+        "pickup": "CBD",
+        "destination": "Kilimani",
+        "pickup_latitude": -1.2864,
+        "pickup_longitude": 36.8172,
+        "destination_latitude": -1.2921,
+        "destination_longitude": 36.7856
+    }, headers={"Authorization": f"Bearer {passenger}"}).json()
+    client.put("/api/v1/drivers/status", json={"status": "online"}, headers=headers)
+    
+    assert client.post(f"/api/v1/drivers/requests/{ride['id']}/accept", headers=headers).status_code == 200
+    assert client.get("/api/v1/drivers/status", headers=headers).json()["status"] == "busy"
+    client.put(f"/api/v1/rides/{ride['id']}/status", json={"status": "started"}, headers=headers)
+    assert client.post(f"/api/v1/rides/{ride['id']}/complete", headers=headers).status_code == 200
+    assert client.get("/api/v1/drivers/status", headers=headers).json()["status"] == "online"
@@ -0,0 +1,27 @@
+import pytest
+from fastapi.testclient import TestClient
+
+# (path, role, maximum SQL statements per request including the auth lookup)
+LIST_ENDPOINTS = [
+    ("/api/v1/users/", "admin", 2),
+    ("/api/v1/users/drivers", None, 1),
+    ("/api/v1/rides/history", "passenger", 3),
+    ("/api/v1/rides/drivers/available?latitude=-1.2921&longitude=36.8219", None, 0),
+    ("/api/v1/payments/methods", "passenger", 2),
+    ("/api/v1/payments/history", "passenger", 3),
+    ("/api/v1/notifications/", "passenger", 3),
+    ("/api/v1/drivers/requests", "driver", 2),
+    ("/api/v1/drivers/active-rides", "driver", 2),
+    ("/api/v1/drivers/ride-history", "driver", 2),
+]
+
+@pytest.mark.parametrize("path,role,budget", LIST_ENDPOINTS)
+def test_list_endpoint_query_budget(client: TestClient, seeded, count_queries, path, role, budget):
+    """Test that list endpoints run a fixed number of queries regardless of row count."""
+    headers = seeded[role] if role else {}
+    with count_queries() as statements:
+        response = client.get(path, headers=headers)
+    
+    assert response.status_code == 200, response.text
+    assert response.json(), "endpoint returned no rows, so the budget proves nothing"
+    assert len(statements) <= budget, "\n".join(statements)
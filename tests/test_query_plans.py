@@ -0,0 +1,84 @@
+import re
+from contextlib import contextmanager
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from app.services.ride_service import RideService
+from tests.conftest import engine
+
+# Tables that grow with every ride, payment or notification; scanning one is a regression
+LARGE_TABLES = {"rides", "payments", "payment_methods", "notifications", "ratings"}
+
+# (method, path, role, body) for every endpoint whose service queries touch a large table
+ENDPOINTS = [
+    ("GET", "/api/v1/rides/history", "passenger", None),
+    ("GET", "/api/v1/rides/active", "passenger", None),
+    ("GET", "/api/v1/payments/methods", "passenger", None),
+    ("POST", "/api/v1/payments/methods", "passenger", {"type": "mpesa", "name": "M-Pesa", "is_default": True}),
+    ("GET", "/api/v1/payments/history", "passenger", None),
+    ("GET", "/api/v1/notifications/", "passenger", None),
+    ("GET", "/api/v1/notifications/unread-count", "passenger", None),
+    ("PUT", "/api/v1/notifications/read-all", "passenger", None),
+    ("GET", "/api/v1/drivers/requests", "driver", None),
+    ("GET", "/api/v1/drivers/active-rides", "driver", None),
+    ("GET", "/api/v1/drivers/ride-history", "driver", None),
+    ("GET", "/api/v1/drivers/earnings?period=week", "driver", None),
+    ("GET", "/api/v1/drivers/stats", "driver", None),
+]
+
+@contextmanager
+def capture_statements():
+    """Collect (statement, parameters) for every SQL statement run, skipping executemany batches."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+def table_scans(captured: list) -> list:
+    """EXPLAIN each captured query; returns (statement, plan step) for full scans of large tables."""
+    scans = []
+    with engine.connect() as connection:
+        for statement, parameters in captured:
+            if not re.match(r"\s*(SELECT|UPDATE|DELETE)", statement, re.IGNORECASE):
+                continue
+            plan = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+            for *_, detail in plan:
+                scanned = re.match(r"SCAN (\w+)", detail)
+                if scanned and re.sub(r"_\d+$", "", scanned.group(1)) in LARGE_TABLES:
+                    scans.append((statement, detail))
+    return scans
+
+@pytest.mark.parametrize("method,path,role,body", ENDPOINTS)
+def test_endpoint_queries_use_indexes(client: TestClient, seeded, method, path, role, body):
+    """Test that no query behind the endpoint scans a whole large table."""
+    with capture_statements() as captured:
+        response = client.request(method, path, json=body, headers=seeded[role])
+
+    assert response.status_code == 200, response.text
+    assert captured
+    scans = table_scans(captured)
+    assert not scans, "\n\n".join(f"{detail}\n{statement}" for statement, detail in scans)
+
+def test_startup_queries_use_indexes(client: TestClient, seeded, db_session):
+    """Test that reloading pending pickups at startup searches by status."""
+    with capture_statements() as captured:
+        RideService(db_session).index_pending_rides()
+    assert captured and not table_scans(captured)
+
+def test_plan_check_catches_a_missing_index(client: TestClient, seeded):
+    """Test that the check flags a scan once the index behind a query is gone."""
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_payments_user_id_created_at"))
+    # Pooled connections may hold the old schema; start from fresh ones
+    engine.dispose()
+    with capture_statements() as captured:
+        response = client.get("/api/v1/payments/history", headers=seeded["passenger"])
+    assert response.status_code == 200, response.text
+    assert [detail for _, detail in table_scans(captured)] == ["SCAN payments"] * 2
@@ -0,0 +1,67 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.routing import Route, road_router
+from app.services.ride_service import quote_cache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+def test_lru_eviction_ttl_and_stats():
+    """Test least-recently-used eviction, expiry and the counters."""
+    clock = FakeClock()
+    cache = LRUCache(2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    
+    clock.now = 11
+    assert cache.get("a") is None
+    assert cache.get_or_set("a", lambda: 4) == 4
+    assert cache.stats() == {
+        "size": 2, "maxsize": 2, "hits": 2, "misses": 3,
+        "evictions": 1, "expirations": 1, "hit_rate": 0.4
+    }
+
+@pytest.fixture
+def routes(monkeypatch):
+    calls = []
+    
+    def route(from_lat, from_lon, to_lat, to_lon):
+        calls.append((from_lat, from_lon, to_lat, to_lon))
+        return Route(distance_km=8.0, duration_seconds=1200, routed=True)
+    
+    monkeypatch.setattr(road_router, "route", route)
+    return calls
+
+def test_dragged_pin_requotes_hit_the_cache(client: TestClient, routes, monkeypatch):
+    """Test that nearby re-quotes reuse one route and pricing changes miss."""
+    trip = {
+        "pickup_latitude": -1.29210,
+        "pickup_longitude": 36.82190,
+        "destination_latitude": -1.26000,
+        "destination_longitude": 36.80000,
+    }
+    first = client.post("/api/v1/rides/estimate", json=trip).json()
+    for step in range(1, 5):
+        nudged = {**trip, "pickup_latitude": trip["pickup_latitude"] + step * 0.0001}
+        assert client.post("/api/v1/rides/estimate", json=nudged).json() == first
+    assert len(routes) == 1
+    
+    # Other ride types and pricing parameters get their own entries
+    client.post("/api/v1/rides/estimate", json={**trip, "ride_type": "comfort"})
+    monkeypatch.setattr(settings, "FARE_PER_KM", settings.FARE_PER_KM + 5)
+    repriced = client.post("/api/v1/rides/estimate", json=trip).json()
+    assert repriced["fare"] == pytest.approx(first["fare"] + 40)
+    assert len(routes) == 3
+    
+    metrics = client.get("/metrics").json()["quote_cache"]
+    assert (metrics["hits"], metrics["misses"]) == (quote_cache.hits, quote_cache.misses) == (4, 3)
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import pytest
+from fastapi.testclient import TestClient
+from app.core.rate_limit import InMemoryBucketStore, RateLimiter, rate_limiter
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def register(client: TestClient, index: int) -> dict:
+    response = client.post("/api/v1/auth/register", json={
+        "first_name": "Njeri",
+        "last_name": "Test",
+        "email": f"njeri{index}@example.com",
+        "phone": f"+25470000080{index}",
+        "password": "password123",
+        "role": "passenger"
+    })
+    return response.json()
+
+def test_bucket_refills_lazily():
+    """Test that a bucket bursts to capacity, then refills with elapsed time."""
+    clock = Clock()
+    store = InMemoryBucketStore(shards=4, clock=clock)
+    assert [store.take("caller", 3, 1.0) for _ in range(3)] == [0, 0, 0]
+    assert store.take("caller", 3, 1.0) == pytest.approx(1.0)
+    clock.now += 0.5
+    assert store.take("caller", 3, 1.0) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert store.take("caller", 3, 1.0) == 0
+    assert store.take("other", 3, 1.0) == 0
+
+def test_full_buckets_are_pruned():
+    """Test that a crowded shard forgets buckets that have refilled."""
+    clock = Clock()
+    store = InMemoryBucketStore(shards=1, max_keys=10, clock=clock)
+    for index in range(10):
+        store.take(f"caller{index}", 5, 1.0)
+    clock.now += 1.0
+    store.take("newcomer", 5, 1.0)
+    assert len(store) == 1
+
+def test_polling_leaves_accepting_open():
+    """Test that a driver polling at the limit can still accept and reject rides."""
+    limiter = RateLimiter(InMemoryBucketStore(clock=Clock()))
+    polls = [limiter.check("user:d1", "/api/v1/drivers/requests") for _ in range(31)]
+    assert polls[:30] == [0] * 30 and polls[30] > 0
+    assert limiter.check("user:d1", "/api/v1/drivers/requests/abc/accept") == 0
+    assert limiter.check("user:d1", "/api/v1/drivers/requests/abc/reject") == 0
+
+def test_networked_store_is_called_off_the_loop():
+    """Test that a blocking store is charged from a worker thread, once per bucket."""
+    calls = []
+    
+    class NetworkStore:
+        blocking = True
+        
+        def take(self, key, capacity, refill_per_second):
+            calls.append((key, threading.get_ident()))
+            return 0.0
+    
+    limiter = RateLimiter(NetworkStore())
+    assert asyncio.run(limiter.check_async("user:u1", "/api/v1/rides/active", "10.0.0.1")) == 0
+    assert [key for key, _ in calls] == ["user:u1", "addr:10.0.0.1"]
+    assert all(thread != threading.get_ident() for _, thread in calls)
+    assert limiter.stats() == {"allowed": 1, "limited": 0}
+
+def test_users_are_limited_separately(client: TestClient, monkeypatch):
+    """Test that each user draws from their own bucket and gets Retry-After when empty."""
+    first, second = register(client, 1), register(client, 2)
+    monkeypatch.setattr(rate_limiter, "per_minute", 3)
+    headers = {"Authorization": f"Bearer {first['access_token']}"}
+    assert [client.get("/api/v1/users/me", headers=headers).status_code for _ in range(3)] == [200] * 3
+
+    response = client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "20"
+    headers = {"Authorization": f"Bearer {second['access_token']}"}
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+    assert client.get("/health").status_code == 200
+    assert client.get("/metrics").json()["rate_limit"]["limited"] == 1
+
+def test_route_override_limits_anonymous_callers_by_ip(client: TestClient):
+    """Test that logins have their own, tighter per-IP bucket."""
+    register(client, 1)
+    login = {"email": "njeri1@example.com", "password": "wrong-password"}
+    statuses = [client.post("/api/v1/auth/login", json=login).status_code for _ in range(11)]
+    assert statuses == [401] * 10 + [429]
+    assert register(client, 2)["access_token"]
+
+def test_users_behind_one_ip_share_its_bucket(client: TestClient, monkeypatch):
+    """Test that authenticated requests also draw from the per-IP bucket."""
+    first, second = register(client, 1), register(client, 2)
+    monkeypatch.setattr(rate_limiter, "per_minute", 3)
+    monkeypatch.setattr(rate_limiter, "per_ip_minute", 4)
+    rate_limiter.store.clear()
+    headers = {"Authorization": f"Bearer {first['access_token']}"}
+    assert [client.get("/api/v1/users/me", headers=headers).status_code for _ in range(3)] == [200] * 3
+    
+    headers = {"Authorization": f"Bearer {second['access_token']}"}
+    assert [client.get("/api/v1/users/me", headers=headers).status_code for _ in range(2)] == [200, 429]
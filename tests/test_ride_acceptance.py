@@ -0,0 +1,66 @@
+import random
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi import HTTPException
+from app.models.ride import Ride, RideStatus
+from app.services.driver_service import DriverService
+from tests.conftest import TestingSessionLocal
+
+RIDES = 5
+DRIVERS = 200
+
+def _seed_rides(db_session) -> list[str]:
+    ride_ids = [str(uuid.uuid4()) for _ in range(RIDES)]
+    db_session.add_all(Ride(
+        id=ride_id,
+        status=RideStatus.REQUESTED,
+        pickup_address="Pickup",
+        destination_address="Destination",
+        pickup_latitude=-1.29,
+        pickup_longitude=36.82,
+        destination_latitude=-1.30,
+        destination_longitude=36.78,
+        fare=150.0,
+        distance=5.0,
+        duration=15,
+        passenger_id=str(uuid.uuid4())
+    ) for ride_id in ride_ids)
+    db_session.commit()
+    return ride_ids
+
+def _attempt(ride_id: str, driver_id: str) -> bool:
+    db = TestingSessionLocal()
+    try:
+        DriverService(db).accept_ride_request(ride_id, driver_id)
+        return True
+    except HTTPException as exc:
+        assert exc.status_code == 400
+        return False
+    finally:
+        db.close()
+
+def test_concurrent_accepts_have_one_winner(client, db_session):
+    """Test that hundreds of drivers racing for the same rides yield exactly one winner each."""
+    ride_ids = _seed_rides(db_session)
+    attempts = [(ride_id, f"driver-{i}") for i in range(DRIVERS) for ride_id in ride_ids]
+    random.Random(11).shuffle(attempts)
+    
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        results = list(pool.map(lambda attempt: _attempt(*attempt), attempts))
+    
+    winners = {attempt: won for attempt, won in zip(attempts, results) if won}
+    assert Counter(ride_id for ride_id, _ in winners) == {ride_id: 1 for ride_id in ride_ids}
+    
+    db_session.expire_all()
+    for (ride_id, driver_id) in winners:
+        ride = db_session.query(Ride).filter(Ride.id == ride_id).one()
+        assert ride.status == RideStatus.ACCEPTED
+        assert ride.driver_id == driver_id
+
+def test_accept_missing_ride(client, db_session):
+    """Test that accepting an unknown ride is a 404."""
+    with pytest.raises(HTTPException) as exc:
+        DriverService(db_session).accept_ride_request("missing", "driver-1")
+    assert exc.value.status_code == 404
@@ -0,0 +1,158 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from app.core.presence import PresenceRegistry, PresenceStatus, InMemoryPresenceBackend
+from app.core.realtime import RealtimeHub
+from app.core.spatial import GridIndex
+from app.services import dispatch_service
+from app.services.dispatch_service import RideOffer, _offer_on_feed
+from app.services.offer_service import OfferFeed
+
+CENTER = (-1.2921, 36.8219)
+RIDE = {
+    "pickup": "CBD",
+    "destination": "Westlands",
+    "pickup_latitude": CENTER[0],
+    "pickup_longitude": CENTER[1],
+    "destination_latitude": -1.2676,
+    "destination_longitude": 36.8108
+}
+
+def register(client: TestClient, name: str, role: str, phone: str) -> dict:
+    response = client.post("/api/v1/auth/register", json={
+        "first_name": name,
+        "last_name": "Test",
+        "email": f"{name.lower()}@example.com",
+        "phone": phone,
+        "password": "password123",
+        "role": role
+    })
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def test_offers_go_to_nearest_eligible_connected_drivers():
+    """Test fan-out, refill on decline and busy drivers, and retraction."""
+    async def scenario():
+        hub, drivers, pickups = RealtimeHub(), GridIndex(), GridIndex()
+        registry = PresenceRegistry(InMemoryPresenceBackend())
+        feed = OfferFeed(hub, drivers, pickups, registry, fanout=2)
+        
+        feeds = {}
+        for index in range(6):
+            driver_id = f"d{index}"
+            drivers.upsert(driver_id, CENTER[0] + 0.001 * (index + 1), CENTER[1])
+            registry.set_status(driver_id, PresenceStatus.ONLINE)
+            if driver_id != "d0":  # d0 is nearest but has no feed open
+                feeds[driver_id], snapshot = feed.connect(driver_id)
+                assert snapshot == []
+        registry.set_status("d1", PresenceStatus.BUSY)
+        
+        async def received(driver_id):
+            messages = []
+            while len(feeds[driver_id]):
+                messages.append(await feeds[driver_id].get())
+            return messages
+        
+        request = {"id": "r1", "pickup_latitude": CENTER[0], "pickup_longitude": CENTER[1]}
+        pickups.upsert("r1", CENTER[0], CENTER[1])
+        assert feed.ride_requested("r1", request) == 2
+        for driver_id in ("d2", "d3"):
+            [offer] = await received(driver_id)
+            assert (offer["type"], offer["ride_id"]) == ("offer", "r1")
+            assert offer["request"]["distance_km"] > 0
+        assert await received("d4") == []
+        
+        # A decline passes the ride on to the next nearest driver
+        feed.declined("r1", "d2")
+        assert [message["type"] for message in await received("d4")] == ["offer"]
+        
+        # d3 going busy frees its slots: r1 moves on to d5, r2 to d4
+        feed.ride_requested("r2", dict(request, id="r2"))
+        assert [message["ride_id"] for message in await received("d2")] == ["r2"]
+        registry.set_status("d3", PresenceStatus.BUSY)
+        feed.driver_engaged("d3")
+        assert sorted((message["type"], message["ride_id"]) for message in await received("d3")) == [
+            ("retract", "r1"), ("retract", "r2")
+        ]
+        assert [message["ride_id"] for message in await received("d4")] == ["r2"]
+        assert [message["ride_id"] for message in await received("d5")] == ["r1"]
+        
+        assert feed.ride_closed("r1", "accepted") == 2
+        for driver_id in ("d4", "d5"):
+            assert await received(driver_id) == [{"type": "retract", "ride_id": "r1", "reason": "accepted"}]
+        assert feed.stats()["open_rides"] == 1
+        
+        # A driver connecting late picks up open rides that are short of drivers
+        feed.ride_closed("r2", "cancelled")
+        for driver_id in ("d4", "d5"):
+            feed.disconnect(driver_id, feeds[driver_id])
+        pickups.upsert("r3", CENTER[0], CENTER[1])
+        assert feed.ride_requested("r3", dict(request, id="r3")) == 1
+        _, snapshot = feed.connect("d4")
+        assert [offer["ride_id"] for offer in snapshot] == ["r3"]
+    
+    asyncio.run(scenario())
+
+def test_dispatched_offers_share_the_feed(monkeypatch):
+    """Test that dispatcher offers go out on the feed, once, and are retracted with the ride."""
+    async def scenario():
+        hub, drivers = RealtimeHub(), GridIndex()
+        registry = PresenceRegistry(InMemoryPresenceBackend())
+        feed = OfferFeed(hub, drivers, GridIndex(), registry, fanout=1)
+        monkeypatch.setattr(dispatch_service, "offer_feed", feed)
+        for driver_id, offset in (("near", 0.001), ("matched", 0.002)):
+            drivers.upsert(driver_id, CENTER[0] + offset, CENTER[1])
+            registry.set_status(driver_id, PresenceStatus.ONLINE)
+        feeds = {driver_id: feed.connect(driver_id)[0] for driver_id in ("near", "matched")}
+        
+        matched = RideOffer(ride_id="r1", driver_id="matched", pickup_eta_seconds=60, expires_at=0)
+        # Not on the feed yet, so left for the next tick
+        assert _offer_on_feed([matched]) == []
+        feed.ride_requested("r1", {"id": "r1", "pickup_latitude": CENTER[0], "pickup_longitude": CENTER[1]})
+        near = RideOffer(ride_id="r1", driver_id="near", pickup_eta_seconds=30, expires_at=0)
+        assert _offer_on_feed([matched, near]) == [matched, near]
+        for driver_id in ("near", "matched"):
+            assert (await feeds[driver_id].get())["type"] == "offer"
+            assert len(feeds[driver_id]) == 0
+        
+        assert feed.ride_closed("r1", "accepted") == 2
+        assert (await feeds["matched"].get())["type"] == "retract"
+    
+    asyncio.run(scenario())
+
+def test_driver_feed_receives_offer_and_retraction(client: TestClient):
+    """Test that connected drivers are pushed a new ride and told when another driver takes it."""
+    passenger = register(client, "Paula", "passenger", "+254700000401")
+    first = register(client, "Fred", "driver", "+254700000402")
+    second = register(client, "Sally", "driver", "+254700000403")
+    for headers, offset in ((first, 0.001), (second, 0.002)):
+        client.put("/api/v1/drivers/status", json={
+            "status": "online", "latitude": CENTER[0] + offset, "longitude": CENTER[1]
+        }, headers=headers)
+    
+    token = lambda headers: headers["Authorization"].split(" ")[1]
+    with client.websocket_connect(f"/api/v1/drivers/offers?token={token(first)}") as first_feed, \
+            client.websocket_connect(f"/api/v1/drivers/offers?token={token(second)}") as second_feed:
+        assert first_feed.receive_json() == {"type": "snapshot", "offers": []}
+        assert second_feed.receive_json() == {"type": "snapshot", "offers": []}
+        
+        ride = client.post("/api/v1/rides/request", json=RIDE, headers=passenger).json()
+        offers = [first_feed.receive_json(), second_feed.receive_json()]
+        for offer in offers:
+            assert (offer["type"], offer["ride_id"]) == ("offer", ride["id"])
+            assert offer["request"]["passenger_name"] == "Paula Test"
+            assert offer["request"]["fare"] == ride["fare"]
+        assert offers[0]["request"]["distance_km"] < offers[1]["request"]["distance_km"]
+        
+        assert client.post(f"/api/v1/drivers/requests/{ride['id']}/accept", headers=first).status_code == 200
+        assert second_feed.receive_json() == {"type": "retract", "ride_id": ride["id"], "reason": "accepted"}
+        assert first_feed.receive_json()["type"] == "retract"
+    assert client.get("/metrics").json()["ride_offers"]["open_rides"] == 0
+
+def test_driver_feed_rejects_passengers(client: TestClient):
+    """Test that only drivers can open the offer feed."""
+    passenger = register(client, "Percy", "passenger", "+254700000404")
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect(f"/api/v1/drivers/offers?token={passenger['Authorization'].split(' ')[1]}") as feed:
+            feed.receive_json()
+    assert closed.value.code == 4403
@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+from app.core.spatial import pending_pickups
+
+PICKUP = (-1.2921, 36.8219)
+
+def _register(client: TestClient, name: str, phone: str, role: str) -> dict:
+    user_data = {
+        "first_name": name,
+        "last_name": "Test",
+        "email": f"{name.lower()}@example.com",
+        "phone": phone,
+        "password": "password123",
+        "role": role
+    }
+    token = client.post("/api/v1/auth/register", json=user_data).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+def _request_ride(client: TestClient, headers: dict, latitude: float, longitude: float) -> str:
+    ride_data = {
+        "pickup": "Pickup",
+        "destination": "Destination",
+        "pickup_latitude": latitude,
+        "pickup_longitude": longitude,
+        "destination_latitude": -1.30,
+        "destination_longitude": 36.78
+    }
+    return client.post("/api/v1/rides/request", json=ride_data, headers=headers).json()["id"]
+
+def test_ride_requests_filtered_by_distance(client: TestClient):
+    """Test that drivers only see nearby pending rides, closest first."""
+    passenger = _register(client, "Paula", "+254711000001", "passenger")
+    driver = _register(client, "Derek", "+254711000002", "driver")
+    
+    far = _request_ride(client, passenger, PICKUP[0] + 0.02, PICKUP[1])  # ~2.2 km
+    near = _request_ride(client, passenger, PICKUP[0] + 0.005, PICKUP[1])  # ~0.6 km
+    remote = _request_ride(client, passenger, PICKUP[0] + 0.5, PICKUP[1])  # ~55 km
+    assert len(pending_pickups) == 3
+    
+    # No known position yet, so nothing to show
+    assert client.get("/api/v1/drivers/requests", headers=driver).json() == []
+    
+    client.put("/api/v1/drivers/status", json={"status": "online"}, headers=driver)
+    client.post("/api/v1/drivers/location", json={"points": [{"latitude": PICKUP[0], "longitude": PICKUP[1]}]}, headers=driver)
+    requests = client.get("/api/v1/drivers/requests", headers=driver).json()
+    assert [r["id"] for r in requests] == [near, far]
+    assert requests[0]["passenger_name"] == "Paula Test"
+    assert requests[0]["distance_km"] < requests[1]["distance_km"]
+    
+    requests = client.get("/api/v1/drivers/requests", params={"radius": 1.0}, headers=driver).json()
+    assert [r["id"] for r in requests] == [near]
+    
+    client.post(f"/api/v1/rides/{near}/cancel", json={"reason": "changed plans"}, headers=passenger)
+    client.post(f"/api/v1/drivers/requests/{far}/accept", headers=driver)
+    assert near not in pending_pickups
+    assert far not in pending_pickups
+    assert remote in pending_pickups
+    assert client.get("/api/v1/drivers/requests", headers=driver).json() == []
@@ -0,0 +1,103 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from app.core.realtime import RealtimeHub, Subscriber, SubscriberOverflow
+
+def register(client: TestClient, name: str, role: str, phone: str) -> dict:
+    response = client.post("/api/v1/auth/register", json={
+        "first_name": name,
+        "last_name": "Test",
+        "email": f"{name.lower()}@example.com",
+        "phone": phone,
+        "password": "password123",
+        "role": role
+    })
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def test_subscriber_coalesces_and_overflows():
+    """Test that location updates coalesce and a backlog of transitions overflows."""
+    subscriber = Subscriber(maxsize=3)
+    subscriber.put({"type": "status", "status": "accepted"})
+    for step in range(100):
+        assert subscriber.put({"type": "location", "step": step}, coalesce_key="location")
+    assert len(subscriber) == 2
+    assert asyncio.run(subscriber.get())["status"] == "accepted"
+    assert asyncio.run(subscriber.get())["step"] == 99
+    
+    for status in ("arrived", "started", "completed"):
+        assert subscriber.put({"type": "status", "status": status})
+    assert not subscriber.put({"type": "status", "status": "cancelled"})
+    with pytest.raises(SubscriberOverflow):
+        asyncio.run(subscriber.get())
+
+def test_hub_drops_overflowed_subscribers():
+    """Test that a stuck subscriber is removed instead of growing."""
+    async def scenario():
+        hub = RealtimeHub(queue_size=2)
+        stuck = hub.subscribe("ride:1")
+        for index in range(3):
+            hub.publish("ride:1", {"index": index})
+        return hub, stuck
+    
+    hub, stuck = asyncio.run(scenario())
+    assert stuck.overflowed
+    assert hub.subscriber_count("ride:1") == 0
+    assert hub.stats()["overflows"] == 1
+
+def test_passenger_tracks_ride_over_websocket(client: TestClient):
+    """Test snapshot, status transitions and driver movement on the ride socket."""
+    passenger = register(client, "Pat", "passenger", "+254700000101")
+    driver = register(client, "Dan", "driver", "+254700000102")
+    ride = client.post("/api/v1/rides/request", json={
+        "pickup": "CBD",
+        "destination": "Westlands",
+        "pickup_latitude": -1.2921,
+        "pickup_longitude": 36.8219,
+        "destination_latitude": -1.2676,
+        "destination_longitude": 36.8108
+    }, headers=passenger).json()
+    token = passenger["Authorization"].split(" ")[1]
+    
+    with client.websocket_connect(f"/api/v1/rides/{ride['id']}/track?token={token}") as socket:
+        snapshot = socket.receive_json()
+        assert snapshot["type"] == "snapshot"
+        assert snapshot["ride"]["status"] == "requested"
+        
+        client.put("/api/v1/drivers/status", json={"latitude": -1.29, "longitude": 36.82}, headers=driver)
+        assert client.post(f"/api/v1/drivers/requests/{ride['id']}/accept", headers=driver).status_code == 200
+        accepted = socket.receive_json()
+        assert (accepted["type"], accepted["status"]) == ("status", "accepted")
+        
+        point = {"latitude": -1.2905, "longitude": 36.8210}
+        client.post("/api/v1/drivers/location", json={"points": [point]}, headers=driver)
+        client.post("/api/v1/drivers/location", json={"points": [point]}, headers=driver)  # unchanged
+        moved = socket.receive_json()
+        assert moved["type"] == "location"
+        assert (moved["latitude"], moved["longitude"]) == (point["latitude"], point["longitude"])
+        
+        client.put(f"/api/v1/rides/{ride['id']}/status", json={"status": "started"}, headers=driver)
+        assert socket.receive_json()["status"] == "started"
+        assert client.post(f"/api/v1/rides/{ride['id']}/complete", headers=driver).status_code == 200
+        assert socket.receive_json()["status"] == "completed"
+        with pytest.raises(WebSocketDisconnect) as closed:
+            socket.receive_json()
+        assert closed.value.code == 1000
+
+def test_websocket_rejects_strangers(client: TestClient):
+    """Test that only the ride's passenger and driver can subscribe."""
+    passenger = register(client, "Pam", "passenger", "+254700000103")
+    stranger = register(client, "Sam", "passenger", "+254700000104")
+    ride = client.post("/api/v1/rides/request", json={
+        "pickup": "CBD",
+        "destination": "Westlands",
+        "pickup_latitude": -1.2921,
+        "pickup_longitude": 36.8219,
+        "destination_latitude": -1.2676,
+        "destination_longitude": 36.8108
+    }, headers=passenger).json()
+    
+    for query in ("", "?token=garbage", f"?token={stranger['Authorization'].split(' ')[1]}"):
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect(f"/api/v1/rides/{ride['id']}/track{query}") as socket:
+                socket.receive_json()
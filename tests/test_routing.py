@@ -0,0 +1,122 @@
+import heapq
+import random
+import pytest
+import numpy as np
+from fastapi.testclient import TestClient
+from app.core.routing import RoadGraph, Router, EDGE_COLUMNS, road_router
+from app.core.spatial import haversine_km
+
+def grid_graph(size: int, seed: int = 7) -> RoadGraph:
+    """Random-speed street grid roughly 100 m per block."""
+    rng = np.random.default_rng(seed)
+    rows, cols = np.divmod(np.arange(size * size), size)
+    latitudes = -1.3 + rows * 0.0009
+    longitudes = 36.8 + cols * 0.0009
+    tails, heads = [], []
+    for node in range(size * size):
+        if node % size + 1 < size:
+            tails += [node, node + 1]
+            heads += [node + 1, node]
+        if node + size < size * size:
+            tails += [node, node + size]
+            heads += [node + size, node]
+    tails, heads = np.array(tails), np.array(heads)
+    metres = np.array([
+        1000 * haversine_km(latitudes[a], longitudes[a], latitudes[b], longitudes[b]) for a, b in zip(tails, heads)
+    ])
+    seconds = metres / (rng.uniform(10, 60, len(metres)) / 3.6)
+    return RoadGraph(latitudes, longitudes, tails, heads, metres, seconds)
+
+def dijkstra(graph: RoadGraph, source: int, target: int):
+    indptr, heads, seconds, metres = graph.forward
+    dist, length = {source: 0.0}, {source: 0.0}
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if u == target:
+            return d, length[u]
+        if d > dist[u]:
+            continue
+        for edge in range(indptr[u], indptr[u + 1]):
+            v = heads[edge]
+            if d + seconds[edge] < dist.get(v, float("inf")):
+                dist[v] = d + seconds[edge]
+                length[v] = length[u] + metres[edge]
+                heapq.heappush(heap, (dist[v], v))
+    return None
+
+@pytest.mark.parametrize("landmarks", [0, 4])
+def test_bidirectional_astar_matches_dijkstra(landmarks):
+    """Test that the routed time is optimal on a random-speed grid, with and without ALT."""
+    graph = grid_graph(30)
+    if landmarks:
+        graph.add_landmarks(landmarks)
+        assert graph.num_landmarks == landmarks
+    rng = random.Random(1)
+    for _ in range(50):
+        source, target = rng.randrange(graph.num_nodes), rng.randrange(graph.num_nodes)
+        expected = dijkstra(graph, source, target)
+        seconds, metres = graph.shortest_path(source, target)
+        assert seconds == pytest.approx(expected[0])
+        assert metres > 0 or source == target
+
+def test_csv_loading_oneway_and_unreachable(tmp_path):
+    """Test the edge-list loader and that one-way streets are respected."""
+    path = tmp_path / "edges.csv"
+    path.write_text(",".join(EDGE_COLUMNS) + "\n" + "\n".join([
+        "a,b,-1.30,36.80,-1.30,36.81,1200,36,0",
+        "b,c,-1.30,36.81,-1.30,36.82,,,1",
+    ]) + "\n")
+    graph = RoadGraph.from_csv(str(path))
+    assert (graph.num_nodes, graph.num_edges) == (3, 3)
+    
+    seconds, metres = graph.shortest_path(0, 2)
+    assert seconds > 120 and metres > 1200
+    assert graph.shortest_path(2, 0) is None
+    
+    graph.add_landmarks(2)
+    assert graph.shortest_path(2, 0) is None
+    graph.save(str(tmp_path / "graph.npz"))
+    reloaded = Router().load(str(tmp_path / "graph.npz"))
+    assert reloaded.num_landmarks == 2
+    assert reloaded.shortest_path(0, 2) == pytest.approx((seconds, metres))
+
+def test_router_falls_back_off_network():
+    """Test that points far from the graph use the straight-line model."""
+    router = Router(grid_graph(5), max_snap_km=0.5)
+    assert router.route(-1.2999, 36.8001, -1.2965, 36.8035).routed is True
+    assert router.route(-1.0, 36.8, -1.3, 36.8).routed is False
+    assert Router().route(-1.0, 36.8, -1.3, 36.8).distance_km > haversine_km(-1.0, 36.8, -1.3, 36.8)
+
+def test_estimate_endpoint_uses_router(client: TestClient, monkeypatch):
+    """Test that estimates come from the routed trip rather than fixed values."""
+    monkeypatch.setattr(road_router, "graph", grid_graph(20))
+    trip = {
+        "pickup_latitude": -1.3,
+        "pickup_longitude": 36.8,
+        "destination_latitude": -1.2838,
+        "destination_longitude": 36.8162,
+    }
+    standard = client.post("/api/v1/rides/estimate", json=trip).json()
+    premium = client.post("/api/v1/rides/estimate", json={**trip, "ride_type": "premium"}).json()
+    
+    assert standard["breakdown"]["routed"] is True
+    assert premium["fare"] > standard["fare"]
+    assert client.post("/api/v1/rides/estimate", json={}).status_code == 422
+    
+    # Estimates are quoted between cached cell centres; booked rides use the exact trip
+    passenger = client.post("/api/v1/auth/register", json={
+        "first_name": "Wambui",
+        "last_name": "Test",
+        "email": "wambui@example.com",
+        "phone": "+254700000701",
+        "password": "password123",
+        "role": "passenger"
+    }).json()
+    ride = client.post(
+        "/api/v1/rides/request",
+        json={**trip, "pickup": "Upper Hill", "destination": "Westlands"},
+        headers={"Authorization": f"Bearer {passenger['access_token']}"}
+    ).json()
+    assert ride["distance"] == pytest.approx(3.6, abs=0.1)
+    assert ride["distance"] != standard["distance"]
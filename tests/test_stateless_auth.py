@@ -0,0 +1,70 @@
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+from app.core.config import settings
+from app.services.user_service import UserService
+from app.models import User
+
+@pytest.fixture
+def stateless(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_STATELESS_TOKENS", True)
+
+def register(client: TestClient, role: str = "driver") -> str:
+    response = client.post("/api/v1/auth/register", json={
+        "first_name": "Juma",
+        "last_name": "Test",
+        "email": "juma@example.com",
+        "phone": "+254700000401",
+        "password": "password123",
+        "role": role
+    })
+    return response.json()["access_token"]
+
+def test_stateless_token_authorizes_without_queries(client: TestClient, stateless, count_queries):
+    """Test that role-gated endpoints run no SQL at all for stateless tokens."""
+    token = register(client)
+    claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    assert claims["role"] == "driver" and claims["ver"] == 0 and claims["uid"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with count_queries() as statements:
+        assert client.get("/api/v1/drivers/status", headers=headers).status_code == 200
+    assert statements == []
+
+    # The profile still comes from the database
+    response = client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "Juma"
+    assert client.get("/api/v1/auth/me", headers=headers).json() == response.json()
+
+def test_stateless_token_role_is_enforced(client: TestClient, stateless):
+    """Test that the role claim gates driver endpoints."""
+    headers = {"Authorization": f"Bearer {register(client, role='passenger')}"}
+    assert client.get("/api/v1/drivers/status", headers=headers).status_code == 403
+
+def test_email_change_revokes_stateless_tokens(client: TestClient, stateless):
+    """Test that changing a claim bumps the version and rejects older tokens."""
+    headers = {"Authorization": f"Bearer {register(client)}"}
+    response = client.put("/api/v1/users/me", json={"first_name": "Jumaa"}, headers=headers)
+    assert response.status_code == 200
+    assert client.get("/api/v1/drivers/status", headers=headers).status_code == 200
+
+    response = client.put("/api/v1/users/me", json={"email": "jumaa@example.com"}, headers=headers)
+    assert response.status_code == 200
+    response = client.get("/api/v1/drivers/status", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has been revoked"
+
+    login = client.post("/api/v1/auth/login", json={"email": "jumaa@example.com", "password": "password123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    assert client.get("/api/v1/drivers/status", headers=headers).status_code == 200
+
+def test_versioned_token_checked_against_database(client: TestClient, db_session, stateless, monkeypatch):
+    """Test that versioned tokens are still revoked when stateless mode is switched off."""
+    headers = {"Authorization": f"Bearer {register(client)}"}
+    monkeypatch.setattr(settings, "AUTH_STATELESS_TOKENS", False)
+    assert client.get("/api/v1/drivers/status", headers=headers).status_code == 200
+
+    user = db_session.query(User).filter(User.email == "juma@example.com").first()
+    UserService(db_session).deactivate_user(user.id)
+    assert client.get("/api/v1/drivers/status", headers=headers).status_code == 401
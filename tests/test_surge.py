@@ -0,0 +1,57 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.services.surge_service import SurgeEngine, surge_engine
+
+NAIROBI = (-1.2921, 36.8219)
+KAREN = (-1.3192, 36.7073)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+    
+    def __call__(self):
+        return self.now
+
+def test_multiplier_tracks_sliding_window():
+    """Test surge rising with demand, ignoring quiet cells and decaying out of the window."""
+    clock = FakeClock()
+    engine = SurgeEngine(cell_km=1.0, window_seconds=300, bucket_seconds=30, clock=clock)
+    engine.record_driver("d1", *NAIROBI)
+    engine.record_driver("d1", *NAIROBI)  # counted once per bucket
+    engine.record_driver("d2", *KAREN)
+    for _ in range(5):
+        engine.record_request(*NAIROBI)
+    engine.record_request(*KAREN)
+    
+    assert engine.recompute() == 1
+    # 5 requests for 1 driver: 1 + 0.5 * (5 - 1)
+    assert engine.multiplier(*NAIROBI) == 3.0
+    assert engine.multiplier(*KAREN) == 1.0
+    
+    # The driver keeps pinging while the requests age out of the window
+    for _ in range(10):
+        clock.now += 30
+        engine.record_driver("d1", *NAIROBI)
+    engine.recompute()
+    assert engine.multiplier(*NAIROBI) == 1.0
+    assert engine.stats() == {"cells": 2, "surging_cells": 0, "max_multiplier": 1.0}
+
+def test_estimate_applies_surge_to_cached_quote(client: TestClient):
+    """Test that quotes pick up the current multiplier on every read."""
+    trip = {
+        "pickup_latitude": NAIROBI[0],
+        "pickup_longitude": NAIROBI[1],
+        "destination_latitude": KAREN[0],
+        "destination_longitude": KAREN[1],
+    }
+    calm = client.post("/api/v1/rides/estimate", json=trip).json()
+    assert calm["breakdown"]["surgeMultiplier"] == 1.0
+    
+    for _ in range(3):
+        surge_engine.record_request(*NAIROBI)
+    surge_engine.recompute()
+    surged = client.post("/api/v1/rides/estimate", json=trip).json()
+    
+    assert surged["breakdown"]["surgeMultiplier"] == 3.0
+    assert surged["fare"] == pytest.approx(calm["fare"] * 3, abs=0.05)
+    assert surged["distance"] == calm["distance"]
@@ -0,0 +1,52 @@
+import time
+from datetime import timedelta
+import pytest
+from fastapi import HTTPException
+from app.core import security
+from app.core.security import create_access_token, create_refresh_token, token_cache, verify_token
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """Count full JWT decodes."""
+    calls = []
+    decode = security.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(security.jwt, "decode", counting_decode)
+    return calls
+
+def test_repeated_token_skips_decode(decodes):
+    """Test that a verified token is answered from the cache until it expires."""
+    token = create_access_token({"sub": "kamau@example.com"})
+    first = verify_token(token)
+    first["sub"] = "tampered"
+    assert verify_token(token)["sub"] == "kamau@example.com"
+    assert len(decodes) == 1
+    assert token_cache.stats()["hits"] == 1
+
+def test_cached_token_still_checks_type(decodes):
+    """Test that a cached access token is not accepted where a refresh token is required."""
+    access = create_access_token({"sub": "kamau@example.com"})
+    verify_token(access)
+    with pytest.raises(HTTPException) as rejected:
+        verify_token(access, token_type="refresh")
+    assert rejected.value.status_code == 401
+    assert verify_token(create_refresh_token({"sub": "kamau@example.com"}), token_type="refresh")
+    assert len(decodes) == 2
+
+def test_invalid_and_expired_tokens_are_not_cached(decodes):
+    """Test that failures are never cached and entries lapse with the token."""
+    with pytest.raises(HTTPException):
+        verify_token("not-a-token")
+    assert len(token_cache) == 0
+
+    token = create_access_token({"sub": "kamau@example.com"}, expires_delta=timedelta(seconds=1))
+    verify_token(token)
+    # The decoder only rejects once its whole-second clock passes exp
+    time.sleep(max(0.0, verify_token(token)["exp"] + 1 - time.time()) + 0.05)
+    with pytest.raises(HTTPException):
+        verify_token(token)
+    assert len(decodes) == 3  # the bad token, the first check and the one after expiry
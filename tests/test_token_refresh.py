@@ -0,0 +1,83 @@
+import time
+from fastapi.testclient import TestClient
+from app.core.refresh_tokens import InMemoryRefreshFamilyBackend, RedisRefreshFamilyBackend, RefreshTokenFamilies
+from tests.fakes import FakeRedis
+
+def register(client: TestClient) -> dict:
+    response = client.post("/api/v1/auth/register", json={
+        "first_name": "Otieno",
+        "last_name": "Test",
+        "email": "otieno@example.com",
+        "phone": "+254700000701",
+        "password": "password123",
+        "role": "passenger"
+    })
+    return response.json()
+
+def refresh(client: TestClient, token: str):
+    return client.post("/api/v1/auth/refresh", json={"refresh_token": token})
+
+def test_refresh_rotates_without_hashing(client: TestClient):
+    """Test that a refresh issues working tokens and never runs bcrypt."""
+    tokens = register(client)
+    hashed = client.get("/metrics").json()["password_hashing"]["completed"]
+
+    response = refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    headers = {"Authorization": f"Bearer {rotated['access_token']}"}
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+    assert refresh(client, rotated["refresh_token"]).status_code == 200
+
+    metrics = client.get("/metrics").json()
+    assert metrics["password_hashing"]["completed"] == hashed
+    assert metrics["refresh_tokens"]["rotated"] == 2
+
+def test_reused_refresh_token_ends_the_session(client: TestClient):
+    """Test that replaying a rotated refresh token locks out every token of its session."""
+    tokens = register(client)
+    rotated = refresh(client, tokens["refresh_token"]).json()
+
+    response = refresh(client, tokens["refresh_token"])
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Refresh token is no longer valid"
+    assert refresh(client, rotated["refresh_token"]).status_code == 401
+    assert client.get("/metrics").json()["refresh_tokens"]["reuse_detected"] == 1
+
+def test_logout_and_email_change_end_refresh(client: TestClient):
+    """Test that logging out or changing a claim stops refreshes."""
+    tokens = register(client)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    client.post("/api/v1/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=headers)
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+
+    login = client.post("/api/v1/auth/login", json={"email": "otieno@example.com", "password": "password123"}).json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    assert client.put("/api/v1/users/me", json={"email": "otieno2@example.com"}, headers=headers).status_code == 200
+    assert refresh(client, login["refresh_token"]).status_code == 401
+
+def test_redis_family_rotation_is_a_single_swap():
+    """Test rotation and reuse detection against the shared backend."""
+    redis = FakeRedis()
+    first, second = (RefreshTokenFamilies(RedisRefreshFamilyBackend(redis)) for _ in range(2))
+    family = first.start("jti-1")
+    assert second.rotate(family, "jti-1", "jti-2")
+    assert not first.rotate(family, "jti-1", "jti-3")
+    assert first.reuse_detected == 1
+    assert not second.rotate(family, "jti-2", "jti-4")
+    assert redis.get("refresh_family:" + family) is None
+
+def test_unrefreshed_families_do_not_accumulate():
+    """Test that the in-memory store expires idle families and stays within its bound."""
+    families = RefreshTokenFamilies(InMemoryRefreshFamilyBackend(maxsize=10), ttl=0.05)
+    stale = families.start("jti-0")
+    for index in range(1, 50):
+        families.start(f"jti-{index}")
+    assert len(families.backend) == 10
+    
+    live = families.start("jti-live")
+    time.sleep(0.1)
+    assert not families.rotate(live, "jti-live", "jti-next")
+    assert not families.rotate(stale, "jti-0", "jti-next")
+    assert families.reuse_detected == 0
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+import tracemalloc
+import uuid
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app.core.revocation import BloomFilter, InMemoryRevocationBackend, RedisRevocationBackend, RevocationList
+from app.core.security import verify_token
+from tests.fakes import FakeRedis
+
+def register(client: TestClient) -> dict:
+    response = client.post("/api/v1/auth/register", json={
+        "first_name": "Achieng",
+        "last_name": "Test",
+        "email": "achieng@example.com",
+        "phone": "+254700000601",
+        "password": "password123",
+        "role": "passenger"
+    })
+    return response.json()
+
+def test_logout_revokes_tokens(client: TestClient):
+    """Test that a logged-out token is rejected while other sessions keep working."""
+    tokens = register(client)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+
+    response = client.post("/api/v1/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=headers)
+    assert response.status_code == 200
+    response = client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has been revoked"
+    with pytest.raises(HTTPException):
+        verify_token(tokens["refresh_token"], token_type="refresh")
+
+    login = client.post("/api/v1/auth/login", json={"email": "achieng@example.com", "password": "password123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+    assert client.get("/metrics").json()["revoked_tokens"]["revoked"] == 2
+
+def test_logout_requires_a_token(client: TestClient):
+    """Test that logout without a bearer token is refused."""
+    assert client.post("/api/v1/auth/logout").status_code == 401
+
+def test_bloom_filter_has_no_false_negatives():
+    """Test that every added key is found and strangers mostly are not."""
+    bloom = BloomFilter(10000, 0.01)
+    members = [uuid.uuid4().hex for _ in range(10000)]
+    for member in members:
+        bloom.add(member)
+    assert all(member in bloom for member in members)
+    strangers = sum(uuid.uuid4().hex in bloom for _ in range(10000))
+    assert strangers < 300
+
+def test_revocations_shared_and_expired_through_backend():
+    """Test that workers pick up each other's revocations and drop expired ones."""
+    redis = FakeRedis()
+    first, second = (RevocationList(RedisRevocationBackend(redis), capacity=100) for _ in range(2))
+    first.revoke("short", time.time() + 0.05)
+    first.revoke("long", time.time() + 60)
+    first.revoke("already-expired", time.time() - 1)
+    assert not second.is_revoked("long")
+
+    assert second.sync() == 2
+    assert second.is_revoked("long") and second.is_revoked("short")
+    time.sleep(0.1)
+    assert not second.is_revoked("short")
+    assert second.sync() == 1
+    assert first.sync() == 1
+
+def test_revocations_during_refresh_are_kept():
+    """Test that revoking while the backend is read off the loop survives the swap."""
+    loading, release = threading.Event(), threading.Event()
+    
+    class SlowBackend(InMemoryRevocationBackend):
+        def load(self, now):
+            loading.set()
+            release.wait(5)
+            return super().load(now)
+    
+    revocations = RevocationList(SlowBackend(), capacity=100)
+    revocations.revoke("before", time.time() + 60)
+    
+    async def scenario():
+        refresh = asyncio.create_task(revocations.refresh())
+        await asyncio.to_thread(loading.wait, 5)
+        revocations.revoke("during", time.time() + 60)
+        release.set()
+        return await refresh
+    
+    assert asyncio.run(scenario()) == 2
+    assert revocations.is_revoked("before") and revocations.is_revoked("during")
+    assert set(revocations.backend.load(time.time())) == {"before", "during"}
+
+def test_check_allocates_nothing_per_call():
+    """Test that checking a live token builds no per-call objects."""
+    revocations = RevocationList(RedisRevocationBackend(FakeRedis()), capacity=1000)
+    for _ in range(500):
+        revocations.revoke(uuid.uuid4().hex, time.time() + 60)
+    jti = uuid.uuid4().hex
+    revocations.is_revoked(jti)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        for _ in range(10000):
+            revocations.is_revoked(jti)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # Nothing beyond a few transient ints, however many checks run
+    assert peak - before < 1024
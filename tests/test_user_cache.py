@@ -0,0 +1,61 @@
+from fastapi.testclient import TestClient
+from app.models import User
+from app.services import auth_service
+from app.services.auth_service import AuthService, user_cache
+
+def register(client: TestClient, email: str = "amani@example.com") -> dict:
+    response = client.post("/api/v1/auth/register", json={
+        "first_name": "Amani",
+        "last_name": "Test",
+        "email": email,
+        "phone": "+254700000301",
+        "password": "password123",
+        "role": "passenger"
+    })
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def test_repeat_requests_skip_the_user_lookup(client: TestClient, count_queries):
+    """Test that authenticated GETs resolve the user from the cache after the first."""
+    headers = register(client)
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+
+    with count_queries() as statements:
+        for path in ("/api/v1/users/me", "/api/v1/auth/me"):
+            response = client.get(path, headers=headers)
+            assert response.status_code == 200
+            assert response.json()["email"] == "amani@example.com"
+
+    assert not [statement for statement in statements if "FROM users" in statement], statements
+    stats = client.get("/metrics").json()["user_cache"]
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+def test_profile_update_invalidates_cached_user(client: TestClient):
+    """Test that profile changes are visible on the next request, and an old email stops resolving."""
+    headers = register(client)
+    assert client.get("/api/v1/users/me", headers=headers).json()["first_name"] == "Amani"
+
+    response = client.put("/api/v1/users/me", json={"first_name": "Baraka"}, headers=headers)
+    assert response.status_code == 200
+    assert client.get("/api/v1/users/me", headers=headers).json()["first_name"] == "Baraka"
+
+    response = client.put("/api/v1/users/me", json={"email": "baraka@example.com"}, headers=headers)
+    assert response.status_code == 200
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 404
+
+def test_lookup_racing_an_update_is_not_cached(client: TestClient, db_session, monkeypatch):
+    """Test that a user read before an invalidation is not stored over it."""
+    register(client)
+    service = AuthService(db_session)
+    read = service.get_user_by_email
+
+    def read_then_update(email):
+        user = read(email)
+        auth_service.invalidate_cached_users(email)
+        return user
+
+    monkeypatch.setattr(service, "get_user_by_email", read_then_update)
+    user = service.get_authenticated_user("amani@example.com")
+    assert isinstance(user, User) and user.email == "amani@example.com"
+    assert "hashed_password" not in user.__dict__
+    assert len(user_cache) == 0